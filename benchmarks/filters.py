@@ -0,0 +1,141 @@
+"""
+Micro-benchmark of the coordinator's fixture and gameweek filtering.
+
+Compares the jmespath queries the coordinator used to run with the native
+filters that replaced them, on a synthetic season of 38 gameweeks and 380
+fixtures, halfway through a matchday. Run from the repository root:
+
+    python benchmarks/filters.py [--number N]
+
+The "before" column needs ``jmespath`` and ``python-dateutil`` installed,
+which the integration no longer requires.
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.fpl_api.coordinator import (  # noqa: E402
+    live_fixtures,
+    upcoming_kickoffs,
+)
+
+try:
+    from dateutil import parser as dateparser
+    import jmespath
+except ImportError:
+    jmespath = None
+
+TZ = pytz.timezone("Europe/Copenhagen")
+TEAM_ID = 13
+GAMEWEEK = 20
+
+
+def make_season():
+    """Return gameweeks and fixtures shaped like the API's, with the
+    current gameweek half played."""
+    now = datetime.now(timezone.utc)
+    events = [
+        {
+            "id": gameweek,
+            "name": f"Gameweek {gameweek}",
+            "is_current": gameweek == GAMEWEEK,
+            "is_next": gameweek == GAMEWEEK + 1,
+            "finished": gameweek < GAMEWEEK,
+        }
+        for gameweek in range(1, 39)
+    ]
+    fixtures = []
+    for gameweek in range(1, 39):
+        for match in range(10):
+            kickoff = now + timedelta(weeks=gameweek - GAMEWEEK, hours=match - 5)
+            started = kickoff < now
+            fixtures.append(
+                {
+                    "id": len(fixtures) + 1,
+                    "event": gameweek,
+                    "team_h": (match * 2 + gameweek) % 20 + 1,
+                    "team_a": (match * 2 + 1 + gameweek) % 20 + 1,
+                    "kickoff_time": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "started": started,
+                    "finished": started and kickoff + timedelta(hours=2) < now,
+                    "stats": [],
+                }
+            )
+    return events, fixtures
+
+
+def jmespath_active_gameweek(events):
+    return jmespath.search("[?is_current].id | [0]", events)
+
+
+def jmespath_kickoffs(fixtures):
+    # As before, but with the team test the old code meant to make
+    fixtures = jmespath.search(
+        "[?finished==`false` && started==`false`].{team_a: team_a, team_h: team_h, kickoff_time: kickoff_time}",
+        fixtures,
+    )
+    return [
+        dateparser.parse(fixture["kickoff_time"])
+        .replace(tzinfo=pytz.utc)
+        .astimezone(tz=TZ)
+        for fixture in fixtures
+        if TEAM_ID in (fixture["team_a"], fixture["team_h"])
+    ]
+
+
+def jmespath_live_fixtures(fixtures):
+    return jmespath.search("[?started==`true` && finished==`false`]", fixtures)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    arg_parser.add_argument("--number", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    events, fixtures = make_season()
+    gameweek = [fixture for fixture in fixtures if fixture["event"] == GAMEWEEK]
+    current_gameweek = next(event["id"] for event in events if event["is_current"])
+
+    cases = [
+        (
+            "active gameweek",
+            lambda: jmespath_active_gameweek(events),
+            # Found once per bootstrap download, so a tick only reads it
+            lambda: current_gameweek,
+        ),
+        (
+            "kickoffs",
+            lambda: jmespath_kickoffs(gameweek),
+            lambda: upcoming_kickoffs(gameweek, TEAM_ID, TZ),
+        ),
+        (
+            "live fixtures",
+            lambda: jmespath_live_fixtures(gameweek),
+            lambda: live_fixtures(gameweek),
+        ),
+    ]
+
+    print(f"{'filter':<18}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, before, after in cases:
+        after_us = min(timeit.repeat(after, number=args.number, repeat=5))
+        after_us *= 1e6 / args.number
+        if jmespath is None:
+            print(f"{name:<18}{'-':>14}{after_us:>14.2f}{'-':>10}")
+            continue
+        assert before() == after(), name
+        before_us = min(timeit.repeat(before, number=args.number, repeat=5))
+        before_us *= 1e6 / args.number
+        print(
+            f"{name:<18}{before_us:>14.2f}{after_us:>14.2f}"
+            f"{before_us / after_us:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Offline benchmarks of the polling pipeline, replaying recorded responses.
+
+    python benchmarks/pipeline.py [--recording recording.json.gz]
+        [--runs 5] [--output results.json] [--compare baseline.json]
+
+Every scenario runs against :class:`FPL` and the coordinator with a
+:class:`ReplaySession`, so nothing goes over the network. Without
+``--recording`` a synthetic season from ``record.py`` is used. For each
+scenario the wall time of every run, the requests and bytes served per run
+and the peak and retained memory of one traced run are written as JSON.
+
+With ``--compare`` the results are checked against an earlier results
+file, and the script exits with status 1 if a scenario got slower or
+bigger by more than ``--tolerance``, or makes more requests.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.fpl_api.const import BOOTSTRAP_FIELDS  # noqa: E402
+from custom_components.fpl_api.coordinator import (  # noqa: E402
+    FPLDataUpdateCoordinator,
+)
+from custom_components.fpl_api.fpl_mod import (  # noqa: E402
+    FPL,
+    BootstrapCache,
+    RequestScheduler,
+    SummaryCache,
+)
+
+from record import USER_ID, synthetic_season  # noqa: E402
+from replay import ReplaySession, load_recording  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+class Scenario:
+    """A piece of the pipeline to time.
+
+    ``setup`` runs once, untimed, ``prepare`` before every run, untimed,
+    and ``run`` is what is measured.
+    """
+
+    def __init__(self, name, run, setup=None, prepare=None):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.prepare = prepare
+
+
+def favourite_team(fpl):
+    """Returns the name of a team playing right now, so live scenarios have
+    something to follow, or of the first team otherwise."""
+    in_progress = fpl.fixtures_store.in_progress_gameweeks()
+    for fixture in fpl.fixtures_store.by_id.values():
+        if fixture["event"] in in_progress and not fixture["finished"]:
+            return fpl.teams[fixture["team_h"]]["name"]
+    return next(iter(fpl.teams.values()))["name"]
+
+
+async def make_client(hass, responses):
+    """Returns a replay session, and a client and coordinator using it the
+    way the integration sets them up."""
+    session = ReplaySession(responses)
+    fpl = FPL(
+        session,
+        bootstrap_cache=BootstrapCache(fields=BOOTSTRAP_FIELDS),
+        # The API's rate limit would only measure the token bucket
+        scheduler=RequestScheduler(rate=1e9, burst=1e9),
+    )
+    await fpl.async_init()
+    await fpl.load_fixtures()
+    coordinator = FPLDataUpdateCoordinator(
+        hass,
+        fpl,
+        fpl_email="replay@example.com",
+        fpl_password="replay",
+        fpl_user_id=USER_ID,
+        fav_team=favourite_team(fpl),
+    )
+    return session, fpl, coordinator
+
+
+def scenarios(fpl, coordinator):
+    async def reset_summaries():
+        fpl.summaries = SummaryCache()
+
+    async def reset_bootstrap():
+        fpl.bootstrap = BootstrapCache(fields=BOOTSTRAP_FIELDS)
+
+    async def fill_summaries():
+        await fpl.get_points_against()
+
+    async def seed_fdr():
+        await fpl.FDR(incremental=True)
+
+    async def warm_team():
+        await coordinator.scroll_day()
+        await coordinator.get_team()
+
+    async def first_refresh():
+        # Ticks run back to back here, ten seconds apart in production
+        fpl.fixtures_store.live_ttl = 0
+        await coordinator._async_update_data()
+
+    return [
+        Scenario("bootstrap", fpl.async_init, prepare=reset_bootstrap),
+        Scenario("scroll_day", coordinator.scroll_day),
+        Scenario(
+            "live_tick",
+            coordinator._async_update_data,
+            setup=first_refresh,
+        ),
+        Scenario("get_team", coordinator.get_team, setup=warm_team),
+        Scenario(
+            "points_against_cold", fpl.get_points_against, prepare=reset_summaries
+        ),
+        Scenario("fdr_warm", fpl.FDR, setup=fill_summaries),
+        Scenario("fdr_incremental", lambda: fpl.FDR(incremental=True), setup=seed_fdr),
+        Scenario("gameweeks_live", lambda: fpl.get_gameweeks(include_live=True)),
+    ]
+
+
+async def measure(scenario, session, runs):
+    """Runs a scenario and returns its measurements."""
+    if scenario.setup:
+        await scenario.setup()
+
+    times, requests, downloaded = [], [], []
+    for _ in range(runs):
+        if scenario.prepare:
+            await scenario.prepare()
+        session.reset_counters()
+        started = time.perf_counter()
+        await scenario.run()
+        times.append(time.perf_counter() - started)
+        requests.append(sum(session.requests.values()))
+        downloaded.append(session.bytes)
+
+    if scenario.prepare:
+        await scenario.prepare()
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        await scenario.run()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": runs,
+        "wall_ms": {
+            "min": min(times) * 1000,
+            "median": statistics.median(times) * 1000,
+            "max": max(times) * 1000,
+        },
+        "requests": statistics.mean(requests),
+        "bytes": statistics.mean(downloaded),
+        "alloc_peak_kb": (peak - baseline) / 1024,
+        "alloc_retained_kb": (current - baseline) / 1024,
+    }
+
+
+async def run_all(responses, runs, only):
+    config_dir = tempfile.mkdtemp()
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        # Before 2023.12 the config dir was set afterwards
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+
+    results = {}
+    session, fpl, coordinator = await make_client(hass, responses)
+    names = [scenario.name for scenario in scenarios(fpl, coordinator)]
+    await fpl.close()
+    for name in names:
+        if only and name not in only:
+            continue
+        # A fresh client per scenario, so caches only hold what its setup put there
+        session, fpl, coordinator = await make_client(hass, responses)
+        scenario = next(s for s in scenarios(fpl, coordinator) if s.name == name)
+        results[name] = await measure(scenario, session, runs)
+        await fpl.close()
+        print(
+            f"{name:<22}{results[name]['wall_ms']['median']:>10.1f} ms"
+            f"{results[name]['requests']:>8.0f} req"
+            f"{results[name]['bytes'] / 1024:>10.0f} KB"
+            f"{results[name]['alloc_peak_kb']:>10.0f} KB peak",
+            file=sys.stderr,
+        )
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the regressions of ``results`` against ``baseline``."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        checks = (
+            ("wall_ms", current["wall_ms"]["median"], previous["wall_ms"]["median"]),
+            ("alloc_peak_kb", current["alloc_peak_kb"], previous["alloc_peak_kb"]),
+            ("bytes", current["bytes"], previous["bytes"]),
+        )
+        for metric, new, old in checks:
+            if new > old * (1 + tolerance) and new - old > 1:
+                regressions.append(f"{name}: {metric} {old:.1f} -> {new:.1f}")
+        if current["requests"] > previous["requests"]:
+            regressions.append(
+                f"{name}: requests {previous['requests']:.0f}"
+                f" -> {current['requests']:.0f}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recording", help="A recording made with record.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scenario", action="append", help="Only run these")
+    parser.add_argument("--output", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Earlier results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    if args.recording:
+        responses = load_recording(args.recording, now)
+    else:
+        responses = {
+            url: [body.encode() for body in bodies]
+            for url, bodies in synthetic_season(now).items()
+        }
+
+    results = {
+        "version": RESULTS_VERSION,
+        "created": now.isoformat(),
+        "recording": args.recording or "synthetic",
+        "python": platform.python_version(),
+        "scenarios": asyncio.run(run_all(responses, args.runs, args.scenario)),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
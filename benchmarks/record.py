@@ -0,0 +1,537 @@
+"""
+Records FPL API responses for the benchmarks in this directory.
+
+    python benchmarks/record.py --user-id 91928 recording.json.gz
+    python benchmarks/record.py --synthetic recording.json.gz
+
+The first form records the live API: bootstrap-static, the fixtures, the
+live data of every gameweek, every player's element-summary and the given
+user's entry and picks. The current gameweek's fixtures and live data are
+recorded ``--polls`` times, ``--interval`` seconds apart, so a recording
+made during a match replays as one. ``my-team`` needs a login, so the
+public picks of the current gameweek are recorded in its place.
+
+The second form writes a synthetic season of the same shape and size, with
+a few matches in progress, and needs no network.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+import aiohttp
+from fpl.constants import API_URLS
+
+from replay import TIMESTAMP_FORMAT, save_recording
+
+TEAMS = (
+    "Arsenal",
+    "Aston Villa",
+    "Bournemouth",
+    "Brentford",
+    "Brighton",
+    "Chelsea",
+    "Crystal Palace",
+    "Everton",
+    "Fulham",
+    "Ipswich",
+    "Leicester",
+    "Liverpool",
+    "Man City",
+    "Man Utd",
+    "Newcastle",
+    "Nott'm Forest",
+    "Southampton",
+    "Spurs",
+    "West Ham",
+    "Wolves",
+)
+PLAYERS_PER_TEAM = 35
+CURRENT_GAMEWEEK = 20
+USER_ID = 1
+# Fixtures of the current gameweek: finished, in progress and to come
+FINISHED, LIVE = 4, 3
+
+FIXTURE_STATS = (
+    "goals_scored",
+    "assists",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bonus",
+    "bps",
+)
+HISTORY_STATS = (
+    "goals_scored",
+    "assists",
+    "clean_sheets",
+    "goals_conceded",
+    "own_goals",
+    "penalties_saved",
+    "penalties_missed",
+    "yellow_cards",
+    "red_cards",
+    "saves",
+    "bonus",
+    "bps",
+    "starts",
+)
+HISTORY_DECIMALS = (
+    "influence",
+    "creativity",
+    "threat",
+    "ict_index",
+    "expected_goals",
+    "expected_assists",
+    "expected_goal_involvements",
+    "expected_goals_conceded",
+)
+# bootstrap-static elements have about ninety fields
+ELEMENT_EXTRA_FIELDS = 70
+
+
+def timestamp(moment):
+    return moment.strftime(TIMESTAMP_FORMAT) + "Z"
+
+
+def schedule():
+    """Pairs the teams for a double round robin, as ``(home, away)`` team
+    IDs per gameweek."""
+    teams = list(range(1, len(TEAMS) + 1))
+    rounds = []
+    for _ in range(len(teams) - 1):
+        pairs = [(teams[i], teams[-1 - i]) for i in range(len(teams) // 2)]
+        rounds.append(pairs)
+        teams = [teams[0], teams[-1], *teams[1:-1]]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+def synthetic_season(now, polls=6, seed=1):
+    """Returns the responses of a synthetic season, by URL, as the API would
+    answer them ``polls`` times a minute apart, partway through the
+    current gameweek."""
+    rng = random.Random(seed)
+    responses = {}
+
+    elements = []
+    for team_index in range(len(TEAMS)):
+        for number in range(PLAYERS_PER_TEAM):
+            element_id = len(elements) + 1
+            element = {
+                "id": element_id,
+                "code": 100000 + element_id,
+                "first_name": f"First{element_id}",
+                "second_name": f"Second{element_id}",
+                "web_name": f"Player{element_id}",
+                "team": team_index + 1,
+                "team_code": team_index + 1,
+                "element_type": (1, 2, 2, 3, 3, 4)[number % 6] if number else 1,
+                "status": "a",
+                "now_cost": rng.randint(40, 130),
+                "total_points": 0,
+                "event_points": 0,
+                "minutes": 0,
+                "form": f"{rng.uniform(0, 10):.1f}",
+                "selected_by_percent": f"{rng.uniform(0, 60):.1f}",
+                "news": "",
+                "chance_of_playing_next_round": None,
+            }
+            for field in range(ELEMENT_EXTRA_FIELDS):
+                element[f"stat_{field}"] = rng.choice(
+                    (rng.randint(0, 2000), f"{rng.uniform(0, 100):.1f}", None, False)
+                )
+            elements.append(element)
+    by_team = {}
+    for element in elements:
+        by_team.setdefault(element["team"], []).append(element)
+
+    fixtures = []
+    for gameweek, pairs in enumerate(schedule(), 1):
+        for match, (home, away) in enumerate(pairs):
+            offset = gameweek - CURRENT_GAMEWEEK
+            if offset == 0 and match < FINISHED:
+                kickoff = now - timedelta(days=1, hours=match)
+            elif offset == 0 and match < FINISHED + LIVE:
+                kickoff = now - timedelta(minutes=30)
+            else:
+                kickoff = now + timedelta(weeks=offset, hours=2 + match)
+            fixtures.append(
+                {
+                    "id": len(fixtures) + 1,
+                    "code": 2400000 + len(fixtures),
+                    "event": gameweek,
+                    "kickoff_time": timestamp(kickoff),
+                    "team_h": home,
+                    "team_a": away,
+                    "team_h_difficulty": rng.randint(2, 5),
+                    "team_a_difficulty": rng.randint(2, 5),
+                    "pulse_id": 100000 + len(fixtures),
+                }
+            )
+
+    team_fixtures = {}
+    for fixture in fixtures:
+        for team in (fixture["team_h"], fixture["team_a"]):
+            team_fixtures.setdefault((fixture["event"], team), []).append(fixture)
+
+    history = {element["id"]: [] for element in elements}
+    live_stats = {}
+    for poll in range(polls):
+        # Every poll is a minute further into the matches in progress
+        fixture_rng = random.Random(seed)
+        for fixture in fixtures:
+            kickoff = datetime.strptime(
+                fixture["kickoff_time"], TIMESTAMP_FORMAT + "Z"
+            ).replace(tzinfo=timezone.utc)
+            played = (now - kickoff) // timedelta(minutes=1) + poll
+            started = played > 0
+            finished = played >= 115
+            minutes = max(0, min(90, played))
+            fixture.update(
+                {
+                    "started": started,
+                    "finished": finished,
+                    "finished_provisional": finished,
+                    "minutes": minutes,
+                    "provisional_start_time": False,
+                    "team_h_score": None,
+                    "team_a_score": None,
+                    "stats": [],
+                }
+            )
+            if not started:
+                continue
+
+            stats = {}
+            for side, team in (("h", fixture["team_h"]), ("a", fixture["team_a"])):
+                squad = by_team[team][:14]
+                for element in squad:
+                    key = (fixture["id"], element["id"])
+                    # Stats only ever grow during a match
+                    scored = fixture_rng.random() < 0.06 * minutes / 90
+                    stat = live_stats.setdefault(
+                        key, {"minutes": 0, "goals_scored": 0, "bps": 0}
+                    )
+                    stat["minutes"] = minutes if element in squad[:11] else 0
+                    stat["goals_scored"] = max(stat["goals_scored"], int(scored))
+                    stat["bps"] = max(stat["bps"], fixture_rng.randint(0, 30))
+                    for identifier in ("goals_scored", "bps"):
+                        if stat[identifier]:
+                            stats.setdefault(identifier, {"a": [], "h": []})[
+                                side
+                            ].append(
+                                {"value": stat[identifier], "element": element["id"]}
+                            )
+                goals = sum(
+                    live_stats[(fixture["id"], element["id"])]["goals_scored"]
+                    for element in squad
+                )
+                fixture[f"team_{side}_score"] = goals
+            fixture["stats"] = [
+                {"identifier": identifier, **stats.get(identifier, {"a": [], "h": []})}
+                for identifier in FIXTURE_STATS
+            ]
+
+        gameweek_fixtures = [
+            fixture for fixture in fixtures if fixture["event"] == CURRENT_GAMEWEEK
+        ]
+        responses.setdefault(
+            API_URLS["gameweek_fixtures"].format(CURRENT_GAMEWEEK), []
+        ).append(json.dumps(gameweek_fixtures))
+        responses.setdefault(API_URLS["fixtures"], []).append(json.dumps(fixtures))
+
+        for gameweek in range(1, 39):
+            if poll and gameweek != CURRENT_GAMEWEEK:
+                continue
+            live_elements = []
+            for element in elements if gameweek <= CURRENT_GAMEWEEK else ():
+                explain = []
+                totals = {"minutes": 0, "goals_scored": 0, "bps": 0, "total_points": 0}
+                for fixture in team_fixtures.get((gameweek, element["team"]), ()):
+                    stat = live_stats.get((fixture["id"], element["id"]))
+                    if stat is None:
+                        continue
+                    points = {
+                        "minutes": (2 if stat["minutes"] >= 60 else 1)
+                        if stat["minutes"]
+                        else 0,
+                        "goals_scored": 4 * stat["goals_scored"],
+                    }
+                    explain.append(
+                        {
+                            "fixture": fixture["id"],
+                            "stats": [
+                                {
+                                    "identifier": identifier,
+                                    "points": points[identifier],
+                                    "value": stat[identifier],
+                                }
+                                for identifier in points
+                            ],
+                        }
+                    )
+                    for identifier in ("minutes", "goals_scored", "bps"):
+                        totals[identifier] += stat[identifier]
+                    totals["total_points"] += sum(points.values())
+                live_elements.append(
+                    {
+                        "id": element["id"],
+                        "stats": {
+                            **{stat: 0 for stat in HISTORY_STATS},
+                            **totals,
+                            "bonus": 0,
+                        },
+                        "explain": explain,
+                    }
+                )
+            responses.setdefault(API_URLS["gameweek_live"].format(gameweek), []).append(
+                json.dumps({"elements": live_elements})
+            )
+
+    for fixture in fixtures:
+        if not fixture["finished"]:
+            continue
+        for side, team, opponent in (
+            ("h", fixture["team_h"], fixture["team_a"]),
+            ("a", fixture["team_a"], fixture["team_h"]),
+        ):
+            for element in by_team[team]:
+                stat = live_stats.get((fixture["id"], element["id"]), {})
+                minutes = stat.get("minutes", 0)
+                row = {
+                    "element": element["id"],
+                    "fixture": fixture["id"],
+                    "opponent_team": opponent,
+                    "total_points": (2 if minutes >= 60 else int(bool(minutes)))
+                    + 4 * stat.get("goals_scored", 0),
+                    "was_home": side == "h",
+                    "kickoff_time": fixture["kickoff_time"],
+                    "team_h_score": fixture["team_h_score"],
+                    "team_a_score": fixture["team_a_score"],
+                    "round": fixture["event"],
+                    "minutes": minutes,
+                }
+                for identifier in HISTORY_STATS:
+                    row[identifier] = stat.get(identifier, 0)
+                for identifier in HISTORY_DECIMALS:
+                    row[identifier] = f"{rng.uniform(0, 50):.1f}"
+                row.update(
+                    {
+                        "value": element["now_cost"],
+                        "transfers_balance": rng.randint(-5000, 5000),
+                        "selected": rng.randint(0, 500000),
+                        "transfers_in": rng.randint(0, 5000),
+                        "transfers_out": rng.randint(0, 5000),
+                    }
+                )
+                history[element["id"]].append(row)
+                element["total_points"] += row["total_points"]
+                element["minutes"] += minutes
+
+    upcoming = [fixture for fixture in fixtures if not fixture["started"]]
+    for element in elements:
+        upcoming_fixtures = [
+            {
+                "id": fixture["id"],
+                "event": fixture["event"],
+                "kickoff_time": fixture["kickoff_time"],
+                "team_h": fixture["team_h"],
+                "team_a": fixture["team_a"],
+                "is_home": fixture["team_h"] == element["team"],
+                "difficulty": fixture["team_h_difficulty"],
+            }
+            for fixture in upcoming
+            if element["team"] in (fixture["team_h"], fixture["team_a"])
+        ]
+        responses[API_URLS["player"].format(element["id"])] = [
+            json.dumps(
+                {
+                    "fixtures": upcoming_fixtures,
+                    "history": history[element["id"]],
+                    "history_past": [],
+                }
+            )
+        ]
+
+    events = []
+    for gameweek in range(1, 39):
+        first_kickoff = min(
+            fixture["kickoff_time"]
+            for fixture in fixtures
+            if fixture["event"] == gameweek
+        )
+        deadline = datetime.strptime(first_kickoff, TIMESTAMP_FORMAT + "Z")
+        events.append(
+            {
+                "id": gameweek,
+                "name": f"Gameweek {gameweek}",
+                "deadline_time": timestamp(deadline - timedelta(minutes=90)),
+                "average_entry_score": rng.randint(40, 70),
+                "finished": gameweek < CURRENT_GAMEWEEK,
+                "data_checked": gameweek < CURRENT_GAMEWEEK,
+                "highest_score": rng.randint(100, 150),
+                "is_previous": gameweek == CURRENT_GAMEWEEK - 1,
+                "is_current": gameweek == CURRENT_GAMEWEEK,
+                "is_next": gameweek == CURRENT_GAMEWEEK + 1,
+                "chip_plays": [
+                    {"chip_name": chip, "num_played": rng.randint(0, 500000)}
+                    for chip in ("bboost", "3xc", "freehit", "wildcard")
+                ],
+                "most_selected": rng.randint(1, len(elements)),
+                "top_element_info": {"id": rng.randint(1, len(elements)), "points": 20},
+            }
+        )
+
+    responses[API_URLS["static"]] = [
+        json.dumps(
+            {
+                "events": events,
+                "game_settings": {"league_join_private_max": 25, "squad_squadsize": 15},
+                "phases": [
+                    {"id": 1, "name": "Overall", "start_event": 1, "stop_event": 38}
+                ],
+                "teams": [
+                    {
+                        "id": index,
+                        "code": index,
+                        "name": name,
+                        "short_name": name[:3].upper(),
+                        "strength": rng.randint(2, 5),
+                        "pulse_id": index,
+                    }
+                    for index, name in enumerate(TEAMS, 1)
+                ],
+                "total_players": 10000000,
+                "elements": elements,
+                "element_stats": [
+                    {"label": identifier, "name": identifier}
+                    for identifier in HISTORY_STATS
+                ],
+                "element_types": [
+                    {
+                        "id": index,
+                        "plural_name": f"{name}s",
+                        "plural_name_short": name[:3].upper(),
+                        "singular_name": name,
+                        "singular_name_short": name[:3].upper(),
+                        "squad_select": select,
+                    }
+                    for index, (name, select) in enumerate(
+                        (
+                            ("Goalkeeper", 2),
+                            ("Defender", 5),
+                            ("Midfielder", 5),
+                            ("Forward", 3),
+                        ),
+                        1,
+                    )
+                ],
+            }
+        )
+    ]
+
+    # Players of the teams in progress, so a live tick has work to do
+    squad = [element["id"] for element in rng.sample(elements, 15)]
+    picks = [
+        {
+            "element": element_id,
+            "position": position,
+            "multiplier": (2 if position == 1 else 1) if position <= 11 else 0,
+            "is_captain": position == 1,
+            "is_vice_captain": position == 2,
+        }
+        for position, element_id in enumerate(squad, 1)
+    ]
+    responses[API_URLS["user_team"].format(USER_ID)] = [
+        json.dumps({"picks": picks, "chips": [], "transfers": {"limit": 1}})
+    ]
+    responses[API_URLS["user"].format(USER_ID)] = [
+        json.dumps(
+            {
+                "id": USER_ID,
+                "player_first_name": "Replay",
+                "player_last_name": "User",
+                "current_event": CURRENT_GAMEWEEK,
+                "summary_overall_points": 1200,
+                "summary_overall_rank": 123456,
+                "summary_event_points": 40,
+            }
+        )
+    ]
+    return responses
+
+
+async def record(user_id, polls, interval):
+    """Returns the responses of the live API, by URL."""
+    responses = {}
+    semaphore = asyncio.Semaphore(8)
+
+    async with aiohttp.ClientSession() as session:
+
+        async def get(url, record_as=None):
+            async with semaphore, session.get(url) as response:
+                response.raise_for_status()
+                body = await response.text()
+            responses.setdefault(record_as or url, []).append(body)
+            return json.loads(body)
+
+        static = await get(API_URLS["static"])
+        await get(API_URLS["fixtures"])
+        current = next(
+            (event["id"] for event in static["events"] if event["is_current"]), 1
+        )
+        await asyncio.gather(
+            get(API_URLS["user"].format(user_id)),
+            get(
+                API_URLS["user_picks"].format(user_id, current),
+                record_as=API_URLS["user_team"].format(user_id),
+            ),
+            *[
+                get(API_URLS["player"].format(element["id"]))
+                for element in static["elements"]
+            ],
+            *[
+                get(API_URLS["gameweek_live"].format(gameweek))
+                for gameweek in range(1, 39)
+                if gameweek != current
+            ],
+        )
+        for poll in range(polls):
+            if poll:
+                await asyncio.sleep(interval)
+            await asyncio.gather(
+                get(API_URLS["gameweek_fixtures"].format(current)),
+                get(API_URLS["gameweek_live"].format(current)),
+            )
+    return responses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("output", help="Where to write the gzipped recording")
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--user-id", type=int, default=USER_ID)
+    parser.add_argument("--polls", type=int, default=6)
+    parser.add_argument("--interval", type=float, default=60)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    if args.synthetic:
+        responses = synthetic_season(now, args.polls)
+    else:
+        responses = asyncio.run(record(args.user_id, args.polls, args.interval))
+    save_recording(args.output, responses, now)
+    print(
+        f"Recorded {sum(map(len, responses.values()))} responses "
+        f"of {len(responses)} URLs to {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
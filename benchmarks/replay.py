@@ -0,0 +1,169 @@
+"""
+Replays recorded FPL API responses to the integration, without a network.
+
+A recording maps every URL the client requested to the bodies it got back,
+in order. :class:`ReplaySession` stands in for the ``aiohttp.ClientSession``
+of :class:`FPL` and serves those bodies in turn, repeating the last one, so
+a recording of a few live polls plays back as a match in progress. It
+counts the requests and bytes served along the way.
+
+Timestamps in a recording are shifted so that it plays back as if it had
+been recorded just now: kickoffs, deadlines and "in progress" depend on the
+wall clock.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+from collections import Counter
+from datetime import datetime, timezone
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+TIMESTAMP = re.compile(rb'"(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(\.\d+)?Z"')
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Logged in as far as fpl.utils.logged_in is concerned
+LOGIN_URL = URL("https://users.premierleague.com/")
+
+
+def save_recording(path, responses, recorded_at=None):
+    """Writes a recording as gzipped JSON.
+
+    :param str path: Where to write the recording.
+    :param dict responses: Lists of response bodies (``str``), by URL.
+    :param datetime recorded_at: (optional) When the responses were
+        recorded, now by default.
+    """
+    recorded_at = recorded_at or datetime.now(timezone.utc)
+    with gzip.open(path, "wt", encoding="utf-8") as file:
+        json.dump(
+            {
+                "recorded_at": recorded_at.strftime(TIMESTAMP_FORMAT) + "Z",
+                "responses": responses,
+            },
+            file,
+        )
+
+
+def load_recording(path, now=None):
+    """Reads a recording, with its timestamps shifted to ``now``.
+
+    :rtype: dict
+    :return: Lists of response bodies (``bytes``), by URL.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        recording = json.load(file)
+    recorded_at = datetime.strptime(
+        recording["recorded_at"], TIMESTAMP_FORMAT + "Z"
+    ).replace(tzinfo=timezone.utc)
+    delta = (now or datetime.now(timezone.utc)) - recorded_at
+    return {
+        url: [shift_times(body.encode(), delta) for body in bodies]
+        for url, bodies in recording["responses"].items()
+    }
+
+
+def shift_times(body, delta):
+    """Moves every ISO 8601 UTC timestamp in a JSON body by ``delta``."""
+
+    def shift(match):
+        moved = datetime.strptime(match[1].decode(), TIMESTAMP_FORMAT) + delta
+        return b'"%s%sZ"' % (moved.strftime(TIMESTAMP_FORMAT).encode(), match[2] or b"")
+
+    return TIMESTAMP.sub(shift, body)
+
+
+class ReplayResponse:
+    """The part of ``aiohttp.ClientResponse`` that :class:`FPL` uses."""
+
+    def __init__(self, session, url, status, body, etag):
+        self._session = session
+        self.url = URL(url)
+        self.status = status
+        self._body = body
+        headers = CIMultiDict({"Content-Type": "application/json"})
+        if etag:
+            headers["ETag"] = etag
+        self.headers = CIMultiDictProxy(headers)
+        self.content = self
+
+    async def __aenter__(self):
+        if self._session.latency:
+            await asyncio.sleep(self._session.latency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(self.url, "GET", CIMultiDict(), self.url),
+                (),
+                status=self.status,
+                message="Not recorded" if self.status == 404 else "",
+            )
+
+    async def read(self):
+        return self._body
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
+
+
+class ReplaySession:
+    """Serves recorded responses in place of an ``aiohttp.ClientSession``.
+
+    URLs that weren't recorded get a 404, like the API answers for an
+    unknown ID. Conditional requests are answered with a 304 when the body
+    didn't change, so revalidation costs what it costs against the API.
+
+    :param dict responses: Lists of response bodies (``bytes``), by URL.
+    :param float latency: (optional) Seconds every response takes.
+    :param bool logged_in: (optional) Whether the session starts out with a
+        login cookie, so the client never tries to log in.
+    """
+
+    def __init__(self, responses, latency=0.0, logged_in=True):
+        self.responses = responses
+        self.latency = latency
+        self.cookie_jar = aiohttp.CookieJar()
+        if logged_in:
+            self.cookie_jar.update_cookies({"csrftoken": "replay"}, LOGIN_URL)
+        self.closed = False
+        self.requests = Counter()
+        self.bytes = 0
+        self._served = Counter()
+
+    def reset_counters(self):
+        """Clears the request and byte counts, e.g. between runs."""
+        self.requests = Counter()
+        self.bytes = 0
+
+    def get(self, url, headers=None, **kwargs):
+        url = str(url)
+        self.requests[url] += 1
+        bodies = self.responses.get(url)
+        if not bodies:
+            return ReplayResponse(self, url, 404, b"{}", None)
+
+        index = min(self._served[url], len(bodies) - 1)
+        self._served[url] += 1
+        body = bodies[index]
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        if headers and headers.get("If-None-Match") == etag:
+            return ReplayResponse(self, url, 304, b"", etag)
+
+        self.bytes += len(body)
+        return ReplayResponse(self, url, 200, body, etag)
+
+    async def close(self):
+        self.closed = True
@@ -0,0 +1,230 @@
+"""
+Soak test of many config entries polling the local FPL API stand-in.
+
+    python benchmarks/standin.py --speed 4 --errors 0.01 &
+    python benchmarks/soak.py --entries 50 --duration 7200 [--output soak.jsonl]
+
+Sets up ``--entries`` clients and coordinators the way the integration sets
+up config entries, each with its own session and user and all sharing the
+public data, pointed at the stand-in at ``--url``. Every coordinator
+refreshes every ``--interval`` seconds, ten by default, for ``--duration``
+seconds. With ``--serve`` the stand-in runs in this process instead.
+
+Every ``--report`` seconds the refresh latencies, the failed refreshes, the
+memory of the process and the requests the stand-in served per endpoint
+since the last report are printed, and written as a JSON line to
+``--output``. Memory that keeps growing over hours points at a leak, and
+requests per endpoint that keep growing at a steady state at lost caching.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.fpl_api import (  # noqa: E402
+    create_client,
+    create_public_data,
+)
+from custom_components.fpl_api.const import (  # noqa: E402
+    CONF_API_BASE_URL,
+    CONF_LOGIN_URL,
+)
+from custom_components.fpl_api.coordinator import (  # noqa: E402
+    FPLDataUpdateCoordinator,
+)
+
+from record import synthetic_season  # noqa: E402
+from standin import StandIn, serve  # noqa: E402
+
+
+def memory():
+    """Returns the resident memory of the process in MB, and the number of
+    blocks Python has allocated."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as file:
+            rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current, where /proc isn't available
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return rss / 2**20, sys.getallocatedblocks()
+
+
+class Entry:
+    """A simulated config entry and what its refreshes took."""
+
+    def __init__(self, number, coordinator):
+        self.number = number
+        self.coordinator = coordinator
+        self.latencies = []
+        self.failures = Counter()
+
+    async def poll(self, interval, until):
+        """Refreshes the coordinator every ``interval`` seconds."""
+        # Spread the entries over the interval, like entries set up one by one
+        await asyncio.sleep(interval * (self.number % 100) / 100)
+        next_refresh = time.monotonic()
+        while next_refresh < until:
+            started = time.monotonic()
+            try:
+                await self.coordinator._async_update_data()
+            except Exception as error:  # pylint: disable=broad-except
+                self.failures[type(error).__name__] += 1
+            self.latencies.append(time.monotonic() - started)
+            next_refresh += interval
+            await asyncio.sleep(max(0, next_refresh - time.monotonic()))
+
+    def take(self):
+        """Returns the latencies and failures since the last call."""
+        latencies, failures = self.latencies, self.failures
+        self.latencies, self.failures = [], Counter()
+        return latencies, failures
+
+
+async def report(entries, session, url, started, output):
+    """Prints and writes what happened since the last report."""
+    latencies, failures = [], Counter()
+    for entry in entries:
+        entry_latencies, entry_failures = entry.take()
+        latencies.extend(entry_latencies)
+        failures.update(entry_failures)
+    async with session.get(f"{url}/__stats__") as response:
+        served = await response.json()
+    async with session.post(f"{url}/__reset__"):
+        pass
+
+    rss, blocks = memory()
+    line = {
+        "elapsed": round(time.monotonic() - started),
+        "refreshes": len(latencies),
+        "failures": dict(failures),
+        "latency_ms": {
+            "median": statistics.median(latencies) * 1000 if latencies else None,
+            "p95": statistics.quantiles(latencies, n=20)[-1] * 1000
+            if len(latencies) > 1
+            else None,
+            "max": max(latencies) * 1000 if latencies else None,
+        },
+        "rss_mb": round(rss, 1),
+        "allocated_blocks": blocks,
+        "simulated_time": served["simulated_time"],
+        "requests": served["requests"],
+        "statuses": served["statuses"],
+        "bytes": served["bytes"],
+    }
+    latency = line["latency_ms"]
+    print(
+        f"{line['elapsed']:>7}s {line['refreshes']:>6} refreshes "
+        f"{sum(failures.values()):>4} failed "
+        f"{latency['median'] or 0:>8.1f} ms median {latency['p95'] or 0:>8.1f} ms p95 "
+        f"{line['rss_mb']:>8.1f} MB {sum(served['requests'].values()):>7} requests",
+        file=sys.stderr,
+    )
+    if output:
+        output.write(json.dumps(line) + "\n")
+        output.flush()
+
+
+async def soak(args):
+    config_dir = tempfile.mkdtemp()
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        # Before 2023.12 the config dir was set afterwards
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+
+    runner = None
+    if args.serve:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        standin = StandIn(
+            {
+                url: [body.encode() for body in bodies]
+                for url, bodies in synthetic_season(now).items()
+            },
+            speed=args.speed,
+        )
+        runner = await serve(standin, port=int(args.url.rsplit(":", 1)[-1]))
+
+    data = {
+        CONF_API_BASE_URL: f"{args.url}/api/",
+        CONF_LOGIN_URL: f"{args.url}/accounts/login/",
+    }
+    public = create_public_data()
+    entries = []
+    for number in range(args.entries):
+        fpl = create_client(data, public)
+        # Home Assistant retries the setup of an entry that isn't ready
+        while True:
+            try:
+                await fpl.async_init()
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                await asyncio.sleep(1)
+        teams = sorted(team["name"] for team in fpl.teams.values())
+        coordinator = FPLDataUpdateCoordinator(
+            hass,
+            fpl,
+            fpl_email=f"soak{number}@example.com",
+            fpl_password="soak",
+            fpl_user_id=number + 1,
+            fav_team=teams[number % len(teams)],
+        )
+        entries.append(Entry(number, coordinator))
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    started = time.monotonic()
+    until = started + args.duration
+    polls = [
+        asyncio.ensure_future(entry.poll(args.interval, until)) for entry in entries
+    ]
+    try:
+        async with aiohttp.ClientSession() as session:
+            while not all(poll.done() for poll in polls):
+                await asyncio.wait(polls, timeout=args.report)
+                await report(entries, session, args.url, started, output)
+    finally:
+        for poll in polls:
+            poll.cancel()
+        for entry in entries:
+            await entry.coordinator.fpl.close()
+        if output:
+            output.close()
+        if runner:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=3600)
+    parser.add_argument("--report", type=float, default=60)
+    parser.add_argument("--output", help="Where to write the reports as JSON lines")
+    parser.add_argument(
+        "--serve", action="store_true", help="Run the stand-in in this process"
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="Match speed with --serve"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(soak(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,746 @@
+"""
+A local stand-in for the FPL API, for load and soak testing.
+
+    python benchmarks/standin.py [--recording recording.json.gz] [--port 8000]
+        [--speed 1] [--latency 0.05] [--rate-limited 0.01] [--errors 0.01]
+
+Serves every endpoint of the API under ``/api/``, and the login under
+``/accounts/login/``, from a recording made with ``record.py`` or from a
+synthetic season. Point a client at it with
+``FPL(session, api_base_url="http://localhost:8000/api/",
+login_url="http://localhost:8000/accounts/login/")``, or a config entry at it
+with the ``api_base_url`` and ``login_url`` keys. Use ``localhost`` rather
+than an IP address, ``aiohttp`` doesn't keep cookies of IP addresses.
+
+The matches of the current gameweek are played out from their kickoff times:
+minutes, goals, BPS and points evolve through a match, and bonus points are
+awarded once it has finished. ``--speed`` plays them faster than real time.
+Every response is delayed by about ``--latency`` seconds, and a share of the
+requests is answered with a 429 or a 503. Logins expire after
+``--session-ttl`` seconds, if given.
+
+``GET /__stats__`` returns the requests served by endpoint and status, and
+``POST /__reset__`` clears the counts.
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import math
+import random
+import re
+import secrets
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+from yarl import URL
+
+from record import FIXTURE_STATS, HISTORY_STATS, synthetic_season, timestamp
+from replay import load_recording
+
+# Endpoints by the name of their URL in fpl.constants.API_URLS, as paths
+# below the API's base URL
+ENDPOINTS = tuple(
+    (name, re.compile(pattern))
+    for name, pattern in (
+        ("static", r"bootstrap-static/"),
+        ("dynamic", r"bootstrap-dynamic/"),
+        ("players", r"elements/"),
+        ("player", r"element-summary/(\d+)/"),
+        ("user", r"entry/(\d+)/"),
+        ("user_cup", r"entry/(\d+)/cup/"),
+        ("user_picks", r"entry/(\d+)/event/(\d+)/picks/"),
+        ("user_history", r"entry/(\d+)/history/"),
+        ("user_transfers", r"entry/(\d+)/transfers/"),
+        ("user_latest_transfers", r"entry/(\d+)/transfers-latest/"),
+        ("gameweeks", r"events/"),
+        ("gameweek_live", r"event/(\d+)/live/"),
+        ("gameweek_fixtures", r"fixtures/\?event=(\d+)"),
+        ("fixtures", r"fixtures/"),
+        ("settings", r"game-settings/"),
+        ("league_classic", r"leagues-classic/(\d+)/standings/(?:\?.*)?"),
+        ("league_h2h", r"leagues-h2h/(\d+)/standings/(?:\?.*)?"),
+        ("league_h2h_fixtures", r"leagues-h2h-matches/league/(\d+)/(?:\?.*)?"),
+        ("me", r"me/"),
+        ("user_team", r"my-team/(\d+)/"),
+        ("teams", r"teams/"),
+        ("transfers", r"transfers/"),
+        ("watchlist", r"watchlist/"),
+    )
+)
+AUTHENTICATED = frozenset(
+    ("me", "user_team", "league_classic", "league_h2h", "league_h2h_fixtures")
+)
+
+# Minutes after kickoff at which a match reaches half time, restarts, ends
+# and has its bonus points confirmed
+HALF_TIME = 45
+SECOND_HALF = 60
+FULL_TIME = 110
+FINISHED = 170
+
+LIVE_STATS = ("minutes", *HISTORY_STATS)
+GOAL_POINTS = {1: 10, 2: 6, 3: 5, 4: 4}
+CLEAN_SHEET_POINTS = {1: 4, 2: 4, 3: 1, 4: 0}
+GOAL_BPS = {1: 12, 2: 12, 3: 18, 4: 24}
+# How likely a goal is to be scored by a player of each position
+SCORING_WEIGHTS = {1: 1, 2: 1, 3: 3, 4: 5}
+
+
+def api_path(url):
+    """Returns the part of an API URL after ``/api/``, with a trailing slash
+    and the query string, the way :data:`ENDPOINTS` match it."""
+    url = URL(url)
+    path = url.path.split("/api/", 1)[-1].strip("/") + "/"
+    return f"{path}?{url.query_string}" if url.query_string else path
+
+
+def poisson(rng, mean):
+    """Draws from a Poisson distribution, for the number of goals or cards
+    in a match."""
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def match_minute(played):
+    """Returns the match clock ``played`` minutes after kickoff."""
+    if played <= HALF_TIME:
+        return max(0, played)
+    if played < SECOND_HALF:
+        return HALF_TIME
+    return min(90, played - SECOND_HALF + HALF_TIME)
+
+
+def points(stat, position):
+    """Returns a player's points in a fixture by identifier, as the live
+    endpoint explains them."""
+    explained = {
+        "minutes": (2 if stat["minutes"] >= 60 else 1) if stat["minutes"] else 0,
+        "goals_scored": GOAL_POINTS[position] * stat["goals_scored"],
+        "assists": 3 * stat["assists"],
+        "clean_sheets": CLEAN_SHEET_POINTS[position] * stat["clean_sheets"],
+        "goals_conceded": -(stat["goals_conceded"] // 2) if position <= 2 else 0,
+        "saves": stat["saves"] // 3,
+        "yellow_cards": -stat["yellow_cards"],
+        "bonus": stat["bonus"],
+    }
+    return {
+        identifier: value
+        for identifier, value in explained.items()
+        if identifier == "minutes" or stat[identifier]
+    }
+
+
+def bps(stat, position):
+    """Returns the BPS a player gets for their stats in a fixture, on top of
+    the general play drawn for them."""
+    return (
+        (6 if stat["minutes"] >= 60 else 3 if stat["minutes"] else 0)
+        + GOAL_BPS[position] * stat["goals_scored"]
+        + 9 * stat["assists"]
+        + (12 * stat["clean_sheets"] - 4 * stat["goals_conceded"]) * (position <= 2)
+        + 2 * stat["saves"]
+        - 3 * stat["yellow_cards"]
+    )
+
+
+class MatchSimulator:
+    """Plays out the matches of a gameweek from their kickoff times.
+
+    What happens in a match is drawn once per fixture from ``seed``, and the
+    state at a moment is what has happened up to then, so the data only
+    changes once a match minute and stats never go back.
+
+    :param dict static: ``bootstrap-static``.
+    :param list fixtures: Every fixture of the season.
+    :param int gameweek: The gameweek to play.
+    :param float speed: (optional) Match minutes per minute.
+    :param int seed: (optional) Seed of what happens in the matches.
+    """
+
+    def __init__(self, static, fixtures, gameweek, speed=1.0, seed=1):
+        self.gameweek = gameweek
+        self.speed = speed
+        self.seed = seed
+        self.fixtures = [
+            fixture
+            for fixture in fixtures
+            if fixture["event"] == gameweek and fixture["kickoff_time"]
+        ]
+        self.kickoffs = {
+            fixture["id"]: datetime.fromisoformat(
+                fixture["kickoff_time"].replace("Z", "+00:00")
+            )
+            for fixture in self.fixtures
+        }
+        self.positions = {
+            element["id"]: element["element_type"] for element in static["elements"]
+        }
+        self.squads = {}
+        for element in sorted(static["elements"], key=lambda element: element["id"]):
+            self.squads.setdefault(element["team"], []).append(element["id"])
+        self._plans = {}
+        self._started = (datetime.now(timezone.utc), time.monotonic())
+
+    def now(self):
+        """Returns the simulated time."""
+        started, monotonic = self._started
+        elapsed = (time.monotonic() - monotonic) * self.speed
+        return started + timedelta(seconds=elapsed)
+
+    def play(self, now):
+        """Returns the fixtures with the minutes played since their kickoff,
+        negative before it."""
+        return [
+            (fixture, (now - self.kickoffs[fixture["id"]]) // timedelta(minutes=1))
+            for fixture in self.fixtures
+        ]
+
+    def state(self, now):
+        """Returns a key that changes whenever the data of a fixture does."""
+        return tuple(min(max(played, -1), FINISHED) for _, played in self.play(now))
+
+    def _lineup(self, team):
+        """A goalkeeper and ten outfield players of a team."""
+        squad = self.squads.get(team, [])
+        keepers = [element for element in squad if self.positions[element] == 1]
+        outfield = [element for element in squad if self.positions[element] != 1]
+        return keepers[:1] + outfield[:10]
+
+    def _plan(self, fixture):
+        """Returns the lineups of a fixture, and what happens in it as
+        ``(minute, side, element, identifier, value)`` in order."""
+        plan = self._plans.get(fixture["id"])
+        if plan is not None:
+            return plan
+
+        rng = random.Random(f"{self.seed}:{fixture['id']}")
+        lineups = {
+            "h": self._lineup(fixture["team_h"]),
+            "a": self._lineup(fixture["team_a"]),
+        }
+        events = []
+        for side, lineup in lineups.items():
+            if len(lineup) < 2:
+                continue
+            keeper, outfield = lineup[0], lineup[1:]
+            weights = [SCORING_WEIGHTS[self.positions[element]] for element in outfield]
+            for _ in range(poisson(rng, 1.4)):
+                minute = rng.randint(1, 90)
+                scorer = rng.choices(outfield, weights)[0]
+                events.append((minute, side, scorer, "goals_scored", 1))
+                if rng.random() < 0.7:
+                    assister = rng.choice([e for e in outfield if e != scorer])
+                    events.append((minute, side, assister, "assists", 1))
+            for _ in range(poisson(rng, 1.5)):
+                events.append(
+                    (rng.randint(1, 90), side, rng.choice(outfield), "yellow_cards", 1)
+                )
+            for _ in range(poisson(rng, 3.0)):
+                events.append((rng.randint(1, 90), side, keeper, "saves", 1))
+            # Everything else a player does adds to their BPS bit by bit
+            for element in lineup:
+                for _ in range(rng.randint(2, 8)):
+                    events.append(
+                        (rng.randint(1, 90), side, element, "bps", rng.randint(1, 3))
+                    )
+        events.sort()
+        plan = self._plans[fixture["id"]] = (lineups, events)
+        return plan
+
+    def stats(self, fixture, played):
+        """Returns the stats of the players of a fixture by element, and the
+        goals of either side, ``played`` minutes after its kickoff."""
+        lineups, events = self._plan(fixture)
+        minute = match_minute(played)
+        stats = {
+            element: {**dict.fromkeys(LIVE_STATS, 0), "starts": 1}
+            for lineup in lineups.values()
+            for element in lineup
+        }
+        goals = {"h": 0, "a": 0}
+        for event_minute, side, element, identifier, value in events:
+            if event_minute > minute:
+                break
+            stats[element][identifier] += value
+            if identifier == "goals_scored":
+                goals[side] += value
+
+        for side, lineup in lineups.items():
+            conceded = goals["a" if side == "h" else "h"]
+            for element in lineup:
+                stat = stats[element]
+                stat["minutes"] = minute
+                stat["goals_conceded"] = conceded
+                stat["clean_sheets"] = int(minute >= 60 and not conceded)
+                stat["bps"] += bps(stat, self.positions[element])
+        if played >= FINISHED:
+            ranked = sorted(
+                stats, key=lambda element: (-stats[element]["bps"], element)
+            )
+            for bonus, element in zip((3, 2, 1), ranked):
+                stats[element]["bonus"] = bonus
+        for element, stat in stats.items():
+            stat["total_points"] = sum(points(stat, self.positions[element]).values())
+        return stats, goals
+
+    def fixture(self, fixture, played):
+        """Returns ``fixture`` as the API has it ``played`` minutes after
+        its kickoff."""
+        simulated = {
+            **fixture,
+            "started": played >= 0,
+            "finished": played >= FINISHED,
+            "finished_provisional": played >= FULL_TIME,
+            "minutes": match_minute(played),
+            "team_h_score": None,
+            "team_a_score": None,
+            "stats": [],
+        }
+        if played < 0:
+            return simulated
+
+        stats, goals = self.stats(fixture, played)
+        lineups, _ = self._plan(fixture)
+        simulated["team_h_score"] = goals["h"]
+        simulated["team_a_score"] = goals["a"]
+        simulated["stats"] = [
+            {
+                "identifier": identifier,
+                **{
+                    side: [
+                        {"value": stats[element][identifier], "element": element}
+                        for element in sorted(
+                            lineup, key=lambda element: -stats[element][identifier]
+                        )
+                        if stats[element][identifier]
+                    ]
+                    for side, lineup in lineups.items()
+                },
+            }
+            for identifier in FIXTURE_STATS
+        ]
+        return simulated
+
+    def fixtures_at(self, now, fixtures):
+        """Returns ``fixtures`` with those of the gameweek played out to
+        ``now``."""
+        simulated = {
+            fixture["id"]: self.fixture(fixture, played)
+            for fixture, played in self.play(now)
+        }
+        return [simulated.get(fixture["id"], fixture) for fixture in fixtures]
+
+    def live(self, now):
+        """Returns the live data of the gameweek at ``now``."""
+        played_in = {}
+        for fixture, played in self.play(now):
+            if played < 0:
+                continue
+            stats, _ = self.stats(fixture, played)
+            for element, stat in stats.items():
+                played_in.setdefault(element, []).append((fixture["id"], stat))
+
+        elements = []
+        for element, position in self.positions.items():
+            totals = dict.fromkeys((*LIVE_STATS, "total_points"), 0)
+            explain = []
+            for fixture_id, stat in played_in.get(element, ()):
+                for identifier in totals:
+                    totals[identifier] += stat[identifier]
+                explain.append(
+                    {
+                        "fixture": fixture_id,
+                        "stats": [
+                            {
+                                "identifier": identifier,
+                                "points": value,
+                                "value": stat[identifier],
+                            }
+                            for identifier, value in points(stat, position).items()
+                        ],
+                    }
+                )
+            elements.append({"id": element, "stats": totals, "explain": explain})
+        return {"elements": elements}
+
+
+class Document:
+    """A response body with its ETag, and gzipped when asked for."""
+
+    __slots__ = ("body", "etag", "_gzipped")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        self._gzipped = None
+
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=5)
+        return self._gzipped
+
+
+class StandIn:
+    """Serves the FPL API from recorded or synthetic responses.
+
+    :param dict responses: Lists of response bodies (``bytes``), by URL, as
+        ``load_recording`` returns them.
+    :param bool simulate: (optional) Whether to play out the matches of the
+        current gameweek, rather than replay the recorded polls.
+    :param float speed: (optional) How much faster than real time matches
+        are played, and recorded polls replayed.
+    :param float poll_interval: (optional) Seconds between the recorded
+        polls.
+    :param float latency: (optional) Mean seconds a response takes.
+    :param float rate_limited: (optional) Share of requests answered with a
+        429.
+    :param float errors: (optional) Share of requests answered with a 503.
+    :param float session_ttl: (optional) Seconds a login lasts, for ever by
+        default.
+    :param int seed: (optional) Seed of the matches and the injected faults.
+    """
+
+    def __init__(
+        self,
+        responses,
+        simulate=True,
+        speed=1.0,
+        poll_interval=60.0,
+        latency=0.0,
+        rate_limited=0.0,
+        errors=0.0,
+        session_ttl=None,
+        seed=1,
+    ):
+        self.recorded = {api_path(url): bodies for url, bodies in responses.items()}
+        self.static = json.loads(self.recorded["bootstrap-static/"][-1])
+        self.current_gameweek = next(
+            (event["id"] for event in self.static["events"] if event["is_current"]),
+            1,
+        )
+        if "fixtures/" in self.recorded:
+            self.fixtures = json.loads(self.recorded["fixtures/"][-1])
+        else:
+            self.fixtures = [
+                fixture
+                for path, bodies in self.recorded.items()
+                if path.startswith("fixtures/?event=")
+                for fixture in json.loads(bodies[-1])
+            ]
+        self.simulator = (
+            MatchSimulator(
+                self.static, self.fixtures, self.current_gameweek, speed, seed
+            )
+            if simulate
+            else None
+        )
+        self.speed = speed
+        self.poll_interval = poll_interval
+        self.latency = latency
+        self.rate_limited = rate_limited
+        self.errors = errors
+        self.session_ttl = session_ttl
+        self.rng = random.Random(seed)
+        self.started = time.monotonic()
+        self.sessions = {}
+        self._documents = {}
+        self._simulated = {}
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.requests = Counter()
+        self.statuses = {}
+        self.bytes = 0
+
+    def stats(self):
+        """Returns the requests served since the counters were reset."""
+        return {
+            "uptime": time.monotonic() - self.started,
+            "simulated_time": timestamp(self.simulator.now())
+            if self.simulator
+            else None,
+            "requests": dict(self.requests),
+            "statuses": {
+                endpoint: dict(statuses) for endpoint, statuses in self.statuses.items()
+            },
+            "bytes": self.bytes,
+            "sessions": len(self.sessions),
+        }
+
+    def app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/api/{path:.*}", self.handle_api)
+        app.router.add_post("/accounts/login/", self.handle_login)
+        app.router.add_get("/a/login", self.handle_login_redirect)
+        app.router.add_get("/__stats__", self.handle_stats)
+        app.router.add_post("/__reset__", self.handle_reset)
+        return app
+
+    def endpoint(self, request):
+        """Returns the name of the endpoint of a request."""
+        if request.path == "/accounts/login/":
+            return "login"
+        if not request.path.startswith("/api/"):
+            return None
+        path = api_path(request.url)
+        for name, pattern in ENDPOINTS:
+            if pattern.fullmatch(path):
+                return name
+        return "unknown"
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        endpoint = self.endpoint(request)
+        if endpoint is None:
+            return await handler(request)
+
+        self.requests[endpoint] += 1
+        statuses = self.statuses.setdefault(endpoint, Counter())
+        if self.latency:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.latency)
+        draw = self.rng.random()
+        if draw < self.rate_limited:
+            statuses[429] += 1
+            return web.json_response(
+                {"detail": "Request was throttled."},
+                status=429,
+                headers={"Retry-After": "1"},
+            )
+        if draw < self.rate_limited + self.errors:
+            statuses[503] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        try:
+            response = await handler(request)
+        except web.HTTPException as error:
+            statuses[error.status] += 1
+            raise
+        statuses[response.status] += 1
+        return response
+
+    def logged_in(self, request):
+        issued = self.sessions.get(request.cookies.get("csrftoken"))
+        if issued is None:
+            return False
+        return not self.session_ttl or time.monotonic() - issued < self.session_ttl
+
+    async def handle_login(self, request):
+        form = await request.post()
+        if not form.get("login") or not form.get("password"):
+            raise web.HTTPFound("/a/login?state=fail&reason=credentials")
+        token = secrets.token_hex(16)
+        self.sessions[token] = time.monotonic()
+        response = web.HTTPFound("/a/login?state=success")
+        response.set_cookie("csrftoken", token)
+        raise response
+
+    async def handle_login_redirect(self, request):
+        return web.Response(text=request.query.get("state", ""))
+
+    async def handle_stats(self, request):
+        return web.json_response(self.stats())
+
+    async def handle_reset(self, request):
+        self.reset_counters()
+        return web.json_response({})
+
+    async def handle_api(self, request):
+        endpoint = self.endpoint(request)
+        if endpoint in AUTHENTICATED and not self.logged_in(request):
+            return web.json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status=403,
+            )
+        document = self.document(endpoint, api_path(request.url))
+        if document is None:
+            return web.json_response({"detail": "Not found."}, status=404)
+        if request.headers.get("If-None-Match") == document.etag:
+            return web.Response(status=304, headers={"ETag": document.etag})
+
+        headers = {"ETag": document.etag, "Content-Type": "application/json"}
+        body = document.body
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = document.gzipped()
+            headers["Content-Encoding"] = "gzip"
+        self.bytes += len(body)
+        return web.Response(body=body, headers=headers)
+
+    def document(self, endpoint, path):
+        """Returns what to serve for a path, or None for a 404."""
+        number = re.search(r"\d+", path)
+        number = int(number[0]) if number else None
+        if self.simulator is not None and (
+            endpoint == "fixtures"
+            or (
+                endpoint in ("gameweek_fixtures", "gameweek_live")
+                and number == self.current_gameweek
+            )
+        ):
+            return self.simulated(endpoint)
+
+        bodies = self.recorded.get(path)
+        if bodies:
+            elapsed = (time.monotonic() - self.started) * self.speed
+            body = bodies[min(int(elapsed / self.poll_interval), len(bodies) - 1)]
+            document = self._documents.get(path)
+            if document is None or document.body is not body:
+                document = self._documents[path] = Document(body)
+            return document
+
+        document = self._documents.get(path)
+        if document is None:
+            derived = self.derive(endpoint, path, number)
+            if derived is None:
+                return None
+            document = self._documents[path] = Document(json.dumps(derived).encode())
+        return document
+
+    def simulated(self, endpoint):
+        """Returns the simulated fixtures or live data, made once per change."""
+        now = self.simulator.now()
+        key = (endpoint, self.simulator.state(now))
+        document = self._simulated.get(endpoint)
+        if document is None or document[0] != key:
+            if endpoint == "gameweek_live":
+                body = self.simulator.live(now)
+            else:
+                fixtures = self.simulator.fixtures_at(now, self.fixtures)
+                if endpoint == "gameweek_fixtures":
+                    fixtures = [
+                        fixture
+                        for fixture in fixtures
+                        if fixture["event"] == self.current_gameweek
+                    ]
+                body = fixtures
+            document = self._simulated[endpoint] = (
+                key,
+                Document(json.dumps(body).encode()),
+            )
+        return document[1]
+
+    def derive(self, endpoint, path, number):
+        """Returns a response for what wasn't recorded, made up from
+        ``bootstrap-static`` or empty, or None for a 404."""
+        static = self.static
+        if endpoint == "players":
+            return static["elements"]
+        if endpoint == "teams":
+            return static["teams"]
+        if endpoint == "gameweeks":
+            return static["events"]
+        if endpoint == "settings":
+            return {"game_settings": static.get("game_settings", {})}
+        if endpoint == "dynamic":
+            return {"events": [], "now": timestamp(datetime.now(timezone.utc))}
+        if endpoint == "gameweek_fixtures":
+            return [fixture for fixture in self.fixtures if fixture["event"] == number]
+        if endpoint == "gameweek_live":
+            return {"elements": []} if 0 < number <= 38 else None
+        if endpoint == "player":
+            if not any(element["id"] == number for element in static["elements"]):
+                return None
+            return {"fixtures": [], "history": [], "history_past": []}
+        if endpoint == "user":
+            return {
+                "id": number,
+                "player_first_name": "Stand",
+                "player_last_name": f"In {number}",
+                "current_event": self.current_gameweek,
+                "summary_overall_points": 0,
+                "summary_overall_rank": number,
+                "summary_event_points": 0,
+            }
+        if endpoint in ("user_team", "user_picks"):
+            return {"picks": self.picks(number), "chips": [], "transfers": {}}
+        if endpoint == "me":
+            return {"player": {"entry": 1}, "watched": []}
+        if endpoint == "user_history":
+            return {"current": [], "past": [], "chips": []}
+        if endpoint == "user_cup":
+            return {"cup_matches": [], "cup_status": {}}
+        if endpoint in ("user_transfers", "user_latest_transfers", "transfers"):
+            return []
+        if endpoint == "watchlist":
+            return []
+        if endpoint in ("league_classic", "league_h2h"):
+            return {
+                "league": {"id": number, "name": f"League {number}"},
+                "standings": {"has_next": False, "page": 1, "results": []},
+            }
+        if endpoint == "league_h2h_fixtures":
+            return {"has_next": False, "page": 1, "results": []}
+        return None
+
+    def picks(self, user_id):
+        """Returns a squad of fifteen for a user, the same every time."""
+        elements = self.static["elements"]
+        squad = random.Random(user_id).sample(elements, min(15, len(elements)))
+        return [
+            {
+                "element": element["id"],
+                "position": position,
+                "multiplier": (2 if position == 1 else 1) if position <= 11 else 0,
+                "is_captain": position == 1,
+                "is_vice_captain": position == 2,
+            }
+            for position, element in enumerate(squad, 1)
+        ]
+
+
+async def serve(standin, host="localhost", port=8000):
+    """Starts serving ``standin``, and returns the runner to clean it up."""
+    runner = web.AppRunner(standin.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--recording", help="A recording made with record.py")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Replay the recorded polls instead of playing out the matches",
+    )
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--poll-interval", type=float, default=60.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--rate-limited", type=float, default=0.0)
+    parser.add_argument("--errors", type=float, default=0.0)
+    parser.add_argument("--session-ttl", type=float)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    if args.recording:
+        responses = load_recording(args.recording, now)
+    else:
+        responses = {
+            url: [body.encode() for body in bodies]
+            for url, bodies in synthetic_season(now, seed=args.seed).items()
+        }
+    standin = StandIn(
+        responses,
+        simulate=not args.replay,
+        speed=args.speed,
+        poll_interval=args.poll_interval,
+        latency=args.latency,
+        rate_limited=args.rate_limited,
+        errors=args.errors,
+        session_ttl=args.session_ttl,
+        seed=args.seed,
+    )
+    web.run_app(standin.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,13 +2,51 @@
 import asyncio
 import logging
 
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryNotReady
 from datetime import timedelta
-from .sensor import FPLSensor
+from .fpl_mod import (
+    API_BASE_URL,
+    FPL,
+    LOGIN_URL,
+    BootstrapCache,
+    FixturesStore,
+    LiveStore,
+    PublicData,
+    RequestScheduler,
+    SummaryCache,
+    create_session,
+)
+from .coordinator import FPLDataUpdateCoordinator
+from .storage import FPLAuthStore, FPLSnapshotStore, snapshot_name
 
-from .const import DOMAIN
+from .const import (
+    ATTR_COUNT,
+    BOOTSTRAP_FIELDS,
+    BOOTSTRAP_TTL,
+    CONF_API_BASE_URL,
+    CONF_LOGIN_URL,
+    CONNECTOR_DNS_CACHE_TTL,
+    CONNECTOR_KEEPALIVE_TIMEOUT,
+    CONNECTOR_LIMIT,
+    CONNECTOR_LIMIT_PER_HOST,
+    DATA_PUBLIC,
+    DATA_SNAPSHOTS,
+    DOMAIN,
+    FIXTURES_TTL,
+    LIVE_ELEMENTS_TTL,
+    LIVE_FIXTURES_TTL,
+    MAX_CONCURRENT_REQUESTS,
+    REQUEST_RATE_BURST,
+    REQUEST_RATE_LIMIT,
+    REQUEST_TIMEOUT,
+    SERVICE_PROFILE,
+    SUMMARY_CACHE_SIZE,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,20 +57,145 @@ MIN_TIME_BETWEEN_UPDATES = timedelta(seconds=10)
 
 async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the Fantasy Premier League component."""
-    hass.data[DOMAIN] = {}
+    # Entries poll the same public endpoints, so they share the public data
+    hass.data[DOMAIN] = {DATA_PUBLIC: {}, DATA_SNAPSHOTS: {}}
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile the next refreshes of every entry, starting right away."""
+        for coordinator in hass.data[DOMAIN].values():
+            if isinstance(coordinator, FPLDataUpdateCoordinator):
+                coordinator.profiler.start(call.data[ATTR_COUNT])
+                await coordinator.async_request_refresh()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=vol.Schema(
+            {
+                vol.Optional(ATTR_COUNT, default=1): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=100)
+                )
+            }
+        ),
+    )
     return True
 
 
+def create_public_data():
+    """Returns the public data to share between the entries using one API."""
+    return PublicData(
+        bootstrap_cache=BootstrapCache(ttl=BOOTSTRAP_TTL, fields=BOOTSTRAP_FIELDS),
+        summary_cache=SummaryCache(maxsize=SUMMARY_CACHE_SIZE),
+        fixtures_store=FixturesStore(ttl=FIXTURES_TTL, live_ttl=LIVE_FIXTURES_TTL),
+        live_store=LiveStore(ttl=LIVE_ELEMENTS_TTL),
+        scheduler=RequestScheduler(
+            max_concurrency=MAX_CONCURRENT_REQUESTS,
+            rate=REQUEST_RATE_LIMIT,
+            burst=REQUEST_RATE_BURST,
+            timeout=REQUEST_TIMEOUT,
+        ),
+    )
+
+
+def create_client(data, public):
+    """Returns the FPL client of a config entry with ``data``, sharing the
+    ``public`` data with the other entries."""
+    return FPL(
+        create_session(
+            limit=CONNECTOR_LIMIT,
+            limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+            keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=CONNECTOR_DNS_CACHE_TTL,
+        ),
+        bootstrap_cache=public.bootstrap,
+        scheduler=public.scheduler,
+        summary_cache=public.summaries,
+        coalescer=public.coalescer,
+        fixtures_store=public.fixtures,
+        live_store=public.live,
+        timeout=REQUEST_TIMEOUT,
+        api_base_url=data.get(CONF_API_BASE_URL, API_BASE_URL),
+        login_url=data.get(CONF_LOGIN_URL, LOGIN_URL),
+    )
+
+
+def acquire_public_data(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the public data and its snapshot store for the API of an
+    entry, created by the first entry using that API."""
+    api_base_url = entry.data.get(CONF_API_BASE_URL, API_BASE_URL)
+    public = hass.data[DOMAIN][DATA_PUBLIC].get(api_base_url)
+    if public is None:
+        public = hass.data[DOMAIN][DATA_PUBLIC][api_base_url] = create_public_data()
+        hass.data[DOMAIN][DATA_SNAPSHOTS][api_base_url] = FPLSnapshotStore(
+            hass, snapshot_name(api_base_url)
+        )
+    public.references.add(entry.entry_id)
+    return public, hass.data[DOMAIN][DATA_SNAPSHOTS][api_base_url]
+
+
+def release_public_data(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the public data of the API of an entry with its last entry."""
+    api_base_url = entry.data.get(CONF_API_BASE_URL, API_BASE_URL)
+    public = hass.data[DOMAIN][DATA_PUBLIC][api_base_url]
+    public.references.discard(entry.entry_id)
+    if not public.references:
+        del hass.data[DOMAIN][DATA_PUBLIC][api_base_url]
+        del hass.data[DOMAIN][DATA_SNAPSHOTS][api_base_url]
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up FPL Api from a config entry."""
-    session = async_create_clientsession(hass)
+    public, snapshot_store = acquire_public_data(hass, entry)
+    fpl = create_client(entry.data, public)
+
+    async def _async_close_client(event):
+        await fpl.close()
+
+    entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close_client)
+    )
     fpl_email = entry.data["fpl_email"] if "fpl_email" in entry.data else None
     fpl_password = entry.data["fpl_password"] if "fpl_password" in entry.data else None
     fpl_user_id = entry.data["fpl_user_id"] if "fpl_user_id" in entry.data else None
     fav_team = entry.data["fav_team"] if "fav_team" in entry.data else None
-    hass.data[DOMAIN][entry.entry_id] = FPLSensor(
-        hass, session, fpl_email, fpl_password, fpl_user_id, fav_team
+    coordinator = FPLDataUpdateCoordinator(
+        hass,
+        fpl,
+        fpl_email,
+        fpl_password,
+        fpl_user_id,
+        fav_team,
+        snapshot_store=snapshot_store,
+        auth_store=FPLAuthStore(hass, entry.entry_id),
     )
+
+    # Reuse the session of the last login while its cookies are valid
+    cookies = await coordinator.auth_store.async_load()
+    if cookies:
+        fpl.restore_cookies(cookies)
+
+    # Come up with the last known state and refresh it in the background,
+    # without a snapshot the entry waits for the first refresh
+    snapshot = await coordinator.snapshot_store.async_load()
+    restored = False
+    if snapshot:
+        try:
+            await coordinator.async_restore(snapshot)
+            restored = True
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Ignoring unusable FPL snapshot", exc_info=True)
+    if restored:
+        hass.async_create_task(coordinator.async_refresh())
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            await fpl.close()
+            release_public_data(hass, entry)
+            raise
+
+    hass.data[DOMAIN][entry.entry_id] = coordinator
     for component in PLATFORMS:
         hass.async_create_task(
             hass.config_entries.async_forward_entry_setup(entry, component)
@@ -51,6 +214,23 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
         )
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.fpl.close()
+        release_public_data(hass, entry)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored cookies of a deleted config entry, and the snapshot
+    of its API unless another entry uses it."""
+    api_base_url = entry.data.get(CONF_API_BASE_URL, API_BASE_URL)
+    if not any(
+        other.entry_id != entry.entry_id
+        and other.data.get(CONF_API_BASE_URL, API_BASE_URL) == api_base_url
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        await FPLSnapshotStore(hass, snapshot_name(api_base_url)).async_remove()
+    # Snapshots used to be kept per entry
+    await FPLSnapshotStore(hass, entry.entry_id).async_remove()
+    await FPLAuthStore(hass, entry.entry_id).async_remove()
@@ -0,0 +1,233 @@
+"""
+Streaming, field-selective parsing of ``bootstrap-static``.
+
+The document is a single object of sections, most of them lists of records
+with an ``id``. Parsed with ``json.loads`` the whole body, its decoded text
+and every field of every record are alive at once, while the integration
+only reads a handful of sections and fields. :class:`StaticParser` is fed
+the body chunk by chunk as it arrives, decodes one record at a time and
+keeps only the wanted fields, building the id-keyed sections on the way.
+"""
+import codecs
+import json
+from json.decoder import WHITESPACE
+
+_decoder = json.JSONDecoder()
+
+
+def key_by_id(static):
+    """Turns the lists of records with an ``id`` in a ``bootstrap-static``
+    document into dicts keyed by that ``id``. Other values are kept as is.
+
+    :param dict static: The decoded ``bootstrap-static`` document.
+    :rtype: dict
+    """
+    keyed = {}
+    for section, value in static.items():
+        try:
+            value = {record["id"]: record for record in value}
+        except (KeyError, TypeError):
+            pass
+        keyed[section] = value
+    return keyed
+
+
+class StaticParser:
+    """Incremental parser of a ``bootstrap-static`` body.
+
+    Only the sections in ``fields`` are kept, every other section is decoded
+    a record at a time and dropped. A section mapped to ``None`` keeps its
+    records whole, otherwise only the listed fields of each record are kept.
+    The result is the same as ``key_by_id(json.loads(body))`` restricted to
+    those sections and fields.
+
+    :param dict fields: The fields to keep, by section.
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.sections = {}
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self._buffer = ""
+        self._pos = 0
+        self._pending = []
+        self._pending_size = 0
+        # Characters needed before parsing is worth another try, doubled
+        # every time a record turns out to be incomplete
+        self._wait = 0
+        self._done = False
+        # Where in the document the parser is: "start", "key", "colon",
+        # "value", "item", "next_item", "next_key" or "end"
+        self._state = "start"
+        self._section = None
+
+    def feed(self, data):
+        """Parses as much of the body as possible, given its next chunk.
+
+        :param bytes data: The next chunk of the body.
+        """
+        text = self._decode(data)
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if len(self._buffer) - self._pos + self._pending_size < self._wait:
+            return
+        self._flush()
+        self._parse()
+
+    def close(self):
+        """Parses the rest of the body and returns the kept sections.
+
+        :raises ValueError: The body isn't a complete JSON object.
+        :rtype: dict
+        """
+        self._pending.append(self._decode(b"", final=True))
+        self._flush()
+        self._done = True
+        self._parse()
+        if self._state != "end":
+            raise ValueError("Incomplete bootstrap-static document")
+        if self._buffer[self._pos :].strip():
+            raise ValueError("Extra data after bootstrap-static document")
+        return self.sections
+
+    def _flush(self):
+        self._buffer = "".join((self._buffer[self._pos :], *self._pending))
+        self._pos = 0
+        self._pending = []
+        self._pending_size = 0
+        self._wait = 0
+
+    def _value(self):
+        """Decodes the JSON value at the current position, or returns
+        ``(False, None)`` if more of the body is needed first.
+
+        A value that ends right at the end of the buffer might continue in
+        the next chunk (``12`` of ``123``), so it only counts once there's
+        something after it or the body is complete.
+        """
+        try:
+            value, end = _decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._done:
+                raise
+            self._wait = 2 * (len(self._buffer) - self._pos)
+            return False, None
+        if end == len(self._buffer) and not self._done:
+            self._wait = 2 * (len(self._buffer) - self._pos)
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _token(self, *tokens):
+        """Consumes one of ``tokens`` at the current position, skipping
+        whitespace, and returns it. Returns ``None`` if more of the body is
+        needed first.
+        """
+        self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+        if self._pos == len(self._buffer):
+            if self._done:
+                raise ValueError("Incomplete bootstrap-static document")
+            return None
+        token = self._buffer[self._pos]
+        if token not in tokens:
+            raise ValueError(
+                f"Expected {' or '.join(tokens)} at {token!r} in bootstrap-static"
+            )
+        self._pos += 1
+        return token
+
+    def _items(self):
+        """Decodes the records of the current list, which is where most of
+        the document is, so the loop avoids going through :meth:`_parse`
+        for every record.
+
+        :return: Whether the end of the list was reached, rather than the
+            end of the buffer.
+        """
+        section = self._section
+        keep = section in self.fields
+        fields = self.fields.get(section)
+        buffer = self._buffer
+        match = WHITESPACE.match
+        while True:
+            if self._state == "next_item":
+                token = self._token(",", "]")
+                if token is None:
+                    return False
+                if token == "]":
+                    return True
+                self._state = "item"
+
+            self._pos = match(buffer, self._pos).end()
+            if buffer[self._pos : self._pos + 1] == "]":
+                self._pos += 1
+                return True
+            complete, record = self._value()
+            if not complete:
+                return False
+            self._state = "next_item"
+            if not keep:
+                continue
+
+            if fields is not None and isinstance(record, dict):
+                record = {field: record[field] for field in fields if field in record}
+            records = self.sections[section]
+            if isinstance(records, dict):
+                try:
+                    records[record["id"]] = record
+                    continue
+                except (KeyError, TypeError):
+                    # Not every record has an ID, keep the section a list
+                    records = self.sections[section] = list(records.values())
+            records.append(record)
+
+    def _parse(self):
+        while True:
+            state = self._state
+            if state == "start":
+                if self._token("{") is None:
+                    return
+                self._state = "key"
+            elif state == "key":
+                self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+                if self._buffer[self._pos : self._pos + 1] == "}":
+                    self._pos += 1
+                    self._state = "end"
+                    continue
+                complete, key = self._value()
+                if not complete:
+                    return
+                if not isinstance(key, str):
+                    raise ValueError("Expected a section name in bootstrap-static")
+                self._section = key
+                self._state = "colon"
+            elif state == "colon":
+                if self._token(":") is None:
+                    return
+                self._state = "value"
+            elif state == "value":
+                self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+                if self._buffer[self._pos : self._pos + 1] == "[":
+                    # A list is decoded record by record
+                    self._pos += 1
+                    if self._section in self.fields:
+                        self.sections[self._section] = {}
+                    self._state = "item"
+                    continue
+                complete, value = self._value()
+                if not complete:
+                    return
+                if self._section in self.fields:
+                    self.sections[self._section] = value
+                self._state = "next_key"
+            elif state in ("item", "next_item"):
+                if not self._items():
+                    return
+                self._state = "next_key"
+            elif state == "next_key":
+                token = self._token(",", "}")
+                if token is None:
+                    return
+                self._state = "key" if token == "," else "end"
+            else:
+                return
@@ -1,3 +1,87 @@
 """Constants for the FPL Api integration."""
 
 DOMAIN = "fpl_api"
+
+# Key in hass.data[DOMAIN] of the public FPL data shared by all entries, by
+# the API base URL they use
+DATA_PUBLIC = "public"
+# Key in hass.data[DOMAIN] of the snapshot stores of that data, by API base URL
+DATA_SNAPSHOTS = "snapshots"
+
+# Config entry keys that point the client at another FPL API and login, e.g.
+# a local stand-in for load testing; the real ones are used without them
+CONF_API_BASE_URL = "api_base_url"
+CONF_LOGIN_URL = "login_url"
+
+# Service that profiles the next refreshes of every entry, and its field
+SERVICE_PROFILE = "profile"
+ATTR_COUNT = "count"
+
+# Connection pool of the FPL client owned by each config entry
+CONNECTOR_LIMIT = 20
+CONNECTOR_LIMIT_PER_HOST = 8
+CONNECTOR_KEEPALIVE_TIMEOUT = 60
+CONNECTOR_DNS_CACHE_TTL = 300
+
+# Seconds the bootstrap-static document is served from cache before it is
+# revalidated against the FPL API
+BOOTSTRAP_TTL = 300
+
+# Seconds before a request to the FPL API is abandoned
+REQUEST_TIMEOUT = 30
+
+# Request scheduling towards the FPL API, shared by the entries using it:
+# concurrent requests, sustained requests per second and the burst allowed
+# on top of it
+MAX_CONCURRENT_REQUESTS = 8
+REQUEST_RATE_LIMIT = 20
+REQUEST_RATE_BURST = 40
+
+# Number of element-summary payloads kept in memory, enough for every player
+SUMMARY_CACHE_SIZE = 1000
+
+# Seconds before all fixtures are reloaded, and before the fixtures of a
+# gameweek in progress are refreshed (keep it below the live scan interval)
+FIXTURES_TTL = 3600
+LIVE_FIXTURES_TTL = 5
+
+# Seconds the live stats of a gameweek are shared between entries before they
+# are downloaded again (keep it below the live scan interval)
+LIVE_ELEMENTS_TTL = 5
+
+# Sections and fields of bootstrap-static kept by the integration, parsed as
+# the document streams in (None keeps every field of a section)
+BOOTSTRAP_FIELDS = {
+    "events": (
+        "id",
+        "name",
+        "deadline_time",
+        "finished",
+        "data_checked",
+        "is_previous",
+        "is_current",
+        "is_next",
+    ),
+    "teams": ("id", "code", "name", "short_name"),
+    "elements": (
+        "id",
+        "code",
+        "first_name",
+        "second_name",
+        "web_name",
+        "team",
+        "element_type",
+        "status",
+        "now_cost",
+        "total_points",
+        "event_points",
+        "minutes",
+    ),
+    "element_types": (
+        "id",
+        "singular_name",
+        "singular_name_short",
+        "plural_name",
+        "plural_name_short",
+    ),
+}
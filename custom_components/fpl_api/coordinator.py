@@ -0,0 +1,435 @@
+"""Data update coordinator for the FPL Api integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import aiohttp
+import pytz
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+from homeassistant.util import slugify
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .const import DOMAIN
+from .fpl_mod import FPL
+from .history import HistoryView
+from .live import LiveDeltaEngine, MatchEventDetector
+from .profiling import RefreshProfiler
+from .storage import FPLAuthStore, FPLSnapshotStore, snapshot_age
+from .timeline import PollingTimeline, backoff_interval
+
+_LOGGER = logging.getLogger(__name__)
+
+# Until the first refresh has built the polling timeline
+DEFAULT_SCAN_INTERVAL = timedelta(hours=1)
+
+NO_GAMES_PLAYING = "No games playing"
+IN_PROGRESS = "In Progress"
+
+
+def get_gameweek_score(player, gameweek):
+    """Return the points of a player in a gameweek, summed over the fixtures
+    of a double gameweek and 0 for a blank one."""
+    history = player.history
+    if isinstance(history, HistoryView):
+        # Read straight from the columns, without building the rows
+        return int(
+            history.column("total_points")[history.column("round") == gameweek].sum()
+        )
+    return sum(
+        fixture["total_points"] for fixture in history if fixture["round"] == gameweek
+    )
+
+
+def live_fixtures(fixtures):
+    """Return the fixtures that have kicked off but haven't finished, bonus
+    included."""
+    return [
+        fixture
+        for fixture in fixtures
+        if fixture["started"] and not fixture["finished"]
+    ]
+
+
+def upcoming_kickoffs(fixtures, team_id, tz):
+    """Return the kickoffs of the fixtures of ``team_id`` that haven't kicked
+    off yet, in the time zone ``tz``."""
+    return [
+        dt_util.parse_datetime(fixture["kickoff_time"])
+        .replace(tzinfo=pytz.utc)
+        .astimezone(tz=tz)
+        for fixture in fixtures
+        if not fixture["started"]
+        and not fixture["finished"]
+        and fixture["kickoff_time"]
+        and team_id in (fixture["team_h"], fixture["team_a"])
+    ]
+
+
+class FPLDataUpdateCoordinator(DataUpdateCoordinator):
+    """Fetches everything the FPL entities show, once per refresh.
+
+    The coordinator owns the FPL client and the tracking state (active
+    gameweek, kickoffs, live deltas and match events). Entities only read
+    from ``data``, so adding one does not add a request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        fpl: FPL,
+        fpl_email: str = None,
+        fpl_password: str = None,
+        fpl_user_id: str = None,
+        fav_team: str = None,
+        tz="Europe/Copenhagen",
+        snapshot_store: FPLSnapshotStore = None,
+        auth_store: FPLAuthStore = None,
+    ):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=DEFAULT_SCAN_INTERVAL,
+        )
+        self.fpl = fpl
+        self.pytz_tz = pytz.timezone(tz)
+        self.fpl_email = fpl_email
+        self.fpl_password = fpl_password
+        self.fpl_user_id = fpl_user_id
+        self.fav_team = fav_team
+
+        self.day = 0
+        self.match_events = MatchEventDetector()
+        self.id2team: dict = {}
+        self.team2id: dict = {}
+        self.active_gameweek: int = 0
+        self.kickoffs: List[datetime] = []
+        self.fav_team_id: int | None = None
+        self.fixtures: list = []
+        self.squad_ids: list = []
+        self.scores: dict = {}
+        self.live = LiveDeltaEngine()
+        self.timeline = PollingTimeline()
+        self._failures = 0
+
+        self.snapshot_store = snapshot_store
+        self._snapshot_version = None
+        self.auth_store = auth_store
+        self._saved_logins = 0
+        self._setup_started = time.monotonic()
+        self.startup_timings: dict = {"warm_start": False}
+        self.profiler = RefreshProfiler(
+            hass, slugify(str(fpl_user_id or fav_team or DOMAIN))
+        )
+
+    async def test_session(self):
+        await self.fpl.async_init()
+        if self.fpl_email and self.fpl_password:
+            await self.fpl.ensure_login(self.fpl_email, self.fpl_password)
+            if self.fpl_user_id:
+                self.user = await self.fpl.get_user(self.fpl_user_id)
+
+    async def async_restore(self, snapshot):
+        """Set initial data from a stored snapshot, without any requests.
+
+        The next refresh revalidates everything against the FPL API.
+        """
+        started = time.monotonic()
+        # Another entry may have filled the shared cache already
+        if self.fpl.bootstrap.static is None:
+            self.fpl.bootstrap.restore(
+                snapshot["bootstrap"],
+                snapshot.get("etag"),
+                snapshot.get("last_modified"),
+            )
+        self.fpl.apply_static()
+        if not self.fpl.fixtures_store.by_id:
+            self.fpl.fixtures_store.restore(snapshot["fixtures"])
+        active_gameweek = self.fpl.bootstrap.current_gameweek
+        await self.scroll_day(
+            fixtures=self.fpl.fixtures_store.by_gameweek.get(active_gameweek, [])
+            if active_gameweek
+            else []
+        )
+        now = datetime.today().astimezone(tz=self.pytz_tz)
+        self.async_set_updated_data(
+            {
+                "state": self.get_game_state(now),
+                "live_score": self.get_live_score(),
+                "next_kickoff": self.get_next_kickoff(now),
+            }
+        )
+        self.startup_timings.update(
+            {
+                "warm_start": True,
+                "snapshot_age": snapshot_age(snapshot),
+                "restore": time.monotonic() - started,
+            }
+        )
+
+    async def scroll_day(self, fixtures=None):
+        self.id2team = await self.get_id2team()
+        self.team2id = {team: id for id, team in self.id2team.items()}
+        self.active_gameweek = await self.get_active_gameweek()
+        self.fav_team_id = self.team2id[self.fav_team]
+        if fixtures is None:
+            fixtures = await self.fpl.get_fixtures_by_gameweek(
+                gameweek=self.active_gameweek, return_json=True
+            )
+        self.fixtures = fixtures
+        self.kickoffs = await self.get_fixture_kickoffs()
+
+    async def get_team(self):
+        """Return the squad's picks, top scorer and gameweek points."""
+        if self.fpl_email and self.fpl_password:
+            await self.fpl.ensure_login(self.fpl_email, self.fpl_password)
+            self.save_auth()
+            self.user = await self.fpl.get_user(self.fpl_user_id)
+            # The user ID is optional, the user comes from /me without it
+            team = await self.fpl.get_my_team(self.user.id)
+            self.save_auth()
+            player_ids = [player["element"] for player in team]
+            self.squad_ids = player_ids
+            players = await self.fpl.get_players(player_ids, include_summary=True)
+            live_points = await self.get_live_points()
+            if live_points is None:
+                scores = {
+                    player.id: get_gameweek_score(player, self.active_gameweek)
+                    for player in players
+                }
+            else:
+                scores = {
+                    player.id: live_points.get(player.id, 0) for player in players
+                }
+            self.scores = scores
+            top_scorer = max(players, key=lambda player: scores[player.id])
+            team_points = sum(
+                scores.get(pick["element"], 0) * pick["multiplier"] for pick in team
+            )
+
+            return team, top_scorer, team_points
+        else:
+            return None, None, None
+
+    async def get_live_points(self):
+        """Return the live points of every player in the active gameweek, or
+        None before any of its fixtures has kicked off.
+
+        The cached player summaries are only refreshed once a fixture of
+        their team has finished, so the points of fixtures in progress come
+        from the gameweek's live data.
+        """
+        fixtures = (
+            self.fpl.fixtures_store.by_gameweek.get(self.active_gameweek, [])
+            if self.active_gameweek
+            else []
+        )
+        if not any(fixture["started"] for fixture in fixtures):
+            return None
+        elements = await self.fpl.get_live_elements(self.active_gameweek)
+        return {element["id"]: element["stats"]["total_points"] for element in elements}
+
+    def save_auth(self):
+        """Persist the session's cookies after it has logged in again."""
+        if self.auth_store and self.fpl.auth.logins != self._saved_logins:
+            self._saved_logins = self.fpl.auth.logins
+            self.auth_store.async_schedule_save(self.fpl.export_cookies())
+            stats = self.fpl.auth.stats()
+            _LOGGER.info(
+                "Logged in to FPL in %.2fs (%d logins, %d after a rejection)",
+                stats["last_latency"],
+                stats["logins"],
+                stats["relogins"],
+            )
+
+    async def get_id2team(self):
+        teams = await self.fpl.get_teams(return_json=True)
+        return {team["id"]: team["name"] for team in teams}
+
+    async def get_pl_teams(self):
+        teams = await self.fpl.get_teams(return_json=True)
+        return sorted(team["name"] for team in teams)
+
+    async def get_active_gameweek(self):
+        """Return the current gameweek, found once per bootstrap download."""
+        return self.fpl.bootstrap.current_gameweek or None
+
+    async def get_fixture_kickoffs(self):
+        return upcoming_kickoffs(self.fixtures, self.fav_team_id, self.pytz_tz)
+
+    async def get_live_fixtures(self):
+        fixtures = await self.fpl.get_fixtures_by_gameweek(
+            gameweek=self.active_gameweek, return_json=True
+        )
+        return live_fixtures(fixtures)
+
+    async def get_match_events(self):
+        """Return the match events of all live fixtures since the last update,
+        and whether one of them is a goal in the favourite team's fixture."""
+        fixtures = await self.get_live_fixtures()
+        events = self.match_events.update(self.active_gameweek, fixtures)
+
+        fav_team_fixtures = {
+            fixture["id"]
+            for fixture in fixtures
+            if self.fav_team_id in (fixture["team_h"], fixture["team_a"])
+        }
+        new_goal = any(
+            event.type in ("goal", "own_goal")
+            and event.count > 0
+            and event.fixture_id in fav_team_fixtures
+            for event in events
+        )
+        return new_goal, events
+
+    def describe_event(self, event):
+        """Return a match event with names instead of IDs."""
+        fixture = self.fpl.fixtures_store.by_id.get(event.fixture_id)
+        player = self.fpl.elements.get(event.element_id)
+        return {
+            "type": event.type,
+            "player": player["web_name"] if player else event.element_id,
+            "team": self.id2team.get(event.team_id, event.team_id),
+            "fixture": f"{self.id2team[fixture['team_h']]} v. {self.id2team[fixture['team_a']]}"
+            if fixture
+            else event.fixture_id,
+            "count": event.count,
+        }
+
+    async def get_live_changes(self):
+        """Return the players whose live stats changed since the last update,
+        as ``{element_id: {stat: (old, new)}}``.
+
+        Live data is only fetched while the active gameweek has a fixture in
+        progress.
+        """
+        if self.active_gameweek not in self.fpl.fixtures_store.in_progress_gameweeks():
+            return {}
+        elements = await self.fpl.get_live_elements(self.active_gameweek)
+        return self.live.update(self.active_gameweek, elements)
+
+    def get_squad_changes(self, changes):
+        """Return the live changes of the squad's players by name."""
+        return {
+            self.fpl.elements[player_id]["web_name"]: {
+                stat: new for stat, (_, new) in changes[player_id].items()
+            }
+            for player_id in self.squad_ids
+            if player_id in changes and player_id in self.fpl.elements
+        }
+
+    def get_live_score(self):
+        """Return the score of the favourite team's fixture in progress."""
+        for fixture in self.fpl.fixtures_store.by_team.get(self.fav_team_id, []):
+            if fixture["started"] and not fixture["finished"]:
+                return (
+                    f"{self.id2team[fixture['team_h']]} {fixture['team_h_score']}"
+                    f" - {fixture['team_a_score']} {self.id2team[fixture['team_a']]}"
+                )
+        return None
+
+    def get_next_kickoff(self, now):
+        """Return the next kickoff of the favourite team."""
+        kickoffs = [
+            dt_util.parse_datetime(fixture["kickoff_time"])
+            for fixture in self.fpl.fixtures_store.by_team.get(self.fav_team_id, [])
+            if fixture["kickoff_time"] and not fixture["started"]
+        ]
+        kickoffs = [kickoff for kickoff in kickoffs if kickoff > now]
+        return min(kickoffs, default=None)
+
+    async def _async_update_data(self):
+        """Fetch new data for all FPL entities."""
+        _LOGGER.debug("Fetching data from FPL")
+        started = time.monotonic()
+        try:
+            if self.profiler.remaining:
+                data = await self.profiler.async_profile("refresh", self._async_fetch)
+            else:
+                data = await self._async_fetch()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            self._failures += 1
+            self.update_interval = self.set_polling(time.monotonic() - started)
+            raise UpdateFailed(f"Error communicating with FPL: {err}") from err
+        self._failures = 0
+        self.update_interval = self.set_polling(time.monotonic() - started)
+
+        if "first_refresh" not in self.startup_timings:
+            self.startup_timings["first_refresh"] = (
+                time.monotonic() - self._setup_started
+            )
+            _LOGGER.info(
+                "First FPL refresh done %.2fs after setup (warm start: %s)",
+                self.startup_timings["first_refresh"],
+                self.startup_timings["warm_start"],
+            )
+
+        _LOGGER.debug("Done fetching data from FPL")
+        return data
+
+    async def _async_fetch(self):
+        now = datetime.today().astimezone(tz=self.pytz_tz)
+        await self.fpl.async_init()
+
+        scrolled = now.day != self.day
+        if scrolled:
+            self.day = now.day
+            await self.scroll_day()
+
+        new_goal, match_events = await self.get_match_events()
+        live_changes = await self.get_live_changes()
+        team, top_scorer, team_points = await self.get_team()
+
+        if self.snapshot_store and (
+            scrolled or self._snapshot_version != self.fpl.bootstrap.version
+        ):
+            self._snapshot_version = self.fpl.bootstrap.version
+            self.snapshot_store.async_schedule_save(
+                self.fpl.bootstrap, self.fpl.fixtures_store
+            )
+
+        return {
+            "state": self.get_game_state(now),
+            "new_goal": new_goal,
+            "events": [self.describe_event(event) for event in match_events],
+            "top_scorer": f"{top_scorer.first_name} {top_scorer.web_name}: {self.scores[top_scorer.id]}"
+            if top_scorer
+            else top_scorer,
+            "live_changed_players": len(live_changes),
+            "live_changes": self.get_squad_changes(live_changes),
+            "live_score": self.get_live_score(),
+            "team_points": team_points,
+            "next_kickoff": self.get_next_kickoff(now),
+            "rank": getattr(self.user, "summary_overall_rank", None)
+            if team is not None
+            else None,
+        }
+
+    def get_game_state(self, now):
+        return (
+            IN_PROGRESS
+            if any(
+                [
+                    kickoff < now < kickoff + timedelta(hours=2)
+                    for kickoff in self.kickoffs
+                ]
+            )
+            else NO_GAMES_PLAYING
+        )
+
+    def set_polling(self, duration):
+        """Return the interval until the next interesting instant of the
+        fixtures feed, stretched while the API is slow or failing."""
+        self.timeline.build(
+            (self.fpl.fixtures_store.version, self.fpl.bootstrap.version),
+            self.fpl.fixtures_store.by_id.values(),
+            getattr(self.fpl, "events", {}).values(),
+        )
+        interval = self.timeline.next_interval(dt_util.utcnow())
+        return backoff_interval(interval, duration, self._failures)
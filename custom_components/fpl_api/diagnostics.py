@@ -0,0 +1,69 @@
+"""Diagnostics support for the FPL Api integration."""
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import FPLDataUpdateCoordinator
+
+TO_REDACT = {"fpl_email", "fpl_password"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    fpl = coordinator.fpl
+    bootstrap = fpl.bootstrap
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "polling": {
+            "update_interval": coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None,
+            "last_update_success": coordinator.last_update_success,
+            "startup": coordinator.startup_timings,
+        },
+        "requests": fpl.metrics.stats(),
+        "auth": fpl.auth.stats(),
+        "coalescer": {
+            "requests": fpl.coalescer.requests,
+            "saved": fpl.coalescer.saved,
+        },
+        "caches": {
+            # Shared with the other entries using the same API
+            "shared_by": sum(
+                isinstance(other, FPLDataUpdateCoordinator)
+                and other.fpl.bootstrap is bootstrap
+                for other in hass.data[DOMAIN].values()
+            ),
+            "bootstrap": {
+                "version": bootstrap.version,
+                "age": time.monotonic() - bootstrap.fetched_at
+                if bootstrap.fetched_at is not None
+                else None,
+                "etag": bootstrap.etag,
+            },
+            "summaries": {
+                "size": len(fpl.summaries),
+                "maxsize": fpl.summaries.maxsize,
+                "hits": fpl.summaries.hits,
+                "misses": fpl.summaries.misses,
+            },
+            "fixtures": {
+                "version": fpl.fixtures_store.version,
+                "fixtures": len(fpl.fixtures_store.by_id),
+            },
+            "live": {
+                "gameweeks": len(fpl.live_store),
+                "ttl": fpl.live_store.ttl,
+            },
+        },
+        "profiles": list(coordinator.profiler.reports),
+    }
@@ -24,72 +24,944 @@ Fantasy Premier League API:
 * /transfers
 """
 import asyncio
-import itertools
+import gzip
 import os
 import json
-from urllib.request import urlopen
-
+import random
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from email.utils import formatdate
+from http.cookies import SimpleCookie
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import aiohttp
+from yarl import URL
 from fpl.constants import API_URLS
 from fpl.models.classic_league import ClassicLeague
-from fpl.models.fixture import Fixture
-from fpl.models.gameweek import Gameweek
 from fpl.models.h2h_league import H2HLeague
-from fpl.models.player import Player, PlayerSummary
-from fpl.models.team import Team
 from fpl.models.user import User
-from fpl.utils import (
-    average,
-    fetch,
-    get_current_user,
-    logged_in,
-    position_converter,
-    scale,
-    team_converter,
-)
+
+from .bootstrap import StaticParser, key_by_id
+from .fdr import FDRState, PointsAgainst
+from .history import HistoryStore
+from .metrics import RequestMetrics
+from .models import Fixture, Gameweek, Player, PlayerSummary, Team
+
+DEFAULT_CONNECTOR_LIMIT = 20
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 8
+DEFAULT_KEEPALIVE_TIMEOUT = 60
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_BOOTSTRAP_TTL = 300
+DEFAULT_TIMEOUT = 30
+BOOTSTRAP_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RATE_LIMIT = 20
+DEFAULT_RATE_BURST = 40
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+DEFAULT_SUMMARY_CACHE_SIZE = 1000
+DEFAULT_FIXTURES_TTL = 3600
+DEFAULT_LIVE_FIXTURES_TTL = 5
+DEFAULT_LIVE_ELEMENTS_TTL = 5
+AUTH_STATUSES = frozenset((401, 403))
+API_BASE_URL = "https://fantasy.premierleague.com/api/"
+LOGIN_URL = "https://users.premierleague.com/accounts/login/"
+
+
+def api_urls(base_url=API_BASE_URL):
+    """Returns the ``fpl`` library's ``API_URLS`` with ``base_url`` in place
+    of the FPL API, e.g. to run against a local stand-in of it.
+    """
+    base_url = base_url.rstrip("/") + "/"
+    return {name: base_url + url[len(API_BASE_URL) :] for name, url in API_URLS.items()}
+
+
+def create_session(
+    limit=DEFAULT_CONNECTOR_LIMIT,
+    limit_per_host=DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+    keepalive_timeout=DEFAULT_KEEPALIVE_TIMEOUT,
+    ttl_dns_cache=DEFAULT_DNS_CACHE_TTL,
+):
+    """Returns a connection pooled session for talking to the FPL API.
+
+    Connections are kept alive between requests, so a long-lived session
+    only pays for the TCP and TLS handshakes once per pooled connection.
+
+    :param int limit: (optional) Total number of simultaneous connections.
+    :param int limit_per_host: (optional) Simultaneous connections per host.
+    :param float keepalive_timeout: (optional) Seconds an idle connection is
+        kept open for reuse.
+    :param int ttl_dns_cache: (optional) Seconds resolved addresses are cached.
+    :rtype: :class:`aiohttp.ClientSession`
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=ttl_dns_cache,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def gather_all(*aws):
+    """Runs the awaitables concurrently and returns their results in order,
+    like :func:`asyncio.gather`. As soon as one of them fails the others are
+    cancelled, instead of being left to hammer the API for nothing.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        done, pending = set(), tasks
+        raise
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    for task in tasks:
+        if task in done and task.exception() is not None:
+            raise task.exception()
+
+    return [task.result() for task in tasks]
+
+
+class RequestScheduler:
+    """Schedules every request the :class:`FPL` client makes.
+
+    At most ``max_concurrency`` requests are in flight at once and new ones
+    are started at no more than ``rate`` per second (bursts of up to
+    ``burst``), using a token bucket. Responses with a 429 or 5xx status,
+    connection errors and timeouts are retried up to ``max_retries`` times
+    with jittered exponential backoff, honouring ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        rate=DEFAULT_RATE_LIMIT,
+        burst=DEFAULT_RATE_BURST,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        timeout=DEFAULT_TIMEOUT,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket_lock = asyncio.Lock()
+        self._tokens = burst
+        self._refilled_at = time.monotonic()
+
+    async def _take_token(self):
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._refilled_at) * self.rate
+                )
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Waits until a request may be sent and holds its concurrency slot
+        while the request runs.
+        """
+        async with self._semaphore:
+            await self._take_token()
+            yield
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Returns the seconds to wait before retry number ``attempt``."""
+        delay = random.uniform(0, min(MAX_BACKOFF, self.backoff * 2**attempt))
+        try:
+            return max(delay, float(retry_after))
+        except (TypeError, ValueError):
+            return delay
+
+    async def fetch(self, session, url, metrics=None, endpoint="other"):
+        """Returns the decoded JSON response of a GET request to ``url``.
+
+        :param session: The session to send the request with.
+        :type session: aiohttp.ClientSession
+        :param string url: The URL to fetch.
+        :param metrics: (optional) Where to record every attempt.
+        :type metrics: :class:`RequestMetrics`
+        :param string endpoint: (optional) The endpoint to record them under.
+        :raises aiohttp.ClientResponseError: The API answered with an error,
+            or kept failing after all retries.
+        """
+        if metrics is None:
+            metrics = RequestMetrics()
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self.slot():
+                started = time.monotonic()
+                try:
+                    async with session.get(
+                        url, timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    ) as response:
+                        if (
+                            response.status in RETRY_STATUSES
+                            and attempt < self.max_retries
+                        ):
+                            retry_after = response.headers.get("Retry-After")
+                            metrics.record(
+                                endpoint,
+                                time.monotonic() - started,
+                                error=response.status,
+                            )
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            result = await response.json()
+                            metrics.record(
+                                endpoint, time.monotonic() - started, len(body)
+                            )
+                            return result
+                except (
+                    aiohttp.ClientConnectionError,
+                    aiohttp.ContentTypeError,
+                    asyncio.TimeoutError,
+                ) as error:
+                    metrics.record(endpoint, time.monotonic() - started, error=error)
+                    # The API serves an HTML page while the game is updating
+                    if attempt >= self.max_retries:
+                        raise
+                except aiohttp.ClientResponseError as error:
+                    metrics.record(
+                        endpoint, time.monotonic() - started, error=error.status
+                    )
+                    raise
+
+            metrics.retry(endpoint)
+            await asyncio.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+
+class RequestCoalescer:
+    """Lets concurrent requests for the same URL share a single network call
+    and a single parsed result.
+
+    The result is handed to every caller as is, so callers must treat it
+    as read-only. ``requests`` counts the network calls made and ``saved``
+    the requests that were served by a call already in flight. A call is
+    cancelled once every caller waiting for it has been cancelled, e.g. by
+    :func:`gather_all` after another request failed.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.saved = 0
+        self._in_flight = {}
+        self._waiters = {}
+
+    async def run(self, key, request):
+        """Returns the result of ``request()``, unless a request for ``key``
+        is already in flight, in which case its result is awaited instead.
+
+        :param key: The key identifying the request, e.g. its URL.
+        :param request: A callable returning the coroutine to run.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            self.requests += 1
+            future = asyncio.ensure_future(request())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._done(key, future))
+        else:
+            self.saved += 1
+
+        # A cancelled caller must not cancel the request for the others,
+        # only the last one to go does
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+                future.cancel()
+
+    def in_flight(self, key):
+        """Whether a request for ``key`` is in flight."""
+        return key in self._in_flight
+
+    def _done(self, key, future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved when every caller has gone
+            future.exception()
+
+
+class BootstrapCache:
+    """Holds the parsed ``bootstrap-static`` document for ``ttl`` seconds.
+
+    The id-keyed ``elements``, ``teams`` and ``events`` dicts are built once
+    per download and shared by every :class:`FPL` using the cache. Once the
+    TTL has run out the document is revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``, so an unchanged document only costs a 304.
+
+    With ``fields`` the document is parsed as it streams in and only the
+    given sections and fields are kept, see :class:`StaticParser`.
+    Otherwise the whole document is decoded and kept.
+    """
+
+    def __init__(self, ttl=DEFAULT_BOOTSTRAP_TTL, fields=None):
+        self.ttl = ttl
+        self.fields = fields
+        self.static = None
+        self.current_gameweek = 0
+        self.elements_by_team = {}
+        self.elements_by_position = {}
+        self.teams_by_name = {}
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = None
+        self.version = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def fresh(self):
+        """Whether the cached document can be used without revalidation."""
+        return (
+            self.fetched_at is not None
+            and time.monotonic() - self.fetched_at < self.ttl
+        )
+
+    def conditional_headers(self):
+        """Returns the headers needed to revalidate the cached document."""
+        headers = {}
+        if self.static is None:
+            return headers
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update(self, static, etag=None, last_modified=None):
+        """Replaces the cached document with a freshly downloaded one.
+
+        :param dict static: The decoded ``bootstrap-static`` document.
+        :param str etag: (optional) The ``ETag`` header of the response.
+        :param str last_modified: (optional) The ``Last-Modified`` header of
+            the response.
+        """
+        self.replace(key_by_id(static), etag, last_modified)
+
+    def replace(self, sections, etag=None, last_modified=None):
+        """Replaces the cached document with freshly parsed sections, as
+        returned by :func:`key_by_id` or :meth:`StaticParser.close`.
+        """
+        events = sections.get("events", {})
+        if isinstance(events, dict):
+            events = events.values()
+        try:
+            self.current_gameweek = next(
+                event for event in events if event["is_current"]
+            )["id"]
+        except StopIteration:
+            self.current_gameweek = 0
+
+        self.static = sections
+        self.index(sections)
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version += 1
+        self.touch()
+
+    def index(self, static):
+        """Builds the secondary indexes over the id-keyed sections, so
+        lookups by team, position or team name don't scan every record.
+        """
+        elements_by_team = {}
+        elements_by_position = {}
+        for element in static.get("elements", {}).values():
+            elements_by_team.setdefault(element["team"], []).append(element)
+            elements_by_position.setdefault(element["element_type"], []).append(element)
+
+        teams_by_name = {}
+        for team in static.get("teams", {}).values():
+            teams_by_name[team["name"].lower()] = team
+            if team.get("short_name"):
+                teams_by_name[team["short_name"].lower()] = team
+
+        self.elements_by_team = elements_by_team
+        self.elements_by_position = elements_by_position
+        self.teams_by_name = teams_by_name
+
+    def parser(self):
+        """Returns a :class:`StaticParser` for the next download, or
+        ``None`` if the whole document is kept.
+        """
+        if self.fields is None:
+            return None
+        return StaticParser(self.fields)
+
+    def touch(self):
+        """Marks the cached document as fresh, e.g. after a 304."""
+        self.fetched_at = time.monotonic()
+
+    def restore(self, static, etag=None, last_modified=None):
+        """Seeds the cache from a stored copy of the document.
+
+        The copy is served as-is, but counts as stale so the next load
+        revalidates it against the API.
+        """
+        self.update(static, etag, last_modified)
+        self.fetched_at = None
+
+    def export(self, sections):
+        """Returns the given id-keyed sections as plain lists, ready to be
+        stored and handed back to :meth:`restore` later.
+
+        :param list sections: Names of the sections to export.
+        :rtype: dict
+        """
+        return {
+            section: list(self.static[section].values())
+            for section in sections
+            if section in self.static
+        }
+
+
+class SummaryCache:
+    """LRU cache of ``element-summary`` payloads, keyed by player ID.
+
+    A player's ``history`` only changes when one of their team's fixtures
+    finishes. :meth:`FPL.load_fixtures` drops the summaries of the players
+    of both teams through :meth:`invalidate_teams` once it sees a fixture
+    finish. Points of fixtures in progress are taken from
+    ``event/{id}/live`` instead, which doesn't need the summaries refreshed
+    on every poll.
+
+    Histories are kept in a columnar :class:`HistoryStore`, cached summaries
+    come back with a read-only :class:`HistoryView` as their ``history``.
+    """
+
+    def __init__(self, maxsize=DEFAULT_SUMMARY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.histories = HistoryStore()
+        self._summaries = OrderedDict()
+
+    def __len__(self):
+        return len(self._summaries)
+
+    def get(self, player_id):
+        """Returns the cached summary of a player, or ``None``."""
+        try:
+            _, summary = self._summaries[player_id]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._summaries.move_to_end(player_id)
+        self.hits += 1
+        return {**summary, "history": self.histories.get(player_id)}
+
+    def put(self, player_id, team_id, summary):
+        """Caches the summary of a player playing for ``team_id``."""
+        self.histories.update(player_id, summary.get("history", []))
+        summary = {key: value for key, value in summary.items() if key != "history"}
+        self._summaries[player_id] = (team_id, summary)
+        self._summaries.move_to_end(player_id)
+        while len(self._summaries) > self.maxsize:
+            evicted, _ = self._summaries.popitem(last=False)
+            self.histories.remove(evicted)
+
+    def invalidate_teams(self, team_ids):
+        """Drops the summaries of every player of the given teams."""
+        stale = [
+            player_id
+            for player_id, (team_id, _) in self._summaries.items()
+            if team_id in team_ids
+        ]
+        for player_id in stale:
+            del self._summaries[player_id]
+            self.histories.remove(player_id)
+
+
+class FixturesStore:
+    """Every fixture of the season, indexed by ID, gameweek and team.
+
+    The store is filled from a single ``/fixtures/`` request, which is
+    repeated once ``ttl`` seconds have passed. While a gameweek has a
+    fixture in progress, only that gameweek is refreshed, through
+    ``/fixtures/?event={gameweek}``, once every ``live_ttl`` seconds.
+    """
+
+    def __init__(self, ttl=DEFAULT_FIXTURES_TTL, live_ttl=DEFAULT_LIVE_FIXTURES_TTL):
+        self.ttl = ttl
+        self.live_ttl = live_ttl
+        self.by_id = {}
+        self.by_gameweek = {}
+        self.by_team = {}
+        self.fetched_at = None
+        self.version = 0
+        self.lock = asyncio.Lock()
+        self._gameweek_fetched_at = {}
+
+    @property
+    def fresh(self):
+        """Whether the store can be used without reloading every fixture."""
+        return (
+            self.fetched_at is not None
+            and time.monotonic() - self.fetched_at < self.ttl
+        )
+
+    def gameweek_fresh(self, gameweek):
+        """Whether the fixtures of an in progress gameweek are recent enough."""
+        fetched_at = self._gameweek_fetched_at.get(gameweek)
+        return fetched_at is not None and time.monotonic() - fetched_at < self.live_ttl
+
+    def in_progress_gameweeks(self):
+        """Returns the gameweeks with a fixture that has kicked off, going by
+        its kickoff time, but hasn't finished.
+        """
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return {
+            fixture["event"]
+            for fixture in self.by_id.values()
+            if not fixture["finished"]
+            and fixture["event"] is not None
+            and fixture["kickoff_time"] is not None
+            and fixture["kickoff_time"] <= now
+        }
+
+    def update(self, fixtures):
+        """Replaces every fixture in the store.
+
+        :param list fixtures: All fixtures, as returned by ``/fixtures/``.
+        :return: The fixtures that have finished since the store was last
+            updated.
+        :rtype: list
+        """
+        finished = self._newly_finished(fixtures)
+        self.by_id = {fixture["id"]: fixture for fixture in fixtures}
+        self.fetched_at = time.monotonic()
+        # Covers every gameweek as well as its own request would
+        self._gameweek_fetched_at = dict.fromkeys(
+            {fixture["event"] for fixture in fixtures}, self.fetched_at
+        )
+        self._index()
+        return finished
+
+    def restore(self, fixtures):
+        """Seeds the store from a stored copy of the fixtures.
+
+        The copy is served as-is, but counts as stale so the next load
+        reloads every fixture.
+        """
+        self.update(fixtures)
+        self.fetched_at = None
+        self._gameweek_fetched_at = {}
+
+    def update_gameweek(self, gameweek, fixtures):
+        """Replaces the fixtures of a single gameweek.
+
+        :param int gameweek: The gameweek.
+        :param list fixtures: Its fixtures, as returned by
+            ``/fixtures/?event={gameweek}``.
+        :return: The fixtures that have finished since the store was last
+            updated.
+        :rtype: list
+        """
+        finished = self._newly_finished(fixtures)
+        for fixture in fixtures:
+            self.by_id[fixture["id"]] = fixture
+        self._gameweek_fetched_at[gameweek] = time.monotonic()
+        self._index()
+        return finished
+
+    def _newly_finished(self, fixtures):
+        # Fixtures the store doesn't know yet are only new to it, e.g. on
+        # the first load, so finishing is only told from a stored copy
+        return [
+            fixture
+            for fixture in fixtures
+            if fixture["finished"]
+            and fixture["id"] in self.by_id
+            and not self.by_id[fixture["id"]]["finished"]
+        ]
+
+    def _index(self):
+        by_gameweek = {}
+        by_team = {}
+        for fixture in self.by_id.values():
+            by_gameweek.setdefault(fixture["event"], []).append(fixture)
+            by_team.setdefault(fixture["team_h"], []).append(fixture)
+            by_team.setdefault(fixture["team_a"], []).append(fixture)
+        self.by_gameweek = by_gameweek
+        self.by_team = by_team
+        self.version += 1
+
+
+class LiveStore:
+    """The ``event/{id}/live`` elements of recent gameweeks, kept for
+    ``ttl`` seconds.
+
+    The live stats only change while a gameweek is being played, and
+    clients polling within ``ttl`` seconds of each other share one download
+    through the store. Expired gameweeks are dropped as others are added.
+    """
+
+    def __init__(self, ttl=DEFAULT_LIVE_ELEMENTS_TTL):
+        self.ttl = ttl
+        self._elements = {}
+
+    def __len__(self):
+        return len(self._elements)
+
+    def get(self, gameweek):
+        """Returns the live elements of a gameweek if recent enough, or
+        ``None``."""
+        try:
+            fetched_at, elements = self._elements[gameweek]
+        except KeyError:
+            return None
+        if time.monotonic() - fetched_at >= self.ttl:
+            return None
+        return elements
+
+    def put(self, gameweek, elements):
+        """Stores the live elements of a gameweek."""
+        now = time.monotonic()
+        self._elements = {
+            cached: entry
+            for cached, entry in self._elements.items()
+            if now - entry[0] < self.ttl
+        }
+        self._elements[gameweek] = (now, elements)
+
+
+class PublicData:
+    """The public FPL data shared by every client pointed at the same API.
+
+    ``bootstrap-static``, the fixtures, the ``event/{id}/live`` stats and
+    the ``element-summary`` payloads are the same for every user, so clients
+    created with the stores of one :class:`PublicData` download each of them
+    once between them, and share requests in flight through its coalescer.
+    They also share its scheduler, so its concurrency and rate limits hold
+    for all of them together rather than for each. Everything tied to a
+    login, like picks and entry history, stays with the client.
+
+    ``references`` holds whoever uses the data, e.g. config entry IDs, so it
+    can be dropped along with the last of them.
+    """
+
+    def __init__(
+        self,
+        bootstrap_cache=None,
+        summary_cache=None,
+        fixtures_store=None,
+        live_store=None,
+        coalescer=None,
+        scheduler=None,
+    ):
+        if bootstrap_cache is None:
+            bootstrap_cache = BootstrapCache()
+        if summary_cache is None:
+            summary_cache = SummaryCache()
+        if fixtures_store is None:
+            fixtures_store = FixturesStore()
+        if live_store is None:
+            live_store = LiveStore()
+        if coalescer is None:
+            coalescer = RequestCoalescer()
+        if scheduler is None:
+            scheduler = RequestScheduler()
+        self.bootstrap = bootstrap_cache
+        self.summaries = summary_cache
+        self.fixtures = fixtures_store
+        self.live = live_store
+        self.coalescer = coalescer
+        self.scheduler = scheduler
+        self.references = set()
+
+
+class AuthState:
+    """Keeps track of the login of a client's session.
+
+    The session's cookie jar holds the actual authentication, this only
+    makes sure that a single login runs at a time and records how often
+    logging in was needed and how long it took.
+    """
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.credentials = None
+        self.logins = 0
+        self.relogins = 0
+        self.failures = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+        self.logged_in_at = None
+
+    def record(self, latency, failed=False):
+        """Records a login attempt that took ``latency`` seconds."""
+        self.last_latency = latency
+        self.total_latency += latency
+        if failed:
+            self.failures += 1
+        else:
+            self.logins += 1
+            self.logged_in_at = time.time()
+
+    def stats(self):
+        """Returns the login counters and latencies."""
+        return {
+            "logins": self.logins,
+            "relogins": self.relogins,
+            "failures": self.failures,
+            "last_latency": self.last_latency,
+            "average_latency": self.total_latency / (self.logins + self.failures)
+            if self.logins + self.failures
+            else None,
+        }
 
 
 class FPL:
     """The FPL class."""
 
-    def __init__(self, session):
+    def __init__(
+        self,
+        session,
+        bootstrap_cache=None,
+        scheduler=None,
+        summary_cache=None,
+        coalescer=None,
+        fixtures_store=None,
+        auth=None,
+        live_store=None,
+        timeout=DEFAULT_TIMEOUT,
+        api_base_url=API_BASE_URL,
+        login_url=LOGIN_URL,
+        metrics=None,
+    ):
         self.session = session
+        if bootstrap_cache is None:
+            bootstrap_cache = BootstrapCache()
+        if scheduler is None:
+            scheduler = RequestScheduler(timeout=timeout)
+        if summary_cache is None:
+            summary_cache = SummaryCache()
+        if coalescer is None:
+            coalescer = RequestCoalescer()
+        if fixtures_store is None:
+            fixtures_store = FixturesStore()
+        if auth is None:
+            auth = AuthState()
+        if live_store is None:
+            live_store = LiveStore()
+        self.bootstrap = bootstrap_cache
+        self.scheduler = scheduler
+        self.summaries = summary_cache
+        self.coalescer = coalescer
+        self.fixtures_store = fixtures_store
+        self.auth = auth
+        self.live_store = live_store
+        self.timeout = timeout
+        self.fdr_state = None
+        self.urls = api_urls(api_base_url)
+        self.login_url = login_url
+        if metrics is None:
+            metrics = RequestMetrics(self.urls)
+        self.metrics = metrics
+
+    async def close(self):
+        """Closes the underlying session and its pooled connections."""
+        if not self.session.closed:
+            await self.session.close()
+
+    async def fetch(self, url, shared=True):
+        """Fetches ``url`` through the client's request scheduler.
+
+        Concurrent fetches of a public URL share one request through the
+        client's coalescer. Responses that depend on the logged in user
+        must be fetched with ``shared=False``.
+        """
+        endpoint = self.metrics.endpoint(url)
+        if not shared:
+            return await self.scheduler.fetch(self.session, url, self.metrics, endpoint)
+        if self.coalescer.in_flight(url):
+            self.metrics.coalesced(endpoint)
+        return await self.coalescer.run(
+            url,
+            lambda: self.scheduler.fetch(self.session, url, self.metrics, endpoint),
+        )
 
     def init(self):
-        static = self.open_static_urls()
-        for k, v in static.items():
-            try:
-                v = {w["id"]: w for w in v}
-            except (KeyError, TypeError):
-                pass
+        """Loads ``bootstrap-static`` synchronously.
+
+        Only meant for scripting outside of Home Assistant, where blocking
+        the calling thread is fine. Use :meth:`async_init` everywhere else.
+        """
+        if not self.bootstrap.fresh:
+            self.load_static()
+        self.apply_static()
+
+    async def async_init(self):
+        """Loads ``bootstrap-static`` through the client's session, unless
+        the cached copy is still fresh.
+        """
+        if not self.bootstrap.fresh:
+            async with self.bootstrap.lock:
+                if not self.bootstrap.fresh:
+                    await self.async_load_static()
+                    self.apply_static()
+                    return
+        self.metrics.hit("static")
+        self.apply_static()
+
+    def apply_static(self):
+        """Exposes the cached ``bootstrap-static`` sections as attributes."""
+        for k, v in self.bootstrap.static.items():
             setattr(self, k, v)
-        try:
-            setattr(
-                self,
-                "current_gameweek",
-                next(event for event in static["events"] if event["is_current"])["id"],
-            )
-        except StopIteration:
-            setattr(self, "current_gameweek", 0)
+        self.current_gameweek = self.bootstrap.current_gameweek
+
+    async def async_load_static(self):
+        """Downloads ``bootstrap-static`` into the cache, or revalidates the
+        cached copy if there is one.
 
-    async def async_init(self, hass):
-        static = await hass.async_add_executor_job(self.open_static_urls)
-        for k, v in static.items():
+        The body is read in chunks as it arrives and gzip/deflate transfer
+        encodings are decoded by aiohttp, so the load can be cancelled at
+        any point without tying up a thread.
+        """
+        headers = {
+            "Accept-Encoding": "gzip, deflate",
+            **self.bootstrap.conditional_headers(),
+        }
+        async with self.scheduler.slot():
+            started = time.monotonic()
             try:
-                v = {w["id"]: w for w in v}
-            except (KeyError, TypeError):
-                pass
-            setattr(self, k, v)
-        try:
-            setattr(
-                self,
-                "current_gameweek",
-                next(event for event in static["events"] if event["is_current"])["id"],
+                size = await self._download_static(headers)
+            except aiohttp.ClientResponseError as error:
+                self.metrics.record(
+                    "static", time.monotonic() - started, error=error.status
+                )
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self.metrics.record("static", time.monotonic() - started, error=error)
+                raise
+            self.metrics.record("static", time.monotonic() - started, size)
+
+    async def _download_static(self, headers):
+        """Downloads ``bootstrap-static`` into the cache and returns the
+        bytes read, none for a 304."""
+        async with self.session.get(
+            self.urls["static"],
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as response:
+            if response.status == 304:
+                self.bootstrap.touch()
+                self.metrics.hit("static")
+                return 0
+            response.raise_for_status()
+            self.metrics.miss("static")
+
+            parser = self.bootstrap.parser()
+            body = bytearray()
+            size = 0
+            async for chunk in response.content.iter_chunked(BOOTSTRAP_CHUNK_SIZE):
+                size += len(chunk)
+                if parser is None:
+                    body.extend(chunk)
+                else:
+                    parser.feed(chunk)
+
+            self.bootstrap.replace(
+                key_by_id(json.loads(body)) if parser is None else parser.close(),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
             )
-        except StopIteration:
-            setattr(self, "current_gameweek", 0)
+            return size
 
-    def open_static_urls(self):
-        return json.loads(urlopen(API_URLS["static"]).read().decode("utf-8"))
+    def load_static(self):
+        """Blocking counterpart of :meth:`async_load_static` used by
+        :meth:`init`.
+        """
+        started = time.monotonic()
+        try:
+            sections, etag, last_modified = self.open_static_urls(
+                self.bootstrap.conditional_headers()
+            )
+        except HTTPError as err:
+            if err.code != 304:
+                self.metrics.record(
+                    "static", time.monotonic() - started, error=err.code
+                )
+                raise
+            self.metrics.record("static", time.monotonic() - started)
+            self.metrics.hit("static")
+            self.bootstrap.touch()
+            return
+        except OSError as err:
+            self.metrics.record("static", time.monotonic() - started, error=err)
+            raise
+        self.metrics.record("static", time.monotonic() - started)
+        self.metrics.miss("static")
+        self.bootstrap.replace(sections, etag, last_modified)
+
+    def open_static_urls(self, headers=None):
+        """Downloads and parses ``bootstrap-static`` with ``urllib``.
+
+        :return: The id-keyed sections, the ``ETag`` and the
+            ``Last-Modified`` header.
+        :rtype: tuple
+        """
+        request = Request(
+            self.urls["static"],
+            headers={"Accept-Encoding": "gzip, deflate", **(headers or {})},
+        )
+        with urlopen(request, timeout=self.timeout) as response:
+            encoding = response.headers.get("Content-Encoding")
+            parser = self.bootstrap.parser()
+            if parser is None:
+                body = response.read()
+                if encoding == "gzip":
+                    body = gzip.decompress(body)
+                elif encoding == "deflate":
+                    body = zlib.decompress(body)
+                sections = key_by_id(json.loads(body))
+            else:
+                if encoding == "gzip":
+                    decompress = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress
+                elif encoding == "deflate":
+                    decompress = zlib.decompressobj().decompress
+                else:
+                    decompress = bytes
+                while True:
+                    chunk = response.read(BOOTSTRAP_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    parser.feed(decompress(chunk))
+                sections = parser.close()
+            return (
+                sections,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
 
     async def get_user(self, user_id=None, return_json=False):
         """Returns the user with the given ``user_id``.
@@ -109,7 +981,7 @@ class FPL:
         else:
             # If no user ID provided get it from current session
             try:
-                user = await get_current_user(self.session)
+                user = await self.fetch(self.urls["me"], shared=False)
                 user_id = user["player"]["entry"]
             except TypeError:
                 raise Exception(
@@ -117,8 +989,8 @@ class FPL:
                     "you do not provide a user ID."
                 )
 
-        url = API_URLS["user"].format(user_id)
-        user = await fetch(self.session, url)
+        url = self.urls["user"].format(user_id)
+        user = await self.fetch(url)
 
         if return_json:
             return user
@@ -142,8 +1014,9 @@ class FPL:
         teams = getattr(self, "teams")
 
         if team_ids:
-            team_ids = set(team_ids)
-            teams = [team for team in teams.values() if team["id"] in team_ids]
+            teams = [
+                teams[int(team_id)] for team_id in team_ids if int(team_id) in teams
+            ]
         else:
             teams = [team for team in teams.values()]
 
@@ -191,8 +1064,31 @@ class FPL:
             20 - Wolves
         """
         assert 0 < int(team_id) < 21, "Team ID must be a number between 1 and 20."
-        teams = getattr(self, "teams")
-        team = next(team for team in teams.values() if team["id"] == int(team_id))
+        team = self.teams[int(team_id)]
+
+        if return_json:
+            return team
+
+        return Team(team, self.session)
+
+    async def get_team_by_name(self, name, return_json=False):
+        """Returns the team with the given name or short name, e.g.
+        ``"Man Utd"`` or ``"MUN"``. The lookup is case insensitive.
+
+        Information is taken from:
+            https://fantasy.premierleague.com/api/bootstrap-static/
+
+        :param string name: A team's name or short name.
+        :param return_json: (optional) Boolean. If ``True`` returns a ``dict``,
+            if ``False`` returns a :class:`Team` object. Defaults to ``False``.
+        :type return_json: bool
+        :rtype: :class:`Team` or ``dict``
+        :raises ValueError: Team with ``name`` not found
+        """
+        try:
+            team = self.bootstrap.teams_by_name[name.lower()]
+        except KeyError:
+            raise ValueError(f"Team with name {name} not found")
 
         if return_json:
             return team
@@ -213,14 +1109,26 @@ class FPL:
         :rtype: :class:`PlayerSummary` or ``dict``
         """
         assert int(player_id) > 0, "Player's ID must be a positive number"
-        url = API_URLS["player"].format(player_id)
-        player_summary = await fetch(self.session, url)
+        player_summary = await self._get_player_summary(int(player_id))
 
         if return_json:
             return player_summary
 
         return PlayerSummary(player_summary)
 
+    async def _get_player_summary(self, player_id):
+        player_summary = self.summaries.get(player_id)
+        if player_summary is not None:
+            self.metrics.hit("player")
+        else:
+            self.metrics.miss("player")
+            player_summary = await self.fetch(self.urls["player"].format(player_id))
+            player = getattr(self, "elements", {}).get(player_id)
+            self.summaries.put(
+                player_id, player["team"] if player else None, player_summary
+            )
+        return player_summary
+
     async def get_player_summaries(self, player_ids, return_json=False):
         """Returns a list of summaries of players whose ID are
         in the ``player_ids`` list.
@@ -238,14 +1146,9 @@ class FPL:
         if not player_ids:
             return []
 
-        tasks = [
-            asyncio.ensure_future(
-                fetch(self.session, API_URLS["player"].format(player_id))
-            )
-            for player_id in player_ids
-        ]
-
-        player_summaries = await asyncio.gather(*tasks)
+        player_summaries = await gather_all(
+            *[self._get_player_summary(int(player_id)) for player_id in player_ids]
+        )
 
         if return_json:
             return player_summaries
@@ -276,22 +1179,18 @@ class FPL:
             players = getattr(self, "elements")
 
         try:
-            player = next(
-                player for player in players.values() if player["id"] == player_id
-            )
-        except StopIteration:
+            player = players[int(player_id)]
+        except KeyError:
             raise ValueError(f"Player with ID {player_id} not found")
 
-        if include_summary:
-            player_summary = await self.get_player_summary(
-                player["id"], return_json=True
-            )
-            player.update(player_summary)
+        if not include_summary:
+            return player if return_json else Player(player, self.session)
 
+        player_summary = await self.get_player_summary(player["id"], return_json=True)
         if return_json:
-            return player
+            return {**player, **player_summary}
 
-        return Player(player, self.session)
+        return Player(player, self.session, player_summary)
 
     async def get_players(
         self, player_ids=None, include_summary=False, return_json=False
@@ -317,7 +1216,9 @@ class FPL:
         if not include_summary:
             if player_ids:
                 players = [
-                    player for player in players.values() if player["id"] in player_ids
+                    players[player_id]
+                    for player_id in player_ids
+                    if player_id in players
                 ]
             else:
                 players = players.values()
@@ -330,16 +1231,105 @@ class FPL:
         if not player_ids:
             player_ids = [player["id"] for player in players.values()]
 
-        tasks = [
-            asyncio.ensure_future(
+        players = await gather_all(
+            *[
                 self.get_player(player_id, players, include_summary, return_json)
-            )
-            for player_id in player_ids
-        ]
-        players = await asyncio.gather(*tasks)
+                for player_id in player_ids
+            ]
+        )
 
         return players
 
+    async def get_players_by_team(self, team_id, return_json=False):
+        """Returns a list of the players of the team with the given
+        ``team_id``.
+
+        Information is taken from:
+            https://fantasy.premierleague.com/api/bootstrap-static/
+
+        :param team_id: A team's ID.
+        :type team_id: string or int
+        :param return_json: (optional) Boolean. If ``True`` returns a list of
+            ``dict``s, if ``False`` returns a list of  :class:`Player`
+            objects. Defaults to ``False``.
+        :type return_json: bool
+        :rtype: list
+        """
+        players = self.bootstrap.elements_by_team.get(int(team_id), [])
+
+        if return_json:
+            return players
+
+        return [Player(player, self.session) for player in players]
+
+    async def get_players_by_position(self, position, return_json=False):
+        """Returns a list of the players with the given ``position``, i.e.
+        ``element_type`` (1 - Goalkeeper, 2 - Defender, 3 - Midfielder and
+        4 - Forward).
+
+        Information is taken from:
+            https://fantasy.premierleague.com/api/bootstrap-static/
+
+        :param int position: A player's ``element_type``.
+        :param return_json: (optional) Boolean. If ``True`` returns a list of
+            ``dict``s, if ``False`` returns a list of  :class:`Player`
+            objects. Defaults to ``False``.
+        :type return_json: bool
+        :rtype: list
+        """
+        players = self.bootstrap.elements_by_position.get(int(position), [])
+
+        if return_json:
+            return players
+
+        return [Player(player, self.session) for player in players]
+
+    async def load_fixtures(self):
+        """Makes sure the fixtures store is up to date.
+
+        All fixtures are loaded with a single request once the store is
+        older than its TTL. Gameweeks with a fixture in progress are
+        refreshed on their own, as soon as their live TTL has run out.
+        """
+        store = self.fixtures_store
+        async with store.lock:
+            if store.fresh:
+                self.metrics.hit("fixtures")
+            else:
+                self.metrics.miss("fixtures")
+                fixtures = await self.fetch(self.urls["fixtures"])
+                self.invalidate_summaries(store.update(fixtures))
+
+            gameweeks = []
+            for gameweek in store.in_progress_gameweeks():
+                if store.gameweek_fresh(gameweek):
+                    self.metrics.hit("gameweek_fixtures")
+                else:
+                    self.metrics.miss("gameweek_fixtures")
+                    gameweeks.append(gameweek)
+            if not gameweeks:
+                return
+
+            gameweek_fixtures = await gather_all(
+                *[
+                    self.fetch(self.urls["gameweek_fixtures"].format(gameweek))
+                    for gameweek in gameweeks
+                ]
+            )
+            for gameweek, fixtures in zip(gameweeks, gameweek_fixtures):
+                self.invalidate_summaries(store.update_gameweek(gameweek, fixtures))
+
+    def invalidate_summaries(self, finished):
+        """Drops the cached summaries of the players of both teams of every
+        fixture in ``finished``, whose histories are out of date now."""
+        teams = {
+            team_id
+            for fixture in finished
+            for team_id in (fixture["team_h"], fixture["team_a"])
+        }
+        if teams:
+            self.summaries.invalidate_teams(teams)
+
     async def get_fixture(self, fixture_id, return_json=False):
         """Returns the fixture with the given ``fixture_id``.
 
@@ -355,28 +1345,12 @@ class FPL:
         :rtype: :class:`Fixture` or ``dict``
         :raises ValueError: if fixture with ``fixture_id`` not found
         """
-        fixtures = await fetch(self.session, API_URLS["fixtures"])
+        await self.load_fixtures()
 
         try:
-            fixture = next(
-                fixture for fixture in fixtures if fixture["id"] == fixture_id
-            )
-        except StopIteration:
+            fixture = self.fixtures_store.by_id[int(fixture_id)]
+        except KeyError:
             raise ValueError(f"Fixture with ID {fixture_id} not found")
-        fixture_gameweek = fixture["event"]
-
-        gameweek_fixtures = await fetch(
-            self.session, API_URLS["gameweek_fixtures"].format(fixture_gameweek)
-        )
-
-        try:
-            fixture = next(
-                fixture for fixture in gameweek_fixtures if fixture["id"] == fixture_id
-            )
-        except StopIteration:
-            raise ValueError(
-                f"Fixture with ID {fixture_id} not found in gameweek fixtures"
-            )
 
         if return_json:
             return fixture
@@ -401,22 +1375,12 @@ class FPL:
         if not fixture_ids:
             return []
 
-        fixtures = await fetch(self.session, API_URLS["fixtures"])
-        fixture_gameweeks = set(
-            fixture["event"] for fixture in fixtures if fixture["id"] in fixture_ids
-        )
-        tasks = [
-            asyncio.ensure_future(
-                fetch(self.session, API_URLS["gameweek_fixtures"].format(gameweek))
-            )
-            for gameweek in fixture_gameweeks
-        ]
-
-        gameweek_fixtures = await asyncio.gather(*tasks)
-        merged_fixtures = list(itertools.chain(*gameweek_fixtures))
-
+        await self.load_fixtures()
+        by_id = self.fixtures_store.by_id
         fixtures = [
-            fixture for fixture in merged_fixtures if fixture["id"] in fixture_ids
+            by_id[int(fixture_id)]
+            for fixture_id in fixture_ids
+            if int(fixture_id) in by_id
         ]
 
         if return_json:
@@ -439,9 +1403,36 @@ class FPL:
         :type return_json: bool
         :rtype: list
         """
-        fixtures = await fetch(
-            self.session, API_URLS["gameweek_fixtures"].format(gameweek)
-        )
+        await self.load_fixtures()
+        # No gameweek is current before the season starts, and the fixtures
+        # without a gameweek yet are kept under None
+        if gameweek is None:
+            fixtures = []
+        else:
+            fixtures = self.fixtures_store.by_gameweek.get(int(gameweek), [])
+
+        if return_json:
+            return fixtures
+
+        return [Fixture(fixture) for fixture in fixtures]
+
+    async def get_fixtures_by_team(self, team_id, return_json=False):
+        """Returns a list of all fixtures of the team with the given
+        ``team_id``, home and away.
+
+        Information is taken from e.g.:
+            https://fantasy.premierleague.com/api/fixtures/
+
+        :param team_id: A team's ID.
+        :type team_id: string or int
+        :param return_json: (optional) Boolean. If ``True`` returns a list of
+            ``dict``s, if ``False`` returns a list of  :class:`Fixture`
+            objects. Defaults to ``False``.
+        :type return_json: bool
+        :rtype: list
+        """
+        await self.load_fixtures()
+        fixtures = self.fixtures_store.by_team.get(int(team_id), [])
 
         if return_json:
             return fixtures
@@ -453,7 +1444,6 @@ class FPL:
 
         Information is taken from e.g.:
             https://fantasy.premierleague.com/api/fixtures/
-            https://fantasy.premierleague.com/api/fixtures/?event=1
 
         :param return_json: (optional) Boolean. If ``True`` returns a list of
             ``dicts``, if ``False`` returns a list of  :class:`Fixture`
@@ -461,22 +1451,37 @@ class FPL:
         :type return_json: bool
         :rtype: list
         """
-        gameweeks = range(1, 39)
-        tasks = [
-            asyncio.ensure_future(
-                fetch(self.session, API_URLS["gameweek_fixtures"].format(gameweek))
-            )
-            for gameweek in gameweeks
-        ]
-
-        gameweek_fixtures = await asyncio.gather(*tasks)
-        fixtures = list(itertools.chain(*gameweek_fixtures))
+        await self.load_fixtures()
+        fixtures = list(self.fixtures_store.by_id.values())
 
         if return_json:
             return fixtures
 
         return [Fixture(fixture) for fixture in fixtures]
 
+    async def get_live_elements(self, gameweek_id):
+        """Returns the live stats of every player in the gameweek with the ID
+        ``gameweek_id``, as the raw list of ``elements``. The list may be
+        shared with other callers and must not be modified.
+
+        Information is taken from e.g.:
+            https://fantasy.premierleague.com/api/event/1/live/
+
+        The elements are served from the client's live store while they are
+        recent enough.
+
+        :param int gameweek_id: A gameweek's ID.
+        :rtype: list
+        """
+        elements = self.live_store.get(gameweek_id)
+        if elements is not None:
+            self.metrics.hit("gameweek_live")
+            return elements
+        self.metrics.miss("gameweek_live")
+        live_gameweek = await self.fetch(self.urls["gameweek_live"].format(gameweek_id))
+        self.live_store.put(gameweek_id, live_gameweek["elements"])
+        return live_gameweek["elements"]
+
     async def get_gameweek(self, gameweek_id, include_live=False, return_json=False):
         """Returns the gameweek with the ID ``gameweek_id``.
 
@@ -494,25 +1499,18 @@ class FPL:
         :rtype: :class:`Gameweek` or ``dict``
         """
 
-        static_gameweeks = getattr(self, "events")
-
         try:
-            static_gameweek = next(
-                gameweek
-                for gameweek in static_gameweeks.values()
-                if gameweek["id"] == gameweek_id
-            )
-        except StopIteration:
+            static_gameweek = self.events[int(gameweek_id)]
+        except KeyError:
             raise ValueError(f"Gameweek with ID {gameweek_id} not found")
 
         if include_live:
-            live_gameweek = await fetch(
-                self.session, API_URLS["gameweek_live"].format(gameweek_id)
-            )
-
-            # Convert element list to dict
-            live_gameweek["elements"] = {
-                element["id"]: element for element in live_gameweek["elements"]
+            # Convert element list to dict, leaving the shared list as is
+            live_gameweek = {
+                "elements": {
+                    element["id"]: element
+                    for element in await self.get_live_elements(gameweek_id)
+                },
             }
 
             # Include live bonus points
@@ -530,15 +1528,19 @@ class FPL:
                 }
 
                 for player_id, bonus_points in bonus_for_gameweek.items():
-                    if live_gameweek["elements"][player_id]["stats"]["bonus"] == 0:
-                        live_gameweek["elements"][player_id]["stats"][
-                            "bonus"
-                        ] += bonus_points
-                        live_gameweek["elements"][player_id]["stats"][
-                            "total_points"
-                        ] += bonus_points
-
-            static_gameweek.update(live_gameweek)
+                    element = live_gameweek["elements"][player_id]
+                    stats = element["stats"]
+                    if stats["bonus"] == 0:
+                        live_gameweek["elements"][player_id] = {
+                            **element,
+                            "stats": {
+                                **stats,
+                                "bonus": stats["bonus"] + bonus_points,
+                                "total_points": stats["total_points"] + bonus_points,
+                            },
+                        }
+
+            static_gameweek = {**static_gameweek, **live_gameweek}
 
         if return_json:
             return static_gameweek
@@ -566,14 +1568,12 @@ class FPL:
         if not gameweek_ids:
             gameweek_ids = range(1, 39)
 
-        tasks = [
-            asyncio.ensure_future(
+        gameweeks = await gather_all(
+            *[
                 self.get_gameweek(gameweek_id, include_live, return_json)
-            )
-            for gameweek_id in gameweek_ids
-        ]
-
-        gameweeks = await asyncio.gather(*tasks)
+                for gameweek_id in gameweek_ids
+            ]
+        )
         return gameweeks
 
     async def get_classic_league(self, league_id, return_json=False):
@@ -591,11 +1591,11 @@ class FPL:
         :type return_json: bool
         :rtype: :class:`ClassicLeague` or ``dict``
         """
-        if not logged_in(self.session):
+        if not self.logged_in():
             raise Exception("User must be logged in.")
 
-        url = API_URLS["league_classic"].format(league_id)
-        league = await fetch(self.session, url)
+        url = self.urls["league_classic"].format(league_id)
+        league = await self.fetch(url, shared=False)
 
         if return_json:
             return league
@@ -617,11 +1617,11 @@ class FPL:
         :type return_json: bool
         :rtype: :class:`H2HLeague` or ``dict``
         """
-        if not logged_in(self.session):
+        if not self.logged_in():
             raise Exception("User must be logged in.")
 
-        url = API_URLS["league_h2h"].format(league_id)
-        league = await fetch(self.session, url)
+        url = self.urls["league_h2h"].format(league_id)
+        league = await self.fetch(url, shared=False)
 
         if return_json:
             return league
@@ -649,12 +1649,127 @@ class FPL:
             "redirect_uri": "https://fantasy.premierleague.com/a/login",
         }
 
-        login_url = "https://users.premierleague.com/accounts/login/"
-        async with self.session.post(login_url, data=payload) as response:
-            state = response.url.query["state"]
-            if state == "fail":
-                reason = response.url.query["reason"]
-                raise ValueError(f"Login not successful, reason: {reason}")
+        started = time.monotonic()
+        try:
+            async with self.scheduler.slot(), self.session.post(
+                self.login_url, data=payload
+            ) as response:
+                response.raise_for_status()
+                state = response.url.query["state"]
+                if state == "fail":
+                    reason = response.url.query["reason"]
+                    raise ValueError(f"Login not successful, reason: {reason}")
+        except Exception as error:
+            latency = time.monotonic() - started
+            self.auth.record(latency, failed=True)
+            if isinstance(error, aiohttp.ClientResponseError):
+                error = error.status
+            self.metrics.record("login", latency, error=error)
+            raise
+        latency = time.monotonic() - started
+        self.auth.record(latency)
+        self.metrics.record("login", latency)
+        self.auth.credentials = (email, password)
+
+    def logged_in(self):
+        """Returns whether the session has a login cookie for the client's
+        login URL.
+        """
+        return "csrftoken" in self.session.cookie_jar.filter_cookies(
+            URL(self.login_url).origin()
+        )
+
+    async def ensure_login(self, email=None, password=None, logins=None):
+        """Logs in, unless the session already is logged in.
+
+        Only one login runs at a time, callers that wait for it reuse its
+        result instead of logging in again.
+
+        :param string email: Email address for the user's Fantasy Premier
+            League account. Defaults to the last one logged in with.
+        :param string password: Password for the user's Fantasy Premier
+            League account. Defaults to the last one logged in with.
+        :param int logins: (optional) The login count seen by a caller whose
+            request was rejected. The session is then logged in again, unless
+            another caller has done so in the meantime.
+        """
+        if email and password:
+            self.auth.credentials = (email, password)
+        async with self.auth.lock:
+            if logins is None:
+                if self.logged_in():
+                    return
+            elif logins != self.auth.logins:
+                return
+            else:
+                self.auth.relogins += 1
+            await self.login(*(self.auth.credentials or (email, password)))
+
+    async def get_my_team(self, user_id):
+        """Returns the logged in user's current picks. Requires the user to
+        have logged in using ``fpl.login()`` or ``fpl.ensure_login()``.
+
+        The session is logged in again once if the API rejects it.
+
+        Information is taken from e.g.:
+            https://fantasy.premierleague.com/api/my-team/91928/
+
+        :param int user_id: The logged in user's ID.
+        :rtype: list
+        """
+        url = self.urls["user_team"].format(user_id)
+        logins = self.auth.logins
+        try:
+            response = await self.fetch(url, shared=False)
+        except aiohttp.ClientResponseError as error:
+            if error.status not in AUTH_STATUSES:
+                raise
+            await self.ensure_login(logins=logins)
+            response = await self.fetch(url, shared=False)
+        return response["picks"]
+
+    def export_cookies(self):
+        """Returns the session's cookies as a JSON serialisable list.
+
+        A cookie's ``max-age`` is exported as the ``expires`` it amounts to,
+        counting from the last login, so restored cookies still expire.
+        """
+        set_at = self.auth.logged_in_at or time.time()
+        return [
+            {
+                "name": morsel.key,
+                "value": morsel.value,
+                "domain": morsel["domain"],
+                "path": morsel["path"],
+                "expires": formatdate(set_at + int(morsel["max-age"]), usegmt=True)
+                if morsel["max-age"]
+                else morsel["expires"],
+                "secure": bool(morsel["secure"]),
+                "httponly": bool(morsel["httponly"]),
+            }
+            for morsel in self.session.cookie_jar
+        ]
+
+    def restore_cookies(self, cookies):
+        """Puts cookies from :meth:`export_cookies` back into the session.
+
+        Cookies that have expired in the meantime are dropped by the cookie
+        jar, the next request that needs them logs in again.
+        """
+        by_domain = {}
+        for cookie in cookies:
+            morsels = by_domain.setdefault(cookie["domain"], SimpleCookie())
+            morsels[cookie["name"]] = cookie["value"]
+            morsel = morsels[cookie["name"]]
+            for attribute in ("domain", "path", "expires"):
+                if cookie[attribute]:
+                    morsel[attribute] = cookie[attribute]
+            morsel["secure"] = cookie["secure"]
+            morsel["httponly"] = cookie["httponly"]
+        for domain, morsels in by_domain.items():
+            self.session.cookie_jar.update_cookies(
+                morsels, URL(f"https://{domain.lstrip('.')}/")
+            )
 
     async def get_points_against(self):
         """Returns a dictionary containing the points scored against all teams
@@ -693,41 +1808,20 @@ class FPL:
         :rtype: dict
         """
         players = await self.get_players(include_summary=True, return_json=True)
-        points_against = {}
-
-        for player in players:
-            position = position_converter(player["element_type"]).lower()
-
-            for fixture in player["history"]:
-                if fixture["minutes"] == 0:
-                    continue
-
-                points = fixture["total_points"]
-                opponent = team_converter(fixture["opponent_team"])
-                location = "H" if fixture["was_home"] else "A"
-
-                points_against.setdefault(
-                    opponent,
-                    {
-                        "all": {"H": [], "A": []},
-                        "goalkeeper": {"H": [], "A": []},
-                        "defender": {"H": [], "A": []},
-                        "midfielder": {"H": [], "A": []},
-                        "forward": {"H": [], "A": []},
-                    },
-                )
+        return PointsAgainst(players).to_dict()
 
-                points_against[opponent]["all"][location].append(points)
-                points_against[opponent][position][location].append(points)
-
-        return points_against
-
-    async def FDR(self):
+    async def FDR(self, incremental=False):
         """Creates a new Fixture Difficulty Ranking (FDR) based on the number
         of points each team gives up to players in the Fantasy Premier League.
         These numbers are also between 1.0 and 5.0 to give a similar ranking
         system to the official FDR.
 
+        With ``incremental=True`` the points against are kept in an
+        :class:`FDRState` between calls. The first call seeds it from every
+        player's summary, later calls only fetch the ``event/{id}/live`` data
+        of gameweeks with fixtures that finished since and fold those in.
+        Fixtures in progress aren't counted in that mode.
+
         An example:
 
         .. code-block:: javascript
@@ -783,74 +1877,46 @@ class FPL:
         :rtype: dict
         """
 
-        def average_points_against(points_against):
-            """Returns a dict with the average points scored against all teams,
-            per position and location.
-
-            :param dict points_against: A dict containing the points scored
-                against each team in the Premier League.
-            :rtype: dict
-            """
-            for team, positions in points_against.items():
-                for position in positions.values():
-                    position["H"] = average(position["H"])
-                    position["A"] = average(position["A"])
-
-                points_against[team] = positions
-
-            return points_against
-
-        def get_extrema(points_against):
-            """Returns the extrema for each position and location.
-
-            :param dict points_against: A dict containing the points scored
-                against each team in the Premier League.
-            :rtype: dict
-            """
-            averages = {}
-            for _, positions in points_against.items():
-                for position, average in positions.items():
-                    averages.setdefault(position, {"H": [], "A": []})
-                    averages[position]["H"].append(average["H"])
-                    averages[position]["A"].append(average["A"])
-
-            for position, locations in averages.items():
-                min_h = min(locations["H"])
-                min_a = min(locations["A"])
-                max_h = max(locations["H"])
-                max_a = max(locations["A"])
-                averages[position]["H"] = [min_h, max_h]
-                averages[position]["A"] = [min_a, max_a]
-
-            return averages
-
-        def calculate_fdr(average_points, extrema):
-            """Returns a dict containing the FDR for each team, which is
-            calculated by scaling the average points conceded per position
-            between 1.0 and 5.0 using the given extrema.
-
-            :param dict points_against: A dict containing the points scored
-                against each team in the Premier League.
-            :param dict extrema: A dict containing the extrema for each
-                position and location.
-            :rtype: dict
-            """
-            for team, positions in average_points.items():
-                for position, locations in positions.items():
-                    min_h, max_h = extrema[position]["H"]
-                    min_a, max_a = extrema[position]["A"]
-
-                    fdr_h = scale(locations["H"], 5.0, 1.0, min_h, max_h)
-                    fdr_a = scale(locations["A"], 5.0, 1.0, min_a, max_a)
-
-                    average_points[team][position]["H"] = fdr_h
-                    average_points[team][position]["A"] = fdr_a
-
-            return average_points
-
-        points_against = await self.get_points_against()
-        average_points = average_points_against(points_against)
-        extrema = get_extrema(average_points)
-        fdr = calculate_fdr(average_points, extrema)
-
-        return fdr
+        if incremental:
+            return (await self.update_fdr_state()).fdr()
+
+        players = await self.get_players(include_summary=True, return_json=True)
+        return PointsAgainst(players).fdr()
+
+    async def update_fdr_state(self):
+        """Brings :attr:`fdr_state` up to date with the finished fixtures,
+        seeding it first if needed.
+
+        :rtype: FDRState
+        """
+        await self.async_init()
+        await self.load_fixtures()
+        finished = {
+            fixture_id
+            for fixture_id, fixture in self.fixtures_store.by_id.items()
+            if fixture["finished"]
+        }
+
+        if self.fdr_state is None:
+            players = await self.get_players(include_summary=True, return_json=True)
+            if self.fdr_state is None:
+                state = FDRState()
+                state.seed(PointsAgainst(players), finished)
+                self.fdr_state = state
+            return self.fdr_state
+
+        state = self.fdr_state
+        by_gameweek = {}
+        for fixture_id in finished - state.fixtures:
+            fixture = self.fixtures_store.by_id[fixture_id]
+            by_gameweek.setdefault(fixture["event"], []).append(fixture)
+        if not by_gameweek:
+            return state
+
+        gameweeks = list(by_gameweek)
+        live = await gather_all(
+            *[self.get_live_elements(gameweek) for gameweek in gameweeks]
+        )
+        for gameweek, live_elements in zip(gameweeks, live):
+            state.fold(by_gameweek[gameweek], live_elements, self.elements)
+        return state
@@ -0,0 +1,344 @@
+"""
+Columnar storage of player gameweek histories.
+
+The ``history`` of an ``element-summary`` response is a list of dicts with
+some thirty stats per fixture. Kept as parsed JSON, a season of ~700
+players takes tens of megabytes, almost all of it per-row dict and object
+overhead. :class:`HistoryStore` keeps the same data as one typed NumPy
+column per stat instead, with every player's rows next to each other and
+strings interned into a shared table.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from operator import itemgetter
+
+import numpy as np
+
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def column_kind(values):
+    """Returns how a column of Python values is stored: ``"bool"``,
+    ``"int"`` or ``"float"`` if every value has that exact type, and
+    ``"coded"`` (as codes into the interned values) otherwise.
+    """
+    types = set(map(type, values))
+    if types == {bool}:
+        return "bool"
+    if types == {int}:
+        return "int"
+    if types == {float}:
+        return "float"
+    return "coded"
+
+
+class Columns:
+    """One generation of a :class:`HistoryStore`'s columns.
+
+    Compacting the store builds new columns and leaves the old ones alone,
+    so views handed out before stay valid.
+    """
+
+    __slots__ = ("fields", "data", "coded", "values", "size")
+
+    def __init__(self, fields, data, coded, values, size=0):
+        self.fields = fields
+        self.data = data
+        self.coded = coded
+        self.values = values
+        self.size = size
+
+    def row(self, index):
+        """Returns the row at ``index`` as a dict, like in the response."""
+        values = self.values
+        return {
+            field: values[self.data[field][index]]
+            if field in self.coded
+            else self.data[field][index].item()
+            for field in self.fields
+        }
+
+    def rows(self, rows):
+        """Returns the rows in ``rows`` as dicts, building them a column at
+        a time rather than a value at a time."""
+        values = self.values
+        columns = [
+            [values[code] for code in self.data[field][rows].tolist()]
+            if field in self.coded
+            else self.data[field][rows].tolist()
+            for field in self.fields
+        ]
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+
+    def column(self, field, rows):
+        """Returns the values of ``field`` in ``rows`` as an array, ``None``
+        for each row if no row has the stat."""
+        if field not in self.data:
+            # E.g. while every history is still empty, before anyone played
+            return np.full(self.size, None, dtype=object)[rows]
+        data = self.data[field][rows]
+        if field in self.coded:
+            return np.array([self.values[code] for code in data.tolist()], dtype=object)
+        return data
+
+
+class HistoryView(Sequence):
+    """A read-only, list-like view of some rows of a :class:`HistoryStore`.
+
+    Rows are built as dicts when they are accessed, so the view itself is
+    only a reference to the columns and the row indices.
+    """
+
+    __slots__ = ("_columns", "_rows", "_length")
+
+    def __init__(self, columns, rows):
+        self._columns = columns
+        self._rows = rows
+        self._length = (
+            len(range(rows.start, rows.stop)) if isinstance(rows, slice) else len(rows)
+        )
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("history index out of range")
+        if isinstance(self._rows, slice):
+            return self._columns.row(self._rows.start + index)
+        return self._columns.row(self._rows[index])
+
+    def __iter__(self):
+        return iter(self._columns.rows(self._rows))
+
+    def __eq__(self, other):
+        if isinstance(other, (HistoryView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self)!r})"
+
+    def column(self, field):
+        """Returns the values of ``field`` in the viewed rows as an array."""
+        return self._columns.column(field, self._rows)
+
+
+class HistoryStore:
+    """Every player's gameweek history, as typed columns.
+
+    Rows are grouped per player in one set of columns. A stat whose values
+    are all ``bool``, ``int`` or ``float`` gets a column of that type, any
+    other stat (``kickoff_time``, the ICT and expected stats, which the API
+    sends as strings) is stored as codes into a table of interned values.
+
+    Updates are collected and folded into the columns in one go the next
+    time the store is read, so filling it from a batch of responses costs a
+    single rebuild.
+    """
+
+    def __init__(self):
+        self.fields: list[str] = []
+        self.player = np.empty(0, dtype=np.int32)
+        self.values: list = []
+        self._codes: dict = {}
+        self._columns = Columns([], {}, set(), self.values)
+        self._offsets: dict[int, tuple[int, int]] = {}
+        self._players: set[int] = set()
+        self._pending: dict[int, list] = {}
+        self._removed: set[int] = set()
+        self._round_index = None
+
+    def __len__(self):
+        """Returns the number of players in the store."""
+        return len(self._players)
+
+    def __contains__(self, player_id):
+        return player_id in self._players
+
+    @property
+    def nbytes(self):
+        """The size of the columns in bytes, without the interned values."""
+        self.compact()
+        return self.player.nbytes + sum(
+            column.nbytes for column in self._columns.data.values()
+        )
+
+    def update(self, player_id, history):
+        """Replaces the history of a player.
+
+        :param int player_id: A player's ID.
+        :param list history: The ``history`` of their ``element-summary``.
+        """
+        self._pending[player_id] = history
+        self._removed.discard(player_id)
+        self._players.add(player_id)
+
+    def remove(self, player_id):
+        """Removes the history of a player."""
+        self._pending.pop(player_id, None)
+        self._removed.add(player_id)
+        self._players.discard(player_id)
+
+    def get(self, player_id):
+        """Returns a view of a player's history, or ``None`` if the player
+        isn't in the store.
+
+        :rtype: HistoryView
+        """
+        if player_id not in self._players:
+            return None
+        self.compact()
+        start, stop = self._offsets.get(player_id, (0, 0))
+        return HistoryView(self._columns, slice(start, stop))
+
+    def round(self, round_):
+        """Returns a view of every player's fixtures in a gameweek.
+
+        :param int round_: The gameweek.
+        :rtype: HistoryView
+        """
+        self.compact()
+        if "round" not in self._columns.data or "round" in self._columns.coded:
+            return HistoryView(self._columns, slice(0, 0))
+        if self._round_index is None:
+            rounds = self._columns.data["round"]
+            order = np.argsort(rounds, kind="stable")
+            self._round_index = (order, rounds[order])
+        order, sorted_rounds = self._round_index
+        start, stop = np.searchsorted(sorted_rounds, [round_, round_ + 1])
+        return HistoryView(self._columns, order[start:stop])
+
+    def column(self, field):
+        """Returns a stat of every row in the store, in player order."""
+        self.compact()
+        return self._columns.column(field, slice(None))
+
+    def _encode(self, values):
+        # Interned per type, so that True, 1 and 1.0 stay apart
+        codes = self._codes
+        for kind, value in {(type(value), value) for value in values}:
+            table = codes.setdefault(kind, {})
+            if value not in table:
+                table[value] = len(self.values)
+                self.values.append(value)
+        return np.fromiter(
+            (codes[type(value)][value] for value in values),
+            dtype=np.uint32,
+            count=len(values),
+        )
+
+    def _build(self, values, kind):
+        if kind == "bool":
+            return np.array(values, dtype=np.bool_)
+        if kind == "int":
+            dtype = (
+                np.int32
+                if values and INT32_MIN <= min(values) and max(values) <= INT32_MAX
+                else np.int64
+            )
+            return np.array(values, dtype=dtype)
+        if kind == "float":
+            return np.array(values, dtype=np.float64)
+        return self._encode(values)
+
+    def compact(self):
+        """Folds pending updates and removals into the columns."""
+        if not self._pending and not self._removed:
+            return
+
+        columns = self._columns
+        dropped = list(self._pending.keys() | self._removed)
+        keep = ~np.isin(self.player, dropped)
+        kept = int(keep.sum())
+
+        rows = [row for history in self._pending.values() for row in history]
+        batch_player = np.fromiter(
+            (
+                player_id
+                for player_id, history in self._pending.items()
+                for _ in history
+            ),
+            dtype=np.int32,
+            count=len(rows),
+        )
+
+        fields = dict.fromkeys(self.fields)
+        keys = None
+        for row in rows:
+            if row.keys() != keys:
+                keys = row.keys()
+                fields.update(dict.fromkeys(keys))
+        fields = list(fields)
+
+        try:
+            if len(fields) < 2:
+                raise KeyError
+            batches = dict(zip(fields, zip(*map(itemgetter(*fields), rows))))
+        except KeyError:
+            # Not every row has every stat
+            batches = {field: [row.get(field) for row in rows] for field in fields}
+
+        data = {}
+        coded = set()
+        for field in fields:
+            batch = list(batches.get(field, ()))
+            kind = column_kind(batch)
+            old = columns.data.get(field)
+
+            if old is None and kept:
+                # A new stat, the rows from before don't have it
+                old_kind, old = "coded", self._encode([None] * kept)
+            elif old is not None:
+                old = old[keep]
+                old_kind = (
+                    "coded" if field in columns.coded else column_kind(old[:1].tolist())
+                )
+
+            if not rows:
+                column = old
+                is_coded = old_kind == "coded"
+            elif old is None or not len(old):
+                column = self._build(batch, kind)
+                is_coded = kind == "coded"
+            elif old_kind == kind:
+                column = np.concatenate((old, self._build(batch, kind)))
+                is_coded = kind == "coded"
+            else:
+                # Mixed types, keep every value exactly as it was
+                if old_kind != "coded":
+                    old = self._encode(old.tolist())
+                if kind != "coded":
+                    batch = self._encode(batch)
+                else:
+                    batch = self._build(batch, kind)
+                column = np.concatenate((old, batch))
+                is_coded = True
+
+            data[field] = column
+            if is_coded:
+                coded.add(field)
+
+        player = np.concatenate((self.player[keep], batch_player))
+        if len(player):
+            starts = np.flatnonzero(np.r_[True, player[1:] != player[:-1]])
+            stops = np.r_[starts[1:], len(player)]
+            offsets = dict(
+                zip(player[starts].tolist(), zip(starts.tolist(), stops.tolist()))
+            )
+        else:
+            offsets = {}
+
+        self.fields = fields
+        self.player = player
+        self._columns = Columns(fields, data, coded, self.values, len(player))
+        self._offsets = offsets
+        self._pending = {}
+        self._removed = set()
+        self._round_index = None
@@ -0,0 +1,181 @@
+"""Incremental processing of live gameweek data."""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+# Stats of event/{id}/live elements that are tracked between polls
+LIVE_STATS = (
+    "minutes",
+    "goals_scored",
+    "assists",
+    "bonus",
+    "bps",
+    "yellow_cards",
+    "red_cards",
+    "total_points",
+)
+
+# Fixture stats identifiers that are reported as match events, and the event
+# type each one is reported as
+MATCH_EVENT_TYPES = {
+    "goals_scored": "goal",
+    "own_goals": "own_goal",
+    "assists": "assist",
+    "red_cards": "red_card",
+    "penalties_missed": "penalty_missed",
+}
+
+
+class MatchEvent(NamedTuple):
+    """A change of a player's fixture stat between two polls.
+
+    ``count`` is negative when a stat was taken back, e.g. a goal that was
+    ruled out or credited to another player.
+    """
+
+    type: str
+    fixture_id: int
+    team_id: int
+    element_id: int
+    count: int
+
+
+class LiveDeltaEngine:
+    """Works out which players' live stats changed between two polls.
+
+    The engine keeps the tracked stats of the previous ``event/{id}/live``
+    snapshot as one tuple per player. Each update compares the new snapshot
+    against it and returns only the players whose stats changed, so
+    consumers handle a change set that scales with what is happening on
+    the pitch instead of the whole payload.
+    """
+
+    def __init__(self, stats: tuple = LIVE_STATS) -> None:
+        self.stats = stats
+        self.gameweek = None
+        self.snapshot: dict[int, tuple] = {}
+        self._index = {stat: index for index, stat in enumerate(stats)}
+
+    def update(self, gameweek: int, elements: list) -> dict[int, dict]:
+        """Fold in a new snapshot and return what changed since the last one.
+
+        The first snapshot of a gameweek only sets the baseline and reports
+        no changes.
+
+        :param gameweek: The gameweek the snapshot belongs to.
+        :param elements: The ``elements`` of ``event/{gameweek}/live``.
+        :return: ``{element_id: {stat: (old, new)}}`` for every changed player.
+        """
+        stats = self.stats
+        previous = self.snapshot
+        baseline = gameweek != self.gameweek or not previous
+        snapshot = {}
+        changes = {}
+
+        for element in elements:
+            element_stats = element["stats"]
+            current = tuple(element_stats.get(stat, 0) for stat in stats)
+            snapshot[element["id"]] = current
+
+            if baseline:
+                continue
+            before = previous.get(element["id"])
+            if before == current:
+                continue
+            if before is None:
+                before = (0,) * len(stats)
+            changes[element["id"]] = {
+                stat: (old, new)
+                for stat, old, new in zip(stats, before, current)
+                if old != new
+            }
+
+        self.gameweek = gameweek
+        self.snapshot = snapshot
+        return changes
+
+    def get(self, element_id: int, stat: str, default=0):
+        """Return a stat of a player as of the latest snapshot, or
+        ``default`` if the player or the stat isn't tracked."""
+        try:
+            return self.snapshot[element_id][self._index[stat]]
+        except KeyError:
+            return default
+
+
+class MatchEventDetector:
+    """Detects goals, assists, red cards etc. in live fixtures.
+
+    The detector keeps the tracked ``stats`` entries of every fixture as
+    ``{(identifier, side, element): value}`` and diffs each fixture's new
+    entries against them. Fixtures whose stats did not change are skipped
+    after a single comparison, so the work done per poll follows the
+    number of stat entries that changed rather than the fixture list.
+    """
+
+    def __init__(self, event_types: dict = MATCH_EVENT_TYPES) -> None:
+        self.event_types = event_types
+        self.gameweek = None
+        self.stats: dict[int, list] = {}
+        self.values: dict[int, dict] = {}
+
+    def _values(self, stats: list) -> dict[tuple, int]:
+        values = {}
+        for stat in stats:
+            identifier = stat["identifier"]
+            if identifier not in self.event_types:
+                continue
+            for side in ("h", "a"):
+                for entry in stat[side]:
+                    values[identifier, side, entry["element"]] = entry["value"]
+        return values
+
+    def update(self, gameweek: int, fixtures: list) -> list[MatchEvent]:
+        """Fold in the fixtures of a new poll and return the events since the
+        last one.
+
+        The first poll of a gameweek only sets the baseline and reports no
+        events. Fixtures that show up later are compared against empty
+        stats, so goals in a fixture that kicked off between two polls are
+        still reported.
+
+        :param gameweek: The gameweek the fixtures belong to.
+        :param fixtures: The gameweek's fixtures as returned by the API.
+        :return: The :class:`MatchEvent`s in fixture order.
+        """
+        baseline = gameweek != self.gameweek
+        if baseline:
+            self.gameweek = gameweek
+            self.stats = {}
+            self.values = {}
+
+        events = []
+        for fixture in fixtures:
+            fixture_id = fixture["id"]
+            stats = fixture.get("stats") or []
+            if self.stats.get(fixture_id) == stats:
+                continue
+            self.stats[fixture_id] = stats
+
+            previous = self.values.get(fixture_id, {})
+            current = self._values(stats)
+            self.values[fixture_id] = current
+            if baseline:
+                continue
+
+            teams = {"h": fixture["team_h"], "a": fixture["team_a"]}
+            for key in sorted(current.keys() | previous.keys()):
+                count = current.get(key, 0) - previous.get(key, 0)
+                if not count:
+                    continue
+                identifier, side, element_id = key
+                events.append(
+                    MatchEvent(
+                        self.event_types[identifier],
+                        fixture_id,
+                        teams[side],
+                        element_id,
+                        count,
+                    )
+                )
+        return events
@@ -0,0 +1,192 @@
+"""
+Request metrics of the FPL client.
+
+Every request the client sends is recorded by endpoint, the name of its URL
+in ``API_URLS`` or ``login``: how many were sent, how long they took, how
+many bytes came back and which failed or were retried. The client's caches
+record a hit for every request they made unnecessary and a miss for every
+one they didn't, by the endpoint the request would have gone to.
+"""
+import re
+import time
+from bisect import bisect_left
+
+# Upper bounds in seconds of the buckets of the latency histograms, the
+# last bucket counts every slower request
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointMetrics:
+    """The requests to a single endpoint."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "retries",
+        "bytes",
+        "latency_total",
+        "latency_max",
+        "histogram",
+        "hits",
+        "misses",
+        "coalesced",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = {}
+        self.retries = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def summary(self):
+        """Returns the metrics under the keys of :meth:`RequestMetrics.totals`."""
+        lookups = self.hits + self.misses
+        return {
+            "requests": self.requests,
+            "errors": sum(self.errors.values()),
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "latency_mean": self.latency_total / self.requests
+            if self.requests
+            else None,
+            "cache_hit_rate": self.hits / lookups if lookups else None,
+        }
+
+    def as_dict(self):
+        """Returns the metrics as a JSON serialisable dict."""
+        return {
+            **self.summary(),
+            "errors": dict(self.errors),
+            "latency_max": self.latency_max,
+            "latency_histogram": {
+                **{
+                    str(bound): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.histogram)
+                },
+                "+Inf": self.histogram[-1],
+            },
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+class RequestMetrics:
+    """The requests of a client, by endpoint.
+
+    :param dict urls: (optional) The client's URLs by name, as returned by
+        :func:`api_urls`, to name the endpoint of a URL after.
+    """
+
+    def __init__(self, urls=None):
+        self.started_at = time.time()
+        self.endpoints = {}
+        self._patterns = [
+            (
+                name,
+                re.compile(
+                    "".join(
+                        "[^/]*" if part == "{}" else re.escape(part)
+                        for part in re.split(r"(\{\})", url)
+                    )
+                ),
+            )
+            for name, url in (urls or {}).items()
+        ]
+        self._names = {}
+
+    def endpoint(self, url):
+        """Returns the name of the endpoint ``url`` belongs to."""
+        name = self._names.get(url)
+        if name is None:
+            name = next(
+                (name for name, pattern in self._patterns if pattern.fullmatch(url)),
+                "other",
+            )
+            self._names[url] = name
+        return name
+
+    def get(self, endpoint):
+        """Returns the metrics of an endpoint."""
+        metrics = self.endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self.endpoints[endpoint] = EndpointMetrics()
+        return metrics
+
+    def record(self, endpoint, latency, size=0, error=None):
+        """Records a request that took ``latency`` seconds.
+
+        :param str endpoint: The endpoint of the request.
+        :param float latency: Seconds until the response was read, or the
+            request failed.
+        :param int size: (optional) Bytes in the response body.
+        :param error: (optional) The status of an error response, or the
+            exception the request failed with.
+        """
+        metrics = self.get(endpoint)
+        metrics.requests += 1
+        metrics.bytes += size
+        metrics.latency_total += latency
+        metrics.latency_max = max(metrics.latency_max, latency)
+        metrics.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if error is not None:
+            if isinstance(error, BaseException):
+                error = type(error).__name__
+            metrics.errors[str(error)] = metrics.errors.get(str(error), 0) + 1
+
+    def retry(self, endpoint):
+        """Records that a failed request to ``endpoint`` is sent again."""
+        self.get(endpoint).retries += 1
+
+    def hit(self, endpoint):
+        """Records that a cache made a request to ``endpoint`` unnecessary."""
+        self.get(endpoint).hits += 1
+
+    def miss(self, endpoint):
+        """Records that a cache couldn't answer for ``endpoint``."""
+        self.get(endpoint).misses += 1
+
+    def coalesced(self, endpoint):
+        """Records a request that shared a call already in flight."""
+        self.get(endpoint).coalesced += 1
+
+    def totals(self):
+        """Returns the metrics summed over every endpoint."""
+        endpoints = self.endpoints.values()
+        requests = sum(metrics.requests for metrics in endpoints)
+        hits = sum(metrics.hits for metrics in endpoints)
+        lookups = hits + sum(metrics.misses for metrics in endpoints)
+        return {
+            "requests": requests,
+            "errors": sum(sum(metrics.errors.values()) for metrics in endpoints),
+            "retries": sum(metrics.retries for metrics in endpoints),
+            "bytes": sum(metrics.bytes for metrics in endpoints),
+            "latency_mean": sum(metrics.latency_total for metrics in endpoints)
+            / requests
+            if requests
+            else None,
+            "cache_hit_rate": hits / lookups if lookups else None,
+        }
+
+    def summaries(self):
+        """Returns the summary of every endpoint."""
+        return {
+            endpoint: metrics.summary() for endpoint, metrics in self.endpoints.items()
+        }
+
+    def stats(self):
+        """Returns every metric, in total and by endpoint."""
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.started_at)),
+            "totals": self.totals(),
+            "endpoints": {
+                endpoint: metrics.as_dict()
+                for endpoint, metrics in sorted(self.endpoints.items())
+            },
+        }
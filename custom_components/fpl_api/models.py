@@ -0,0 +1,124 @@
+"""
+Lightweight models over the raw API records.
+
+The models of the ``fpl`` library copy every key of a record into the
+instance ``__dict__`` when they are created, so wrapping all ~700 players
+copies the whole of ``bootstrap-static`` once more. The models here are
+slotted views instead: they keep a reference to the record and look a field
+up in it when it is accessed. Their methods are those of the ``fpl``
+models, so they behave the same.
+
+Records are shared with the client's caches and must not be modified
+through a model.
+"""
+from fpl.models import fixture as fpl_fixture
+from fpl.models import gameweek as fpl_gameweek
+from fpl.models import player as fpl_player
+from fpl.models import team as fpl_team
+
+
+class Record:
+    """Read-only attribute access to the fields of a record."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getattr__(self, name):
+        try:
+            return self._data[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            ) from None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data.get('id')!r})"
+
+
+class Player(Record):
+    """A player, optionally with their ``element-summary``, whose fields take
+    precedence over the ``bootstrap-static`` ones like in
+    ``{**player, **summary}``.
+    """
+
+    __slots__ = ("_session", "_summary")
+
+    def __init__(self, player_information, session, summary=None):
+        super().__init__(player_information)
+        self._session = session
+        self._summary = summary
+
+    def __getattr__(self, name):
+        summary = self._summary
+        if summary is not None and name in summary:
+            return summary[name]
+        return super().__getattr__(name)
+
+    games_played = fpl_player.Player.games_played
+    pp90 = fpl_player.Player.pp90
+    vapm = fpl_player.Player.vapm
+    __str__ = fpl_player.Player.__str__
+
+
+class PlayerSummary(Record):
+    """A player's ``element-summary``."""
+
+    __slots__ = ()
+
+
+class Team(Record):
+    """A team of the Premier League."""
+
+    # Filled in by the fpl methods, which cache what they fetch on the team
+    __slots__ = ("_session", "players", "fixtures")
+
+    def __init__(self, team_information, session):
+        super().__init__(team_information)
+        self._session = session
+
+    get_players = fpl_team.Team.get_players
+    get_fixtures = fpl_team.Team.get_fixtures
+    __str__ = fpl_team.Team.__str__
+
+
+class Fixture(Record):
+    """A fixture, whose ``stats`` are keyed by identifier the first time
+    they are accessed.
+    """
+
+    __slots__ = ("_stats",)
+
+    def __init__(self, fixture_information):
+        super().__init__(fixture_information)
+        self._stats = None
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = {
+                stat["identifier"]: {"a": stat["a"], "h": stat["h"]}
+                for stat in Record.__getattr__(self, "stats")
+            }
+        return self._stats
+
+    get_goalscorers = fpl_fixture.Fixture.get_goalscorers
+    get_assisters = fpl_fixture.Fixture.get_assisters
+    get_own_goalscorers = fpl_fixture.Fixture.get_own_goalscorers
+    get_yellow_cards = fpl_fixture.Fixture.get_yellow_cards
+    get_red_cards = fpl_fixture.Fixture.get_red_cards
+    get_penalty_saves = fpl_fixture.Fixture.get_penalty_saves
+    get_penalty_misses = fpl_fixture.Fixture.get_penalty_misses
+    get_saves = fpl_fixture.Fixture.get_saves
+    get_bonus = fpl_fixture.Fixture.get_bonus
+    get_bps = fpl_fixture.Fixture.get_bps
+    __str__ = fpl_fixture.Fixture.__str__
+
+
+class Gameweek(Record):
+    """A gameweek, optionally with its live data."""
+
+    __slots__ = ()
+
+    __str__ = fpl_gameweek.Gameweek.__str__
@@ -0,0 +1,148 @@
+"""Opt-in profiling of the refreshes of the FPL Api integration."""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant
+import homeassistant.util.dt as dt_util
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lines in each ranking of a report
+PROFILE_TOP = 30
+# Reports kept in memory for the diagnostics of an entry
+PROFILE_REPORTS = 5
+
+
+class RefreshProfiler:
+    """Profiles the next few refreshes of a coordinator once started.
+
+    A profiled refresh runs under cProfile and tracemalloc, and its hot
+    functions and top allocations are written to a report in the config
+    directory and kept for the entry's diagnostics. cProfile sees everything
+    the event loop runs during the refresh, so time spent waiting for the
+    FPL API shows up as time in the loop's selector.
+
+    The coordinator only calls :meth:`async_profile` while
+    :attr:`remaining` is set, so there is nothing to pay while it isn't.
+    """
+
+    # cProfile and tracemalloc are process wide, so one refresh of all the
+    # entries is profiled at a time
+    running = False
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        self.hass = hass
+        self.name = name
+        self.remaining = 0
+        self.reports: deque[dict[str, Any]] = deque(maxlen=PROFILE_REPORTS)
+
+    def start(self, count: int) -> None:
+        """Profile the next ``count`` refreshes."""
+        self.remaining = count
+
+    async def async_profile(self, label: str, update: Callable[[], Awaitable]):
+        """Run ``update()``, profiled unless another refresh is."""
+        if RefreshProfiler.running:
+            return await update()
+
+        RefreshProfiler.running = True
+        self.remaining -= 1
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        profile = cProfile.Profile()
+        started = dt_util.utcnow()
+        try:
+            before = tracemalloc.take_snapshot()
+            monotonic = time.monotonic()
+            profile.enable()
+            try:
+                result = await update()
+            finally:
+                profile.disable()
+                duration = time.monotonic() - monotonic
+                after = tracemalloc.take_snapshot()
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+            RefreshProfiler.running = False
+
+        report = await self.hass.async_add_executor_job(
+            self._save, label, started, duration, profile, before, after
+        )
+        self.reports.append(report)
+        _LOGGER.info(
+            "Profiled FPL %s in %.2fs, report saved to %s",
+            label,
+            duration,
+            report["path"],
+        )
+        return result
+
+    def _save(self, label, started, duration, profile, before, after) -> dict:
+        """Write the report of a profiled refresh and return its summary."""
+        stats = pstats.Stats(profile)
+        ignore = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        allocations = after.filter_traces(ignore).compare_to(
+            before.filter_traces(ignore), "lineno"
+        )[:PROFILE_TOP]
+
+        path = self.hass.config.path(
+            f"fpl_api_profile_{self.name}_{started.strftime('%Y%m%d-%H%M%S.%f')}.txt"
+        )
+        text = io.StringIO()
+        text.write(
+            f"FPL {label} profiled at {started.isoformat()}, took {duration:.3f}s\n"
+        )
+        for sort, title in (
+            (pstats.SortKey.CUMULATIVE, "cumulative"),
+            (pstats.SortKey.TIME, "own"),
+        ):
+            text.write(f"\nHot functions by {title} time\n")
+            stats.stream = text
+            stats.sort_stats(sort).print_stats(PROFILE_TOP)
+        text.write("\nTop allocations\n")
+        for allocation in allocations:
+            text.write(f"{allocation}\n")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text.getvalue())
+
+        def ranked(index):
+            return [
+                {
+                    "function": pstats.func_std_string(function),
+                    "calls": calls,
+                    "own_time": round(own_time, 6),
+                    "cumulative_time": round(cumulative_time, 6),
+                }
+                for function, (_, calls, own_time, cumulative_time, _) in sorted(
+                    stats.stats.items(), key=lambda item: item[1][index], reverse=True
+                )[:PROFILE_TOP]
+            ]
+
+        return {
+            "label": label,
+            "started": started.isoformat(),
+            "duration": duration,
+            "path": path,
+            "cumulative": ranked(3),
+            "own": ranked(2),
+            "allocations": [
+                {
+                    "location": f"{allocation.traceback[0].filename}:"
+                    f"{allocation.traceback[0].lineno}",
+                    "size": allocation.size,
+                    "size_diff": allocation.size_diff,
+                    "count_diff": allocation.count_diff,
+                }
+                for allocation in allocations
+            ],
+        }
@@ -0,0 +1,103 @@
+"""Persistent storage for the FPL Api integration."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN
+from .fpl_mod import API_BASE_URL, BootstrapCache, FixturesStore
+
+STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+AUTH_SAVE_DELAY = 1
+
+# Only the bootstrap sections the integration reads are persisted, which
+# leaves out the bulky element_stats, game_settings, phases etc.
+SNAPSHOT_SECTIONS = ("events", "teams", "elements", "element_types")
+
+
+def snapshot_name(api_base_url: str) -> str:
+    """Return the name of the snapshot of the public data of an API."""
+    if api_base_url == API_BASE_URL:
+        return "public"
+    return f"public_{slugify(api_base_url)}"
+
+
+class FPLSnapshotStore:
+    """Keeps the last good bootstrap and fixtures payloads in ``.storage``.
+
+    The snapshot lets the sensor come up with a state right away on startup,
+    before the FPL API has answered a single request. The payloads are
+    public, so the entries using the same API share one snapshot, named
+    by :func:`snapshot_name`.
+    """
+
+    def __init__(self, hass: HomeAssistant, name: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{name}.snapshot")
+
+    async def async_load(self) -> dict | None:
+        """Return the stored snapshot, if there is a usable one."""
+        snapshot = await self._store.async_load()
+        if not snapshot or not snapshot.get("bootstrap"):
+            return None
+        return snapshot
+
+    @callback
+    def async_schedule_save(
+        self, bootstrap: BootstrapCache, fixtures: FixturesStore
+    ) -> None:
+        """Persist the current payloads once polling has settled down."""
+        if bootstrap.static is None:
+            return
+
+        def _data() -> dict:
+            return {
+                "saved_at": dt_util.utcnow().isoformat(),
+                "etag": bootstrap.etag,
+                "last_modified": bootstrap.last_modified,
+                "bootstrap": bootstrap.export(SNAPSHOT_SECTIONS),
+                "fixtures": list(fixtures.by_id.values()),
+            }
+
+        self._store.async_delay_save(_data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored snapshot."""
+        await self._store.async_remove()
+
+
+class FPLAuthStore:
+    """Keeps the cookies of the logged in FPL session in ``.storage``.
+
+    Restoring them on startup saves logging in again for as long as the
+    cookies are valid.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.auth")
+
+    async def async_load(self) -> list | None:
+        """Return the stored cookies, if there are any."""
+        auth = await self._store.async_load()
+        if not auth:
+            return None
+        return auth.get("cookies")
+
+    @callback
+    def async_schedule_save(self, cookies: list) -> None:
+        """Persist the cookies of a new login."""
+        self._store.async_delay_save(lambda: {"cookies": cookies}, AUTH_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the stored cookies."""
+        await self._store.async_remove()
+
+
+def snapshot_age(snapshot: dict) -> float | None:
+    """Return how many seconds ago the snapshot was saved."""
+    saved_at = dt_util.parse_datetime(snapshot.get("saved_at") or "")
+    if saved_at is None:
+        return None
+    return (dt_util.utcnow() - saved_at).total_seconds()
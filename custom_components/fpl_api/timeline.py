@@ -0,0 +1,134 @@
+"""Kickoff-aware polling schedule for the FPL Api integration."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+import homeassistant.util.dt as dt_util
+
+LIVE_SCAN_INTERVAL = timedelta(seconds=10)
+BONUS_SCAN_INTERVAL = timedelta(minutes=5)
+# Used when the timeline is empty, e.g. between seasons
+IDLE_SCAN_INTERVAL = timedelta(days=1)
+MAX_BACKOFF_INTERVAL = timedelta(minutes=15)
+
+# A match ends about this long after kickoff, half time and stoppage included
+MATCH_LENGTH = timedelta(minutes=115)
+# Bonus points are usually confirmed within an hour of full time
+BONUS_DELAY = timedelta(hours=1)
+# Matches and bonus that are still not final after this long are not waited
+# for any more, so a fixture that is never updated can't keep polling fast
+STALE_AFTER = timedelta(hours=3)
+
+# Prices change once a day, shortly after 01:30 UK time
+PRICE_CHANGE_TIME = time(1, 35)
+PRICE_CHANGE_TZ = "Europe/London"
+
+# A refresh may take up to this share of the interval before polling slows
+SLOW_FRACTION = 0.2
+
+
+class PollingTimeline:
+    """The instants worth polling at, built from the whole fixtures feed.
+
+    Instants are the kickoffs, expected full-times and bonus confirmations
+    of every fixture, the gameweek deadlines, and the daily price change on
+    days that have any other instant. Between instants there is nothing to
+    pick up, so :meth:`next_interval` sleeps until the next one, unless a
+    match is live or waiting for its bonus.
+    """
+
+    def __init__(self) -> None:
+        self.key = None
+        self.instants: list[datetime] = []
+        self.matches: list[tuple] = []
+
+    def build(self, key, fixtures, events) -> None:
+        """(Re)build the timeline, unless it was already built for ``key``.
+
+        :param key: Identifies the versions of the fixtures and events.
+        :param fixtures: Every fixture of the season.
+        :param events: Every gameweek, with its ``deadline_time``.
+        """
+        if key == self.key:
+            return
+
+        instants = set()
+        matches = []
+        for fixture in fixtures:
+            kickoff = dt_util.parse_datetime(fixture["kickoff_time"] or "")
+            if kickoff is None:
+                continue
+            full_time = kickoff + MATCH_LENGTH
+            instants.update((kickoff, full_time, full_time + BONUS_DELAY))
+            matches.append(
+                (
+                    kickoff,
+                    full_time,
+                    fixture.get("finished_provisional", fixture["finished"]),
+                    fixture["finished"],
+                )
+            )
+        for event in events:
+            deadline = dt_util.parse_datetime(event.get("deadline_time") or "")
+            if deadline is not None:
+                instants.add(deadline)
+
+        price_tz = dt_util.get_time_zone(PRICE_CHANGE_TZ)
+        days = {instant.astimezone(price_tz).date() for instant in instants}
+        instants.update(
+            datetime.combine(day, PRICE_CHANGE_TIME, tzinfo=price_tz) for day in days
+        )
+
+        self.key = key
+        self.instants = sorted(instants)
+        self.matches = matches
+
+    def next_instant(self, now: datetime) -> datetime | None:
+        """Return the first instant after ``now``."""
+        index = bisect_right(self.instants, now)
+        if index == len(self.instants):
+            return None
+        return self.instants[index]
+
+    def live(self, now: datetime) -> bool:
+        """Whether a match has kicked off and isn't over yet."""
+        return any(
+            kickoff <= now < kickoff + STALE_AFTER and not finished_provisional
+            for kickoff, _, finished_provisional, _ in self.matches
+        )
+
+    def awaiting_bonus(self, now: datetime) -> bool:
+        """Whether a match is over but its bonus points aren't confirmed."""
+        return any(
+            finished_provisional and not finished and now < full_time + STALE_AFTER
+            for _, full_time, finished_provisional, finished in self.matches
+        )
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """Return how long to wait before the next refresh."""
+        if self.live(now):
+            return LIVE_SCAN_INTERVAL
+
+        interval = IDLE_SCAN_INTERVAL
+        if self.awaiting_bonus(now):
+            interval = BONUS_SCAN_INTERVAL
+        next_instant = self.next_instant(now)
+        if next_instant is not None:
+            interval = min(interval, next_instant - now)
+        return max(interval, LIVE_SCAN_INTERVAL)
+
+
+def backoff_interval(interval: timedelta, duration: float, failures: int) -> timedelta:
+    """Stretch a polling interval while the FPL API is slow or failing.
+
+    :param interval: The interval the timeline asks for.
+    :param duration: How many seconds the last refresh took.
+    :param failures: The number of refreshes that failed in a row.
+    """
+    if failures:
+        interval = max(
+            interval, min(LIVE_SCAN_INTERVAL * 2**failures, MAX_BACKOFF_INTERVAL)
+        )
+    slow = timedelta(seconds=duration / SLOW_FRACTION)
+    return max(interval, min(slow, MAX_BACKOFF_INTERVAL))
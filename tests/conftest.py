@@ -0,0 +1,156 @@
+"""Shared helpers of the FPL Api tests."""
+import asyncio
+import json
+import os
+import sys
+from collections.abc import Iterator
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class FakeResponse:
+    """The part of ``aiohttp.ClientResponse`` that :class:`FPL` uses."""
+
+    def __init__(self, url, status, body):
+        self.url = URL(url)
+        self.status = status
+        self._body = json.dumps(body).encode()
+        self.headers = CIMultiDictProxy(
+            CIMultiDict({"Content-Type": "application/json"})
+        )
+        self.content = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(
+                aiohttp.RequestInfo(self.url, "GET", CIMultiDict(), self.url),
+                (),
+                status=self.status,
+            )
+
+    async def read(self):
+        return self._body
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self._body), size):
+            yield self._body[start : start + size]
+
+
+class FakeSession:
+    """Stands in for the ``aiohttp.ClientSession`` of :class:`FPL`.
+
+    ``routes`` maps URLs to the JSON body to answer with, to an
+    ``(status, body)`` tuple, or to an iterator of those to answer with in
+    turn. Every URL requested is kept in ``requests`` and each response
+    takes ``latency`` seconds.
+    """
+
+    def __init__(self, routes, latency=0):
+        self.routes = routes
+        self.latency = latency
+        self.requests = []
+        self.closed = False
+        self.cookie_jar = aiohttp.CookieJar(unsafe=True)
+
+    def get(self, url, **kwargs):
+        return self._respond(url)
+
+    def _respond(self, url):
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                session.requests.append(url)
+                if session.latency:
+                    await asyncio.sleep(session.latency)
+                answer = session.routes.get(url, (404, {}))
+                if isinstance(answer, Iterator):
+                    answer = next(answer)
+                status, body = answer if isinstance(answer, tuple) else (200, answer)
+                return FakeResponse(url, status, body)
+
+            async def __aexit__(self, *exc_info):
+                return None
+
+        return Request()
+
+    async def close(self):
+        self.closed = True
+
+
+def bootstrap(current=1):
+    """Returns a small ``bootstrap-static`` document with gameweek
+    ``current`` as the current one, or none at all."""
+    return {
+        "events": [
+            {
+                "id": event_id,
+                "name": f"Gameweek {event_id}",
+                "deadline_time": f"2030-08-{event_id + 10}T10:00:00Z",
+                "finished": current is not None and event_id < current,
+                "data_checked": current is not None and event_id < current,
+                "is_previous": current is not None and event_id == current - 1,
+                "is_current": event_id == current,
+                "is_next": event_id == (current or 0) + 1,
+            }
+            for event_id in (1, 2, 3)
+        ],
+        "teams": [
+            {"id": 1, "code": 1, "name": "Arsenal", "short_name": "ARS"},
+            {"id": 2, "code": 2, "name": "Chelsea", "short_name": "CHE"},
+        ],
+        "elements": [
+            {
+                "id": element_id,
+                "code": element_id,
+                "first_name": f"First{element_id}",
+                "second_name": f"Second{element_id}",
+                "web_name": f"Player{element_id}",
+                "team": 1 + element_id % 2,
+                "element_type": 1 + element_id % 4,
+                "status": "a",
+                "now_cost": 50,
+                "total_points": 0,
+                "event_points": 0,
+                "minutes": 0,
+            }
+            for element_id in range(1, 5)
+        ],
+        "element_types": [
+            {"id": position, "singular_name": f"Position{position}"}
+            for position in range(1, 5)
+        ],
+    }
+
+
+def fixtures():
+    """Returns the fixtures of :func:`bootstrap`, none of them played yet
+    and one without a gameweek."""
+    return [
+        {
+            "id": fixture_id,
+            "event": event,
+            "team_h": 1,
+            "team_a": 2,
+            "team_h_score": None,
+            "team_a_score": None,
+            "kickoff_time": f"2030-08-{fixture_id + 10}T14:00:00Z" if event else None,
+            "started": False,
+            "finished": False,
+            "stats": [],
+        }
+        for fixture_id, event in ((1, 1), (2, 2), (3, None))
+    ]
@@ -0,0 +1,55 @@
+"""Tests of the streaming bootstrap-static parser."""
+import json
+
+import pytest
+
+from custom_components.fpl_api.bootstrap import StaticParser, key_by_id
+
+from conftest import bootstrap
+
+FIELDS = {"events": None, "teams": ["id", "name"], "game_settings": None}
+
+
+def document():
+    static = bootstrap()
+    static["teams"][0]["name"] = "Arsénal"
+    static["game_settings"] = {"squad_squadsize": 15}
+    static["chips"] = [{"name": "wildcard"}, {"name": "bboost"}]
+    return static
+
+
+def parse(body, size):
+    parser = StaticParser(FIELDS)
+    for start in range(0, len(body), size):
+        parser.feed(body[start : start + size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 1 << 20])
+def test_selected_fields_are_parsed_from_any_chunking(size):
+    static = document()
+    body = json.dumps(static, indent=1, ensure_ascii=False).encode()
+    expected = key_by_id(static)
+
+    sections = parse(body, size)
+
+    assert sections.keys() == FIELDS.keys()
+    assert sections["events"] == expected["events"]
+    assert sections["game_settings"] == {"squad_squadsize": 15}
+    assert sections["teams"] == {
+        1: {"id": 1, "name": "Arsénal"},
+        2: {"id": 2, "name": "Chelsea"},
+    }
+
+
+def test_sections_without_ids_stay_lists():
+    body = json.dumps({"events": [{"id": 1}, {"name": "no id"}]}).encode()
+    assert parse(body, 5) == {"events": [{"id": 1}, {"name": "no id"}]}
+
+
+@pytest.mark.parametrize(
+    "body", [b'{"events": [{"id": 1}', b'{"events": []} []', b'["events"]']
+)
+def test_malformed_documents_raise(body):
+    with pytest.raises(ValueError):
+        parse(body, 3)
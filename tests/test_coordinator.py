@@ -0,0 +1,132 @@
+"""Tests of the FPL Api data update coordinator."""
+import asyncio
+import tempfile
+from http.cookies import SimpleCookie
+
+from homeassistant.core import HomeAssistant
+from yarl import URL
+
+from custom_components.fpl_api.coordinator import (
+    NO_GAMES_PLAYING,
+    FPLDataUpdateCoordinator,
+    live_fixtures,
+)
+from custom_components.fpl_api.fpl_mod import FPL
+
+from conftest import FakeSession, bootstrap, fixtures
+
+
+def create_hass():
+    return HomeAssistant(tempfile.mkdtemp())
+
+
+def test_refresh_before_the_season_starts():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        fpl.session.routes = {
+            fpl.urls["static"]: bootstrap(current=None),
+            fpl.urls["fixtures"]: fixtures(),
+        }
+        coordinator = FPLDataUpdateCoordinator(create_hass(), fpl, fav_team="Arsenal")
+        data = await coordinator._async_update_data()
+        return coordinator, data
+
+    coordinator, data = asyncio.run(run())
+    assert coordinator.active_gameweek is None
+    assert coordinator.fixtures == []
+    assert data["state"] == NO_GAMES_PLAYING
+    assert data["next_kickoff"] is not None
+
+
+def test_team_of_an_entry_without_a_user_id():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        fpl.session.routes = {
+            fpl.urls["static"]: bootstrap(),
+            fpl.urls["fixtures"]: fixtures(),
+            fpl.urls["me"]: {"player": {"entry": 91928}},
+            fpl.urls["user"].format(91928): {"id": 91928, "name": "Team"},
+            fpl.urls["user_team"].format(91928): {
+                "picks": [
+                    {"element": 1, "multiplier": 2},
+                    {"element": 2, "multiplier": 1},
+                ]
+            },
+            **{
+                fpl.urls["player"].format(player_id): {
+                    "history": [{"round": 1, "total_points": player_id}],
+                    "fixtures": [],
+                    "history_past": [],
+                }
+                for player_id in (1, 2)
+            },
+        }
+        # Logged in already
+        cookies = SimpleCookie()
+        cookies["csrftoken"] = "token"
+        cookies["csrftoken"]["path"] = "/"
+        fpl.session.cookie_jar.update_cookies(cookies, URL(fpl.login_url))
+        coordinator = FPLDataUpdateCoordinator(
+            create_hass(), fpl, "user@example.com", "secret", fav_team="Arsenal"
+        )
+        data = await coordinator._async_update_data()
+        return fpl, data
+
+    fpl, data = asyncio.run(run())
+    assert fpl.urls["user_team"].format(91928) in fpl.session.requests
+    assert data["team_points"] == 1 * 2 + 2 * 1
+
+
+def test_warm_start_restores_the_fixtures():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        coordinator = FPLDataUpdateCoordinator(create_hass(), fpl, fav_team="Arsenal")
+        await coordinator.async_restore(
+            {"bootstrap": bootstrap(), "fixtures": fixtures()}
+        )
+        return fpl, coordinator
+
+    fpl, coordinator = asyncio.run(run())
+    assert fpl.session.requests == []
+    assert len(fpl.fixtures_store.by_id) == 3
+    assert not fpl.fixtures_store.fresh
+    assert [fixture["id"] for fixture in coordinator.fixtures] == [1]
+    assert coordinator.data["next_kickoff"] is not None
+
+
+def test_refreshes_while_every_history_is_empty():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        fpl.session.routes = {
+            fpl.urls["static"]: bootstrap(current=1),
+            fpl.urls["fixtures"]: fixtures(),
+            fpl.urls["user"].format(91928): {"id": 91928, "name": "Team"},
+            fpl.urls["user_team"].format(91928): {
+                "picks": [{"element": 1, "multiplier": 2}]
+            },
+            fpl.urls["player"].format(1): {
+                "history": [],
+                "fixtures": [],
+                "history_past": [],
+            },
+        }
+        cookies = SimpleCookie()
+        cookies["csrftoken"] = "token"
+        cookies["csrftoken"]["path"] = "/"
+        fpl.session.cookie_jar.update_cookies(cookies, URL(fpl.login_url))
+        coordinator = FPLDataUpdateCoordinator(
+            create_hass(), fpl, "user@example.com", "secret", 91928, "Arsenal"
+        )
+        # The second refresh reads the histories from the summary cache
+        await coordinator._async_update_data()
+        return await coordinator._async_update_data()
+
+    data = asyncio.run(run())
+    assert data["team_points"] == 0
+
+
+def test_live_fixtures_have_started_but_not_finished():
+    unplayed, playing, played = fixtures()
+    playing.update(started=True)
+    played.update(started=True, finished=True)
+    assert live_fixtures([unplayed, playing, played]) == [playing]
@@ -0,0 +1,208 @@
+"""Tests of the vectorised points against and FDR."""
+import random
+
+import pytest
+from fpl.utils import average, position_converter, scale, team_converter
+
+from custom_components.fpl_api.fdr import FDRState, PointsAgainst
+from custom_components.fpl_api.history import HistoryStore
+
+
+def history_row(fixture, opponent, was_home, points, minutes=90):
+    return {
+        "fixture": fixture,
+        "opponent_team": opponent,
+        "was_home": was_home,
+        "total_points": points,
+        "minutes": minutes,
+    }
+
+
+def live_element(element_id, fixture, points, minutes=90):
+    return {
+        "id": element_id,
+        "explain": [
+            {
+                "fixture": fixture,
+                "stats": [
+                    {"identifier": "minutes", "points": 2, "value": minutes},
+                    {"identifier": "goals_scored", "points": points - 2, "value": 1},
+                ],
+            }
+        ],
+    }
+
+
+def test_seed_leaves_fixtures_the_histories_predate_to_fold():
+    players = [
+        {"element_type": 3, "history": [history_row(1, 2, True, 6)]},
+        {"element_type": 3, "history": [history_row(1, 1, False, 2)]},
+    ]
+    state = FDRState()
+    # Fixture 2 finished after the histories were fetched
+    state.seed(PointsAgainst(players), {1, 2})
+    assert state.fixtures == {1}
+
+    fixture = {"id": 2, "team_h": 2, "team_a": 1, "finished": True}
+    elements = {10: {"team": 1, "element_type": 3}}
+    assert state.fold([fixture], [live_element(10, 2, 8)], elements) == 1
+    assert state.fixtures == {1, 2}
+    assert state.counts.sum() == 6
+
+
+def original_points_against(players):
+    """The points against as :meth:`FPL.get_points_against` computed them
+    before they were vectorised."""
+    points_against = {}
+    for player in players:
+        position = position_converter(player["element_type"]).lower()
+        for fixture in player["history"]:
+            if fixture["minutes"] == 0:
+                continue
+            opponent = team_converter(fixture["opponent_team"])
+            location = "H" if fixture["was_home"] else "A"
+            points_against.setdefault(
+                opponent,
+                {
+                    position: {"H": [], "A": []}
+                    for position in (
+                        "all",
+                        "goalkeeper",
+                        "defender",
+                        "midfielder",
+                        "forward",
+                    )
+                },
+            )
+            points_against[opponent]["all"][location].append(fixture["total_points"])
+            points_against[opponent][position][location].append(fixture["total_points"])
+    return points_against
+
+
+def original_fdr(players):
+    """The FDR as :meth:`FPL.FDR` computed it before it was vectorised."""
+    averages = {
+        team: {
+            position: {location: average(points[location]) for location in "HA"}
+            for position, points in positions.items()
+        }
+        for team, positions in original_points_against(players).items()
+    }
+    extrema = {}
+    for positions in averages.values():
+        for position, locations in positions.items():
+            for location, value in locations.items():
+                extrema.setdefault(position, {"H": [], "A": []})[location].append(value)
+    return {
+        team: {
+            position: {
+                location: scale(
+                    value,
+                    5.0,
+                    1.0,
+                    min(extrema[position][location]),
+                    max(extrema[position][location]),
+                )
+                for location, value in locations.items()
+            }
+            for position, locations in positions.items()
+        }
+        for team, positions in averages.items()
+    }
+
+
+def season(rounds, seed=0):
+    """Returns players with a history of ``rounds`` gameweeks, in which each
+    of 20 teams plays once, their elements and the fixtures by gameweek."""
+    rng = random.Random(seed)
+    elements = {
+        element_id: {"team": element_id % 20 + 1, "element_type": rng.randint(1, 4)}
+        for element_id in range(1, 201)
+    }
+    players = [
+        {"id": element_id, "element_type": element["element_type"], "history": []}
+        for element_id, element in elements.items()
+    ]
+    fixtures = {}
+    for round_ in range(1, rounds + 1):
+        teams = list(range(1, 21))
+        rng.shuffle(teams)
+        fixtures[round_] = [
+            {
+                "id": round_ * 100 + index,
+                "event": round_,
+                "team_h": teams[2 * index],
+                "team_a": teams[2 * index + 1],
+                "finished": True,
+            }
+            for index in range(10)
+        ]
+        for player in players:
+            team = elements[player["id"]]["team"]
+            fixture = next(
+                fixture
+                for fixture in fixtures[round_]
+                if team in (fixture["team_h"], fixture["team_a"])
+            )
+            home = fixture["team_h"] == team
+            player["history"].append(
+                {
+                    "fixture": fixture["id"],
+                    "round": round_,
+                    "opponent_team": fixture["team_a" if home else "team_h"],
+                    "was_home": home,
+                    "minutes": rng.choice((0, 0, 30, 90)),
+                    "total_points": rng.randint(-2, 15),
+                }
+            )
+    return players, elements, fixtures
+
+
+def as_views(players):
+    store = HistoryStore()
+    for player in players:
+        store.update(player["id"], player["history"])
+    return [{**player, "history": store.get(player["id"])} for player in players]
+
+
+@pytest.mark.parametrize("views", [False, True])
+def test_points_against_and_fdr_match_the_original(views):
+    players, _, _ = season(6)
+    expected_points, expected_fdr = (
+        original_points_against(players),
+        original_fdr(players),
+    )
+    if views:
+        players = as_views(players)
+
+    points_against = PointsAgainst(players)
+    assert points_against.to_dict() == expected_points
+    assert list(points_against.to_dict()) == list(expected_points)
+    assert points_against.fdr() == expected_fdr
+
+
+def test_folded_state_matches_a_full_recompute():
+    players, elements, fixtures = season(8)
+    earlier = [
+        {**player, "history": [row for row in player["history"] if row["round"] <= 5]}
+        for player in players
+    ]
+    finished = {fixture["id"] for gameweek in fixtures.values() for fixture in gameweek}
+
+    state = FDRState()
+    state.seed(PointsAgainst(as_views(earlier)), finished)
+    for round_ in (6, 7, 8):
+        live_elements = [
+            live_element(
+                player["id"], row["fixture"], row["total_points"], row["minutes"]
+            )
+            for player in players
+            for row in player["history"]
+            if row["round"] == round_
+        ]
+        state.fold(fixtures[round_], live_elements, elements)
+        # Folding the same fixtures again changes nothing
+        assert state.fold(fixtures[round_], live_elements, elements) == 0
+
+    assert state.fixtures == finished
+    assert state.fdr() == original_fdr(players)
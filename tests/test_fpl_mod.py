@@ -0,0 +1,179 @@
+"""Tests of the FPL client's request handling."""
+import asyncio
+from http.cookies import SimpleCookie
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from custom_components.fpl_api.fpl_mod import (
+    FPL,
+    RequestCoalescer,
+    RequestScheduler,
+    gather_all,
+)
+
+from conftest import FakeSession, bootstrap, fixtures
+
+
+def test_coalescer_shares_a_request():
+    async def run():
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def request():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": 1}
+
+        results = await asyncio.gather(
+            coalescer.run("url", request), coalescer.run("url", request)
+        )
+        return calls, results, coalescer
+
+    calls, results, coalescer = asyncio.run(run())
+    assert calls == [1]
+    assert results == [{"id": 1}, {"id": 1}]
+    assert (coalescer.requests, coalescer.saved) == (1, 1)
+
+
+def test_coalescer_cancels_a_request_nobody_waits_for():
+    async def run():
+        coalescer = RequestCoalescer()
+        cancelled = asyncio.Event()
+
+        async def request():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.ensure_future(coalescer.run("url", request))
+        second = asyncio.ensure_future(coalescer.run("url", request))
+        await asyncio.sleep(0)
+
+        # The other caller still waits for it
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+
+        second.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert not coalescer.in_flight("url")
+
+    asyncio.run(run())
+
+
+def test_failed_request_stops_the_others():
+    async def run():
+        fpl = FPL(FakeSession({}, latency=0.01))
+        fpl.scheduler = RequestScheduler(max_concurrency=4, rate=1e9, burst=1e9)
+        urls = [fpl.urls["player"].format(player_id) for player_id in range(40)]
+        with pytest.raises(aiohttp.ClientResponseError):
+            await gather_all(*[fpl.fetch(url) for url in urls])
+        # Nothing left queued behind the scheduler gets sent afterwards
+        sent = len(fpl.session.requests)
+        await asyncio.sleep(0.1)
+        return sent, len(fpl.session.requests)
+
+    sent, sent_later = asyncio.run(run())
+    assert sent == sent_later
+    assert sent < 40
+
+
+def test_restored_cookies_expire_after_their_max_age():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        cookies = SimpleCookie()
+        cookies["csrftoken"] = "token"
+        cookies["csrftoken"]["path"] = "/"
+        cookies["csrftoken"]["max-age"] = 60
+        cookies["sessionid"] = "session"
+        cookies["sessionid"]["max-age"] = 3600
+        fpl.session.cookie_jar.update_cookies(cookies, URL(fpl.login_url))
+        fpl.auth.record(0.1)
+        # Exported a while after the login
+        fpl.auth.logged_in_at -= 120
+        exported = fpl.export_cookies()
+
+        restored = FPL(FakeSession({}))
+        restored.restore_cookies(exported)
+        return exported, restored
+
+    exported, restored = asyncio.run(run())
+    assert all(cookie["expires"] for cookie in exported)
+    names = {morsel.key for morsel in restored.session.cookie_jar}
+    assert names == {"sessionid"}
+    assert not restored.logged_in()
+
+
+def test_live_gameweek_comes_from_the_live_store():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        url = fpl.urls["gameweek_live"].format(1)
+        fpl.session.routes = {
+            fpl.urls["static"]: bootstrap(current=2),
+            url: {"elements": [{"id": 1, "stats": {"total_points": 3}}]},
+        }
+        await fpl.async_init()
+        gameweek = await fpl.get_gameweek(1, include_live=True, return_json=True)
+        elements = await fpl.get_live_elements(1)
+        return fpl, url, gameweek, elements
+
+    fpl, url, gameweek, elements = asyncio.run(run())
+    assert fpl.session.requests.count(url) == 1
+    assert gameweek["elements"][1]["stats"]["total_points"] == 3
+    assert elements == [{"id": 1, "stats": {"total_points": 3}}]
+
+
+def test_summaries_are_kept_until_a_fixture_of_their_team_finishes():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        played = fixtures()
+        played[0].update(kickoff_time="2020-08-12T14:00:00Z", started=True)
+        fpl.session.routes = {
+            fpl.urls["fixtures"]: played,
+            fpl.urls["gameweek_fixtures"].format(1): [played[0]],
+        }
+        fpl.fixtures_store.live_ttl = 0
+        await fpl.load_fixtures()
+        fpl.summaries.put(1, 1, {"history": []})
+        fpl.summaries.put(2, 3, {"history": []})
+
+        # A live tick of the fixture in progress
+        await fpl.load_fixtures()
+        kept = fpl.summaries.get(1) is not None
+
+        fpl.session.routes[fpl.urls["gameweek_fixtures"].format(1)] = [
+            {**played[0], "finished": True}
+        ]
+        await fpl.load_fixtures()
+        return fpl, kept
+
+    fpl, kept = asyncio.run(run())
+    assert kept
+    assert fpl.summaries.get(1) is None
+    assert fpl.summaries.get(2) is not None
+
+
+def test_a_full_reload_counts_as_a_gameweek_refresh():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        played = fixtures()
+        played[0].update(kickoff_time="2020-08-12T14:00:00Z", started=True)
+        fpl.session.routes = {
+            fpl.urls["fixtures"]: played,
+            fpl.urls["gameweek_fixtures"].format(1): [played[0]],
+        }
+        fpl.fixtures_store.live_ttl = 0.05
+        fpl.fixtures_store.restore(played)
+        await fpl.load_fixtures()
+        first = list(fpl.session.requests)
+        await asyncio.sleep(0.06)
+        await fpl.load_fixtures()
+        return fpl, first
+
+    fpl, first = asyncio.run(run())
+    assert first == [fpl.urls["fixtures"]]
+    assert fpl.session.requests[1:] == [fpl.urls["gameweek_fixtures"].format(1)]
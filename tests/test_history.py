@@ -0,0 +1,93 @@
+"""Tests of the columnar storage of player histories."""
+import pytest
+
+from custom_components.fpl_api.coordinator import get_gameweek_score
+from custom_components.fpl_api.fdr import PointsAgainst
+from custom_components.fpl_api.history import HistoryStore
+
+
+def test_columns_of_empty_histories():
+    store = HistoryStore()
+    store.update(1, [])
+    store.update(2, [])
+    history = store.get(1)
+
+    assert list(history) == []
+    assert len(history.column("total_points")) == 0
+    assert len(store.column("total_points")) == 0
+    assert get_gameweek_score(type("Player", (), {"history": history})(), 1) == 0
+    points = PointsAgainst([{"element_type": 1, "history": history}])
+    assert points.teams == []
+    assert points.to_dict() == {}
+
+
+def rows(player_id, rounds):
+    return [
+        {
+            "element": player_id,
+            "round": round_,
+            "total_points": player_id + round_,
+            "was_home": bool(round_ % 2),
+            "influence": f"{round_}.0",
+        }
+        for round_ in rounds
+    ]
+
+
+def test_views_read_like_the_histories():
+    store = HistoryStore()
+    store.update(1, rows(1, [1, 2]))
+    store.update(2, rows(2, [1]))
+
+    history = store.get(1)
+    assert len(store) == 2 and 2 in store
+    assert history == rows(1, [1, 2])
+    assert history[-1] == rows(1, [2])[0]
+    assert history[:1] == rows(1, [1])
+    assert history.column("total_points").tolist() == [2, 3]
+    assert history.column("influence").tolist() == ["1.0", "2.0"]
+    assert store.get(3) is None
+    with pytest.raises(IndexError):
+        history[2]
+
+
+def test_views_stay_valid_across_updates():
+    store = HistoryStore()
+    store.update(1, rows(1, [1]))
+    store.update(2, rows(2, [1]))
+    before = store.get(1)
+
+    store.update(1, rows(1, [1, 2]))
+    store.remove(2)
+
+    assert before == rows(1, [1])
+    assert store.get(1) == rows(1, [1, 2])
+    assert store.get(2) is None
+    assert len(store) == 1
+
+
+def test_rounds_across_players():
+    store = HistoryStore()
+    store.update(1, rows(1, [1, 2]))
+    store.update(2, rows(2, [2, 3]))
+
+    assert list(store.round(2)) == rows(1, [2]) + rows(2, [2])
+    assert list(store.round(4)) == []
+
+
+def test_mixed_types_are_kept_exactly():
+    store = HistoryStore()
+    store.update(1, [{"value": 1}, {"value": 1.5}, {"value": True}])
+    store.update(2, [{"value": None, "new": "stat"}])
+
+    assert store.get(1) == [
+        {"value": 1, "new": None},
+        {"value": 1.5, "new": None},
+        {"value": True, "new": None},
+    ]
+    assert [type(value) for value in store.column("value")] == [
+        int,
+        float,
+        bool,
+        type(None),
+    ]
@@ -0,0 +1,66 @@
+"""Tests of how the FPL Api integration sets up its clients."""
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.fpl_api import (
+    acquire_public_data,
+    async_setup,
+    create_client,
+    create_public_data,
+    release_public_data,
+)
+from custom_components.fpl_api.const import DATA_PUBLIC, DATA_SNAPSHOTS, DOMAIN
+from custom_components.fpl_api.fpl_mod import API_BASE_URL, RequestScheduler
+
+from conftest import FakeSession
+
+
+def test_entries_share_one_token_bucket():
+    async def run():
+        public = create_public_data()
+        # A burst of two requests, and hardly any after that
+        public.scheduler = RequestScheduler(rate=0.01, burst=2)
+        clients = [create_client({}, public) for _ in range(2)]
+        for fpl in clients:
+            await fpl.session.close()
+            fpl.session = FakeSession({fpl.urls["user"].format(1): {"id": 1}})
+
+        await asyncio.gather(
+            *[fpl.fetch(fpl.urls["user"].format(1), shared=False) for fpl in clients]
+        )
+        # The bucket is empty for both entries now
+        try:
+            await asyncio.wait_for(
+                clients[0].fetch(clients[0].urls["user"].format(1), shared=False), 0.2
+            )
+        except asyncio.TimeoutError:
+            return clients, False
+        return clients, True
+
+    clients, sent = asyncio.run(run())
+    assert clients[0].scheduler is clients[1].scheduler
+    assert not sent
+    assert [len(fpl.session.requests) for fpl in clients] == [1, 1]
+
+
+def test_public_data_is_dropped_with_its_last_entry():
+    async def run():
+        hass = HomeAssistant(tempfile.mkdtemp())
+        await async_setup(hass, {})
+        first, second = (
+            SimpleNamespace(entry_id=entry_id, data={}) for entry_id in ("1", "2")
+        )
+        public, snapshot_store = acquire_public_data(hass, first)
+        assert acquire_public_data(hass, second) == (public, snapshot_store)
+
+        release_public_data(hass, first)
+        assert hass.data[DOMAIN][DATA_PUBLIC] == {API_BASE_URL: public}
+        release_public_data(hass, second)
+        return hass
+
+    hass = asyncio.run(run())
+    assert hass.data[DOMAIN][DATA_PUBLIC] == {}
+    assert hass.data[DOMAIN][DATA_SNAPSHOTS] == {}
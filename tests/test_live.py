@@ -0,0 +1,128 @@
+"""Tests of the incremental processing of live gameweek data."""
+import asyncio
+import tempfile
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.fpl_api.coordinator import FPLDataUpdateCoordinator
+from custom_components.fpl_api.fpl_mod import FPL
+from custom_components.fpl_api.live import (
+    LiveDeltaEngine,
+    MatchEvent,
+    MatchEventDetector,
+)
+
+from conftest import FakeSession, bootstrap
+
+
+def element(element_id, **stats):
+    return {"id": element_id, "stats": {"minutes": 90, **stats}}
+
+
+def fixture(fixture_id, team_h=1, team_a=2, **stats):
+    """Returns a started fixture with ``stats`` as ``{identifier: (home,
+    away)}``, where each side is ``{element: value}``."""
+    return {
+        "id": fixture_id,
+        "event": 1,
+        "team_h": team_h,
+        "team_a": team_a,
+        "kickoff_time": "2020-08-12T14:00:00Z",
+        "started": True,
+        "finished": False,
+        "stats": [
+            {
+                "identifier": identifier,
+                "h": [{"element": e, "value": v} for e, v in home.items()],
+                "a": [{"element": e, "value": v} for e, v in away.items()],
+            }
+            for identifier, (home, away) in stats.items()
+        ],
+    }
+
+
+def test_deltas_between_polls():
+    engine = LiveDeltaEngine()
+    assert engine.update(1, [element(1), element(2)]) == {}
+
+    changes = engine.update(
+        1, [element(1, goals_scored=1, total_points=6), element(2), element(3)]
+    )
+    assert changes == {
+        1: {"goals_scored": (0, 1), "total_points": (0, 6)},
+        3: {"minutes": (0, 90)},
+    }
+    assert engine.get(1, "total_points") == 6
+    assert engine.get(4, "total_points", None) is None
+    assert engine.get(1, "clean_sheets", None) is None
+
+    # Another gameweek starts from a new baseline
+    assert engine.update(2, [element(1)]) == {}
+    assert engine.get(1, "total_points") == 0
+
+
+def test_match_events_between_polls():
+    detector = MatchEventDetector()
+    first = fixture(1, goals_scored=({10: 1}, {}))
+    assert detector.update(1, [first]) == []
+    assert detector.update(1, [first]) == []
+
+    events = detector.update(
+        1,
+        [
+            fixture(
+                1,
+                goals_scored=({10: 1}, {20: 1}),
+                assists=({}, {21: 1}),
+                bps=({10: 30}, {}),
+            ),
+            # Kicked off between the polls
+            fixture(2, team_h=3, team_a=4, red_cards=({30: 1}, {})),
+        ],
+    )
+    assert events == [
+        MatchEvent("assist", 1, 2, 21, 1),
+        MatchEvent("goal", 1, 2, 20, 1),
+        MatchEvent("red_card", 2, 3, 30, 1),
+    ]
+
+    # A goal ruled out
+    events = detector.update(1, [fixture(1, assists=({}, {21: 1}))])
+    assert events == [
+        MatchEvent("goal", 1, 2, 20, -1),
+        MatchEvent("goal", 1, 1, 10, -1),
+    ]
+
+
+def test_new_goal_only_counts_goals_in_the_favourite_teams_fixture():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        fpl.session.routes = {fpl.urls["static"]: bootstrap()}
+        await fpl.async_init()
+        fpl.fixtures_store.ttl = fpl.fixtures_store.live_ttl = 0
+        coordinator = FPLDataUpdateCoordinator(
+            HomeAssistant(tempfile.mkdtemp()), fpl, fav_team="Arsenal"
+        )
+        coordinator.active_gameweek = 1
+        coordinator.fav_team_id = 1
+
+        results = []
+        for fixtures in (
+            [fixture(1), fixture(2, team_h=3, team_a=4)],
+            [fixture(1), fixture(2, team_h=3, team_a=4, goals_scored=({30: 1}, {}))],
+            [fixture(1, goals_scored=({}, {20: 1})), fixture(2, team_h=3, team_a=4)],
+            [fixture(1), fixture(2, team_h=3, team_a=4)],
+        ):
+            fpl.session.routes[fpl.urls["fixtures"]] = fixtures
+            fpl.session.routes[fpl.urls["gameweek_fixtures"].format(1)] = fixtures
+            results.append(await coordinator.get_match_events())
+        return results
+
+    baseline, other, conceded, ruled_out = asyncio.run(run())
+    assert baseline == (False, [])
+    assert other == (False, [MatchEvent("goal", 2, 3, 30, 1)])
+    assert conceded == (
+        True,
+        [MatchEvent("goal", 1, 2, 20, 1), MatchEvent("goal", 2, 3, 30, -1)],
+    )
+    assert ruled_out == (False, [MatchEvent("goal", 1, 2, 20, -1)])
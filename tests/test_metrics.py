@@ -0,0 +1,71 @@
+"""Tests of the request metrics."""
+import asyncio
+import json
+
+import pytest
+
+from custom_components.fpl_api.fpl_mod import FPL
+from custom_components.fpl_api.metrics import RequestMetrics
+
+from conftest import FakeSession, bootstrap
+
+URLS = {
+    "static": "https://example.com/api/bootstrap-static/",
+    "player": "https://example.com/api/element-summary/{}/",
+}
+
+
+def test_urls_are_named_after_their_endpoint():
+    metrics = RequestMetrics(URLS)
+    assert metrics.endpoint(URLS["static"]) == "static"
+    assert metrics.endpoint(URLS["player"].format(7)) == "player"
+    assert metrics.endpoint(URLS["player"].format("7/extra")) == "other"
+    assert metrics.endpoint("https://example.com/api/me/") == "other"
+
+
+def test_totals_and_summaries():
+    metrics = RequestMetrics(URLS)
+    metrics.record("static", 0.2, 1000)
+    metrics.record("player", 0.01, 10)
+    metrics.record("player", 30.0, error=503)
+    metrics.record("player", 0.5, error=asyncio.TimeoutError())
+    metrics.retry("player")
+    metrics.hit("player")
+    metrics.hit("player")
+    metrics.miss("player")
+    metrics.coalesced("player")
+
+    assert metrics.totals() == {
+        "requests": 4,
+        "errors": 2,
+        "retries": 1,
+        "bytes": 1010,
+        "latency_mean": pytest.approx(30.71 / 4),
+        "cache_hit_rate": pytest.approx(2 / 3),
+    }
+    assert metrics.summaries()["static"]["cache_hit_rate"] is None
+
+    stats = metrics.stats()
+    json.dumps(stats)
+    player = stats["endpoints"]["player"]
+    assert player["errors"] == {"503": 1, "TimeoutError": 1}
+    assert player["latency_max"] == 30.0
+    assert player["latency_histogram"]["0.05"] == 1
+    assert player["latency_histogram"]["0.5"] == 1
+    assert player["latency_histogram"]["+Inf"] == 1
+    assert player["coalesced"] == 1
+
+
+def test_client_records_its_requests_and_cache_lookups():
+    async def run():
+        fpl = FPL(FakeSession({}))
+        fpl.session.routes = {fpl.urls["static"]: bootstrap()}
+        await fpl.async_init()
+        await fpl.async_init()
+        return fpl.metrics.stats()["endpoints"]["static"]
+
+    static = asyncio.run(run())
+    assert static["requests"] == 1
+    assert static["bytes"] > 0
+    assert static["errors"] == {}
+    assert static["misses"] >= 1
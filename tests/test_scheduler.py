@@ -0,0 +1,103 @@
+"""Tests of the request scheduler's retries and rate limiting."""
+import asyncio
+import random
+import time
+
+import aiohttp
+import pytest
+
+from custom_components.fpl_api.fpl_mod import MAX_BACKOFF, RequestScheduler
+from custom_components.fpl_api.metrics import RequestMetrics
+
+from conftest import FakeSession
+
+URL = "https://example.com/api/fixtures/"
+
+
+def fetch(scheduler, answers):
+    metrics = RequestMetrics()
+
+    async def run():
+        session = FakeSession({URL: iter(answers)})
+        try:
+            result = await scheduler.fetch(session, URL, metrics, "fixtures")
+        except aiohttp.ClientResponseError as error:
+            result = error.status
+        return result, len(session.requests)
+
+    result, requests = asyncio.run(run())
+    return result, requests, metrics.get("fixtures")
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retryable_statuses_are_retried(status):
+    scheduler = RequestScheduler(backoff=0)
+    result, requests, metrics = fetch(scheduler, [(status, {}), (status, {}), [1]])
+    assert result == [1]
+    assert requests == 3
+    assert metrics.retries == 2
+    assert metrics.errors == {str(status): 2}
+
+
+def test_retries_give_up_with_the_last_error():
+    scheduler = RequestScheduler(max_retries=2, backoff=0)
+    result, requests, metrics = fetch(scheduler, [(503, {})] * 4)
+    assert result == 503
+    assert requests == 3
+    assert metrics.retries == 2
+
+
+def test_client_errors_are_not_retried():
+    scheduler = RequestScheduler(backoff=0)
+    result, requests, metrics = fetch(scheduler, [(404, {}), [1]])
+    assert result == 404
+    assert requests == 1
+    assert metrics.retries == 0
+
+
+def test_backoff_delays():
+    random.seed(0)
+    scheduler = RequestScheduler(backoff=0.5)
+    for attempt in range(10):
+        delay = scheduler.backoff_delay(attempt)
+        assert 0 <= delay <= min(MAX_BACKOFF, 0.5 * 2**attempt)
+    assert scheduler.backoff_delay(0, "7") >= 7
+    assert scheduler.backoff_delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= 0.5
+
+
+def test_token_bucket_limits_the_rate_after_a_burst():
+    async def run():
+        scheduler = RequestScheduler(max_concurrency=10, rate=20, burst=3)
+        started = []
+
+        async def request():
+            async with scheduler.slot():
+                started.append(time.monotonic())
+
+        await asyncio.gather(*[request() for _ in range(8)])
+        return started
+
+    started = asyncio.run(run())
+    # The burst goes out at once, the other 5 at 20 per second
+    assert started[2] - started[0] < 0.04
+    assert started[-1] - started[0] >= 5 / 20 * 0.9
+
+
+def test_concurrency_is_bounded():
+    async def run():
+        scheduler = RequestScheduler(max_concurrency=2, rate=1e9, burst=1e9)
+        running = []
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with scheduler.slot():
+                running.append(1)
+                peak = max(peak, len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*[request() for _ in range(6)])
+        return peak
+
+    assert asyncio.run(run()) == 2
@@ -0,0 +1,26 @@
+"""Tests of the FPL Api sensors."""
+import asyncio
+import tempfile
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.fpl_api.coordinator import FPLDataUpdateCoordinator
+from custom_components.fpl_api.fpl_mod import FPL
+from custom_components.fpl_api.sensor import create_sensors
+
+from conftest import FakeSession
+
+
+def test_sensors_of_two_entries_have_their_own_ids():
+    async def run():
+        hass = HomeAssistant(tempfile.mkdtemp())
+        return [
+            create_sensors(FPLDataUpdateCoordinator(hass, FPL(FakeSession({}))), entry)
+            for entry in ("first", "second")
+        ]
+
+    first, second = asyncio.run(run())
+    unique_ids = [sensor.unique_id for sensor in first + second]
+    assert None not in unique_ids
+    assert len(set(unique_ids)) == len(unique_ids)
+    assert all(sensor.entity_id is None for sensor in first + second)
@@ -0,0 +1,86 @@
+"""Tests of the kickoff-aware polling schedule."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.fpl_api.timeline import (
+    BONUS_SCAN_INTERVAL,
+    IDLE_SCAN_INTERVAL,
+    LIVE_SCAN_INTERVAL,
+    MAX_BACKOFF_INTERVAL,
+    PollingTimeline,
+    backoff_interval,
+)
+
+KICKOFF = datetime(2030, 8, 11, 14, tzinfo=timezone.utc)
+
+
+def timeline(finished_provisional=False, finished=False):
+    fixtures = [
+        {
+            "kickoff_time": KICKOFF.isoformat(),
+            "finished_provisional": finished_provisional,
+            "finished": finished,
+        },
+        {"kickoff_time": None, "finished": False},
+    ]
+    events = [{"deadline_time": (KICKOFF - timedelta(days=1)).isoformat()}]
+    timeline = PollingTimeline()
+    timeline.build(1, fixtures, events)
+    return timeline
+
+
+@pytest.mark.parametrize(
+    "now, interval",
+    [
+        # Until the deadline the day before
+        (KICKOFF - timedelta(days=1, hours=2), timedelta(hours=2)),
+        # Until the price change at 01:35 UK time
+        (datetime(2030, 8, 11, tzinfo=timezone.utc), timedelta(minutes=35)),
+        (KICKOFF - timedelta(hours=1), timedelta(hours=1)),
+        (KICKOFF - timedelta(seconds=1), LIVE_SCAN_INTERVAL),
+        (KICKOFF + timedelta(minutes=30), LIVE_SCAN_INTERVAL),
+        # A match that is never marked finished stops counting as live
+        (KICKOFF + timedelta(hours=4), IDLE_SCAN_INTERVAL),
+    ],
+)
+def test_intervals_of_an_unfinished_match(now, interval):
+    assert timeline().next_interval(now) == interval
+
+
+def test_bonus_is_waited_for_until_it_is_confirmed():
+    full_time = KICKOFF + timedelta(minutes=115)
+    now = full_time + timedelta(minutes=10)
+    assert timeline(True).next_interval(now) == BONUS_SCAN_INTERVAL
+    # Until the instant the bonus is usually confirmed
+    assert timeline(True).next_interval(full_time + timedelta(minutes=58)) == timedelta(
+        minutes=2
+    )
+    assert timeline(True, True).next_interval(now) == timedelta(minutes=50)
+
+
+def test_a_timeline_is_only_rebuilt_for_another_key():
+    polling = timeline()
+    polling.build(1, [], [])
+    assert polling.instants
+    polling.build(2, [], [])
+    assert polling.instants == []
+    assert polling.next_interval(KICKOFF) == IDLE_SCAN_INTERVAL
+
+
+@pytest.mark.parametrize(
+    "interval, duration, failures, expected",
+    [
+        (LIVE_SCAN_INTERVAL, 0.5, 0, LIVE_SCAN_INTERVAL),
+        # A refresh that takes more than a fifth of the interval
+        (LIVE_SCAN_INTERVAL, 5, 0, timedelta(seconds=25)),
+        (LIVE_SCAN_INTERVAL, 600, 0, MAX_BACKOFF_INTERVAL),
+        (LIVE_SCAN_INTERVAL, 0.5, 1, timedelta(seconds=20)),
+        (LIVE_SCAN_INTERVAL, 0.5, 3, timedelta(seconds=80)),
+        (LIVE_SCAN_INTERVAL, 0.5, 20, MAX_BACKOFF_INTERVAL),
+        # Backing off never polls sooner than the timeline asks
+        (IDLE_SCAN_INTERVAL, 0.5, 20, IDLE_SCAN_INTERVAL),
+    ],
+)
+def test_backoff_interval(interval, duration, failures, expected):
+    assert backoff_interval(interval, duration, failures) == expected